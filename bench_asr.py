@@ -0,0 +1,229 @@
+"""
+Benchmark of the ASR engines over a local corpus of recorded calls.
+
+The corpus is a directory of WAV files, each with a reference transcript next to
+it (same name, .txt). Every engine x chunk duration runs in a fresh process, so
+peak RSS is that configuration's own. Reported per run: real-time factor
+(processing time / audio time), per-chunk latency percentiles, peak RSS and WER.
+
+    python bench_asr.py corpus/ --engines vosk-en,mix,mock --chunks 0.5,1.0 --output asr_bench.json
+
+Compare against a previous release (exit code 1 on regression):
+
+    python bench_asr.py corpus/ --baseline asr_bench_v1.json
+"""
+import argparse
+import glob
+import json
+import multiprocessing as mp
+import os
+import platform
+import re
+import resource
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Tuple
+import numpy as np
+
+ENGINES = ("vosk-en", "vosk-hi", "mix", "mock")
+
+def load_corpus(corpus_dir: str) -> List[Tuple[str, str]]:
+    """(wav path, reference transcript) pairs; WAVs without a .txt reference are skipped."""
+    pairs = []
+    for wav_path in sorted(glob.glob(os.path.join(corpus_dir, "*.wav"))):
+        ref_path = os.path.splitext(wav_path)[0] + ".txt"
+        if not os.path.exists(ref_path):
+            print(f"[Bench] No reference for {wav_path}, skipping.")
+            continue
+        with open(ref_path, encoding="utf-8") as f:
+            pairs.append((wav_path, f.read()))
+    return pairs
+
+def normalize(text: str) -> List[str]:
+    """Lower-cases and strips punctuation (Vosk output has neither)."""
+    return re.sub(r"[^\w\s']", " ", text.lower()).split()
+
+def word_errors(reference: List[str], hypothesis: List[str]) -> int:
+    """Word-level Levenshtein distance (substitutions + deletions + insertions)."""
+    previous = list(range(len(hypothesis) + 1))
+    for i, ref_word in enumerate(reference, 1):
+        current = [i] + [0] * len(hypothesis)
+        for j, hyp_word in enumerate(hypothesis, 1):
+            current[j] = min(previous[j] + 1, current[j - 1] + 1,
+                             previous[j - 1] + (ref_word != hyp_word))
+        previous = current
+    return previous[-1]
+
+def make_engine(name: str):
+    from src.asr_service import VoskASRService, MultiVoskASRService, MockASRService
+    if name == "vosk-en":
+        return VoskASRService(language="en")
+    if name == "vosk-hi":
+        return VoskASRService(language="hi")
+    if name == "mix":
+        return MultiVoskASRService()
+    return MockASRService()
+
+def run_config(engine_name: str, chunk_duration: float, corpus: List[Tuple[str, str]]) -> Dict:
+    """
+    Decodes the whole corpus with one engine and chunk duration (runs in its own process).
+    """
+    from src.audio_chunker import AudioChunker
+
+    start = time.perf_counter()
+    engine = make_engine(engine_name)
+    load_seconds = time.perf_counter() - start
+
+    chunker = AudioChunker(chunk_duration=chunk_duration, realtime=False)
+    latencies = []
+    audio_seconds = 0.0
+    busy_seconds = 0.0
+    total_errors = 0
+    total_ref_words = 0
+    per_file = []
+    engine_stats: Dict[str, int] = {}
+
+    for wav_path, reference in corpus:
+        stream = engine.new_stream()
+        finals = []
+        file_audio = 0.0
+        for chunk in chunker.process_file_stream(wav_path):
+            # The chunk data may be a view into the reader's buffer: measure decode only
+            t0 = time.perf_counter()
+            segment = stream.process_chunk(chunk)
+            latencies.append(time.perf_counter() - t0)
+            file_audio += chunk.duration - chunk.overlap_bytes / (2 * chunk.sample_rate)
+            if segment is not None and segment.is_final:
+                finals.append(segment.text)
+        t0 = time.perf_counter()
+        segment = stream.flush()
+        busy_seconds += time.perf_counter() - t0
+        if segment is not None:
+            finals.append(segment.text)
+
+        for key, value in stream.stats().items():
+            engine_stats[key] = engine_stats.get(key, 0) + value
+
+        ref_words = normalize(reference)
+        errors = word_errors(ref_words, normalize(" ".join(finals)))
+        total_errors += errors
+        total_ref_words += len(ref_words)
+        audio_seconds += file_audio
+        per_file.append({
+            "file": os.path.basename(wav_path),
+            "audio_seconds": round(file_audio, 3),
+            "wer": round(errors / max(len(ref_words), 1), 4),
+        })
+
+    lat_ms = np.array(latencies) * 1000 if latencies else np.zeros(1)
+    busy_seconds += float(np.sum(latencies))
+    # ru_maxrss is in KiB on Linux, bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    peak_rss_mb = rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+    return {
+        "engine": engine_name,
+        "chunk_duration": chunk_duration,
+        "load_seconds": round(load_seconds, 3),
+        "audio_seconds": round(audio_seconds, 3),
+        "chunks": len(latencies),
+        "rtf": round(busy_seconds / audio_seconds, 5) if audio_seconds else None,
+        "latency_ms": {
+            "mean": round(float(lat_ms.mean()), 3),
+            "p50": round(float(np.percentile(lat_ms, 50)), 3),
+            "p95": round(float(np.percentile(lat_ms, 95)), 3),
+            "p99": round(float(np.percentile(lat_ms, 99)), 3),
+            "max": round(float(lat_ms.max()), 3),
+        },
+        "peak_rss_mb": round(peak_rss_mb, 1),
+        "wer": round(total_errors / max(total_ref_words, 1), 4),
+        "ref_words": total_ref_words,
+        "stats": engine_stats,
+        "files": per_file,
+    }
+
+def compare(results: List[Dict], baseline_path: str, tolerance: float, wer_tolerance: float) -> bool:
+    """
+    Prints regressions against a previous run. Returns True if any metric regressed.
+    """
+    with open(baseline_path) as f:
+        baseline = {(r["engine"], r["chunk_duration"]): r for r in json.load(f)["results"]}
+
+    regressed = False
+    for r in results:
+        old = baseline.get((r["engine"], r["chunk_duration"]))
+        if old is None:
+            continue
+        checks = [
+            ("rtf", old["rtf"], r["rtf"], old["rtf"] is not None and r["rtf"] > old["rtf"] * (1 + tolerance)),
+            ("p95", old["latency_ms"]["p95"], r["latency_ms"]["p95"],
+             r["latency_ms"]["p95"] > old["latency_ms"]["p95"] * (1 + tolerance)),
+            ("peak_rss_mb", old["peak_rss_mb"], r["peak_rss_mb"],
+             r["peak_rss_mb"] > old["peak_rss_mb"] * (1 + tolerance)),
+            ("wer", old["wer"], r["wer"], r["wer"] > old["wer"] + wer_tolerance),
+        ]
+        for metric, before, after, worse in checks:
+            if worse:
+                regressed = True
+                print(f"[Bench] REGRESSION {r['engine']} @ {r['chunk_duration']}s: {metric} {before} -> {after}")
+    return regressed
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("corpus", help="Directory of WAV files with same-name .txt reference transcripts")
+    parser.add_argument("--engines", default="vosk-en,mix,mock",
+                        help=f"Comma-separated engines ({', '.join(ENGINES)})")
+    parser.add_argument("--chunks", default="0.5,1.0", help="Comma-separated chunk durations in seconds")
+    parser.add_argument("--output", default="asr_bench.json", help="JSON results file")
+    parser.add_argument("--baseline", help="Previous results file to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.10,
+                        help="Relative slack for RTF, p95 latency and RSS before flagging a regression")
+    parser.add_argument("--wer-tolerance", type=float, default=0.01, help="Absolute WER slack")
+    args = parser.parse_args()
+
+    engines = [e.strip() for e in args.engines.split(",") if e.strip()]
+    for engine in engines:
+        if engine not in ENGINES:
+            parser.error(f"unknown engine '{engine}'")
+    chunk_durations = [float(c) for c in args.chunks.split(",")]
+
+    corpus = load_corpus(args.corpus)
+    if not corpus:
+        print(f"No WAV + .txt pairs found in {args.corpus}")
+        return
+
+    results = []
+    for engine in engines:
+        for chunk_duration in chunk_durations:
+            # Fresh interpreter per configuration: models and peak RSS don't carry over
+            with ProcessPoolExecutor(max_workers=1, mp_context=mp.get_context("spawn")) as pool:
+                try:
+                    r = pool.submit(run_config, engine, chunk_duration, corpus).result()
+                except Exception as e:
+                    print(f"[Bench] {engine} @ {chunk_duration}s failed: {e}")
+                    continue
+            results.append(r)
+            lat = r["latency_ms"]
+            print(f"{engine:<8} chunk={chunk_duration:<4} RTF={r['rtf']:.3f}  p50={lat['p50']:7.1f}ms  "
+                  f"p95={lat['p95']:7.1f}ms  p99={lat['p99']:7.1f}ms  RSS={r['peak_rss_mb']:7.1f}MB  "
+                  f"WER={r['wer']:.3f}")
+
+    report = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "corpus": os.path.abspath(args.corpus),
+        "files": len(corpus),
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.baseline and compare(results, args.baseline, args.tolerance, args.wer_tolerance):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
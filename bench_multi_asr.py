@@ -0,0 +1,58 @@
+"""
+Per-chunk latency of MultiVoskASRService (--language mix): sequential vs. thread pool,
+plus the adaptive language lock-in mode.
+
+Both runs decode the same file at max speed through fresh recognizers and report
+mean / p50 / p95 / max latency per 1 s chunk. Use a mixed Hinglish recording:
+
+    python bench_multi_asr.py hinglish_call.wav
+"""
+import argparse
+import time
+import numpy as np
+from src.audio_chunker import AudioChunker
+from src.asr_service import MultiVoskASRService
+
+def run(service: MultiVoskASRService, path: str, chunk_duration: float) -> np.ndarray:
+    service.reset()
+    latencies = []
+    for chunk in AudioChunker(chunk_duration=chunk_duration, realtime=False).process_file_stream(path):
+        start = time.perf_counter()
+        service.process_chunk(chunk)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return np.array(latencies)
+
+def report(name: str, lat: np.ndarray):
+    print(f"{name:<12} chunks={len(lat):<5} mean={lat.mean():7.1f}ms  p50={np.percentile(lat, 50):7.1f}ms  "
+          f"p95={np.percentile(lat, 95):7.1f}ms  max={lat.max():7.1f}ms")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("file", help="Mixed-language WAV sample (16kHz mono recommended)")
+    parser.add_argument("--chunk", type=float, default=1.0, help="Chunk duration in seconds")
+    parser.add_argument("--deadline-ms", type=float, default=250.0)
+    args = parser.parse_args()
+
+    base = MultiVoskASRService(deadline_ms=args.deadline_ms)
+
+    sequential = base.new_stream()
+    sequential.parallel = False
+    parallel = base.new_stream()
+    adaptive = base.new_stream()
+    adaptive.adaptive = True
+
+    run(parallel, args.file, args.chunk) # Warm-up: page in both models
+
+    seq = run(sequential, args.file, args.chunk)
+    par = run(parallel, args.file, args.chunk)
+    ada = run(adaptive, args.file, args.chunk)
+
+    report("sequential", seq)
+    report("parallel", par)
+    report("adaptive", ada)
+    print(f"Speed-up (mean): {seq.mean() / par.mean():.2f}x, deadline misses: {parallel.deadline_misses}")
+    print(f"Adaptive: locked to {adaptive.locked_language or '-'}, "
+          f"{adaptive.chunks_single} single-recognizer / {adaptive.chunks_dual} dual chunks")
+
+if __name__ == "__main__":
+    main()
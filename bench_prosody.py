@@ -0,0 +1,125 @@
+"""
+Speed and agreement of the paralinguistic backends: NumPy prosody vs. OpenSMILE eGeMAPS.
+
+Both backends analyse the same 1 s chunks (per-chunk functionals). Reported: time per
+chunk, and for each feature the correlation and mean absolute difference between the
+two backends across chunks (loudness is on a different scale, compare its correlation;
+jitter is a frame-to-frame approximation that can't stand in for eGeMAPS jitter).
+
+    python bench_prosody.py call1.wav call2.wav --output prosody_bench.json
+
+--micro times the per-chunk hot path on one fixed chunk instead (including the old
+pandas DataFrame extraction for comparison) with the allocation peak per call:
+
+    python bench_prosody.py call1.wav --micro
+"""
+import argparse
+import json
+import time
+import timeit
+import tracemalloc
+from typing import Callable, Dict, List
+import numpy as np
+from src.audio_chunker import AudioChunker
+from src.models import AudioChunk
+from src.paralinguistic import ParalinguisticAnalyzer, OPENSMILE_AVAILABLE
+
+FEATURES = ("pitch_mean", "pitch_variance", "intensity_mean", "jitter", "shimmer")
+
+def run(analyzer: ParalinguisticAnalyzer, paths: List[str], chunk_duration: float) -> Dict[str, np.ndarray]:
+    values = {name: [] for name in FEATURES}
+    latencies = []
+    for path in paths:
+        for chunk in AudioChunker(chunk_duration=chunk_duration, realtime=False).process_file_stream(path):
+            chunk.data = bytes(chunk.data) # Same input for both backends
+            start = time.perf_counter()
+            features = analyzer.analyze(chunk)
+            latencies.append((time.perf_counter() - start) * 1000)
+            for name in FEATURES:
+                values[name].append(getattr(features, name))
+    result = {name: np.array(v) for name, v in values.items()}
+    result["latency_ms"] = np.array(latencies)
+    return result
+
+def _dataframe_path(analyzer: ParalinguisticAnalyzer, chunk: AudioChunk):
+    """The previous extraction: DataFrame per chunk, column lookups, fresh float32 copy."""
+    audio = np.frombuffer(chunk.data, dtype=np.int16).astype(np.float32) / 32768.0
+    df = analyzer.smile.process_signal(audio, chunk.sample_rate)
+    return [float(df.get(name, [0]).iloc[0]) for name in ParalinguisticAnalyzer.FUNCTIONALS]
+
+def _measure(func: Callable[[], object], iterations: int):
+    """(microseconds per call, peak bytes allocated during one call)"""
+    func() # Warm-up
+    per_call = min(timeit.repeat(func, number=iterations, repeat=3)) / iterations * 1e6
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return per_call, peak
+
+def micro(path: str, chunk_duration: float, iterations: int):
+    chunk = next(iter(AudioChunker(chunk_duration=chunk_duration, realtime=False).process_file_stream(path)))
+    chunk.data = bytes(chunk.data)
+    
+    cases = {"numpy": (lambda a=ParalinguisticAnalyzer(backend="numpy"): a.analyze(chunk))}
+    if OPENSMILE_AVAILABLE:
+        analyzer = ParalinguisticAnalyzer(backend="opensmile")
+        cases["opensmile (array)"] = lambda: analyzer.analyze(chunk)
+        cases["opensmile (DataFrame)"] = lambda: _dataframe_path(analyzer, chunk)
+    
+    print(f"Per-chunk cost ({chunk_duration:.1f}s chunk, best of 3 x {iterations}):")
+    for name, func in cases.items():
+        per_call, peak = _measure(func, iterations)
+        print(f"  {name:<22} {per_call:9.1f} us/chunk   peak alloc {peak / 1024:8.1f} KiB")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("files", nargs="+", help="WAV files (16kHz mono recommended)")
+    parser.add_argument("--chunk", type=float, default=1.0, help="Chunk duration in seconds")
+    parser.add_argument("--output", help="Optional JSON results file")
+    parser.add_argument("--micro", action="store_true", help="Micro-benchmark of the per-chunk hot path")
+    parser.add_argument("--iterations", type=int, default=50, help="Calls per timing run with --micro")
+    args = parser.parse_args()
+    
+    if args.micro:
+        micro(args.files[0], args.chunk, args.iterations)
+        return
+
+    backends = ["numpy"] + (["opensmile"] if OPENSMILE_AVAILABLE else [])
+    results = {}
+    for backend in backends:
+        analyzer = ParalinguisticAnalyzer(backend=backend)
+        run(analyzer, args.files[:1], args.chunk) # Warm-up
+        results[backend] = run(analyzer, args.files, args.chunk)
+        lat = results[backend]["latency_ms"]
+        print(f"{backend:<10} chunks={len(lat):<5} mean={lat.mean():7.2f}ms  p50={np.percentile(lat, 50):7.2f}ms  "
+              f"p95={np.percentile(lat, 95):7.2f}ms")
+
+    report = {backend: {"latency_ms_mean": float(r["latency_ms"].mean()),
+                        "latency_ms_p95": float(np.percentile(r["latency_ms"], 95))}
+              for backend, r in results.items()}
+
+    if "opensmile" in results:
+        print(f"Speed-up: {results['opensmile']['latency_ms'].mean() / results['numpy']['latency_ms'].mean():.1f}x")
+        agreement = {}
+        ours, ref = results["numpy"], results["opensmile"]
+        # Only chunks both backends found voiced
+        voiced = (ours["pitch_mean"] > 0) & (ref["pitch_mean"] > 0)
+        for name in FEATURES:
+            a, b = ours[name][voiced], ref[name][voiced]
+            corr = float(np.corrcoef(a, b)[0, 1]) if len(a) > 1 and a.std() and b.std() else float("nan")
+            mae = float(np.abs(a - b).mean()) if len(a) else float("nan")
+            agreement[name] = {"corr": corr, "mae": mae}
+            print(f"  {name:<15} corr={corr:6.3f}  mean |diff|={mae:.4f}")
+        report["agreement"] = agreement
+        report["voiced_chunks"] = int(voiced.sum())
+    else:
+        print("OpenSMILE not installed: agreement check skipped.")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.output}")
+
+if __name__ == "__main__":
+    main()
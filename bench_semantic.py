@@ -0,0 +1,176 @@
+"""
+Throughput and latency of the intent encoder under concurrent callers.
+
+N threads (one per simulated call) each encode a stream of utterances built from the
+prototype phrases, with and without micro-batching. The embedding cache is disabled
+so every utterance reaches the model. Reported per configuration: utterances per
+second, latency p50/p99 and the mean batch size.
+
+    python bench_semantic.py --callers 1,8,32 --utterances 200 --max-wait-ms 5
+
+--parity compares the int8 ONNX backend with the torch model instead: embedding
+cosine per SCAM_PROTOTYPES phrase, intent agreement on script-like utterances, and
+for each backend (in its own process) load time, single-utterance latency and peak RSS:
+
+    python bench_semantic.py --parity --output semantic_parity.json
+"""
+import argparse
+import json
+import multiprocessing as mp
+import random
+import resource
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List
+import numpy as np
+from src.semantic import SemanticAnalyzer, EmbeddingCache, TRANSFORMER_AVAILABLE
+from src.onnx_encoder import ONNX_AVAILABLE
+
+def utterances(n: int, seed: int) -> List[str]:
+    """Script-like sentences: one or two prototype phrases plus filler words."""
+    rng = random.Random(seed)
+    phrases = [p for group in SemanticAnalyzer.SCAM_PROTOTYPES.values() for p in group]
+    filler = ["sir", "please", "listen", "okay", "madam", "now", "ji", "actually"]
+    return [" ".join(rng.sample(phrases, rng.randint(1, 2)) + rng.sample(filler, rng.randint(0, 4)))
+            for _ in range(n)]
+
+def run(analyzer: SemanticAnalyzer, callers: int, per_caller: int) -> Dict:
+    latencies: List[float] = []
+    lock = threading.Lock()
+
+    def caller(i: int):
+        own = []
+        for text in utterances(per_caller, seed=i):
+            t0 = time.perf_counter()
+            analyzer.embed(text)
+            own.append(time.perf_counter() - t0)
+        with lock:
+            latencies.extend(own)
+
+    threads = [threading.Thread(target=caller, args=(i,)) for i in range(callers)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    lat_ms = np.array(latencies) * 1000
+    return {
+        "callers": callers,
+        "utterances": len(latencies),
+        "throughput": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(float(np.percentile(lat_ms, 50)), 2),
+        "p99_ms": round(float(np.percentile(lat_ms, 99)), 2),
+        "encoder": analyzer.encoder.stats() if analyzer.encoder else None,
+    }
+
+def profile(backend: str, n: int = 200) -> Dict:
+    """Load time, single-utterance latency and peak RSS of one backend (runs in its own process)."""
+    start = time.perf_counter()
+    analyzer = SemanticAnalyzer(cache=EmbeddingCache(max_entries=0), batch_max_size=1, backend=backend)
+    load_seconds = time.perf_counter() - start
+    texts = utterances(n, seed=0)
+    analyzer.embed(texts[0]) # Warm-up
+    latencies = []
+    for text in texts:
+        t0 = time.perf_counter()
+        analyzer.embed(text)
+        latencies.append(time.perf_counter() - t0)
+    lat_ms = np.array(latencies) * 1000
+    # ru_maxrss is in KiB on Linux, bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return {
+        "backend": analyzer.backend,
+        "load_seconds": round(load_seconds, 2),
+        "latency_ms_mean": round(float(lat_ms.mean()), 2),
+        "latency_ms_p99": round(float(np.percentile(lat_ms, 99)), 2),
+        "peak_rss_mb": round(rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024, 1),
+    }
+
+def parity(n: int) -> Dict:
+    """Embedding and intent agreement of the ONNX backend with the torch model."""
+    torch_sa = SemanticAnalyzer(cache=EmbeddingCache(max_entries=0), batch_max_size=1, backend="torch")
+    onnx_sa = SemanticAnalyzer(cache=EmbeddingCache(max_entries=0), batch_max_size=1, backend="onnx")
+    phrases = [p for group in SemanticAnalyzer.SCAM_PROTOTYPES.values() for p in group]
+    cosines = np.array([float(torch_sa.embed(p) @ onnx_sa.embed(p)) for p in phrases])
+    texts = utterances(n, seed=1)
+    torch_intents = [torch_sa.analyze(t) for t in texts]
+    onnx_intents = [onnx_sa.analyze(t) for t in texts]
+    agree = np.mean([a.label == b.label for a, b in zip(torch_intents, onnx_intents)])
+    conf_diff = np.array([abs(a.confidence - b.confidence) for a, b in zip(torch_intents, onnx_intents)])
+    return {
+        "prototype_cosine_mean": round(float(cosines.mean()), 4),
+        "prototype_cosine_min": round(float(cosines.min()), 4),
+        "worst_phrase": phrases[int(cosines.argmin())],
+        "intent_agreement": round(float(agree), 4),
+        "confidence_diff_max": round(float(conf_diff.max()), 4),
+        "utterances": n,
+    }
+
+def run_parity(args) -> Dict:
+    if not (TRANSFORMER_AVAILABLE and ONNX_AVAILABLE):
+        print("Parity check needs both sentence-transformers and onnxruntime.")
+        return {}
+    report = {"parity": parity(args.utterances)}
+    print(f"Parity: {report['parity']}")
+    report["backends"] = []
+    for backend in ("torch", "onnx"):
+        # Fresh interpreter per backend: peak RSS is that backend's own
+        with ProcessPoolExecutor(max_workers=1, mp_context=mp.get_context("spawn")) as pool:
+            r = pool.submit(profile, backend).result()
+        report["backends"].append(r)
+        print(f"{backend:<6} load={r['load_seconds']:6.2f}s  mean={r['latency_ms_mean']:6.2f}ms  "
+              f"p99={r['latency_ms_p99']:6.2f}ms  RSS={r['peak_rss_mb']:7.1f}MB")
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--callers", default="1,8,32", help="Comma-separated numbers of concurrent callers")
+    parser.add_argument("--utterances", type=int, default=100, help="Utterances per caller")
+    parser.add_argument("--max-batch", type=int, default=32, help="Micro-batch size limit")
+    parser.add_argument("--max-wait-ms", type=float, default=5.0, help="Micro-batch wait limit")
+    parser.add_argument("--backend", choices=SemanticAnalyzer.BACKENDS, default="torch", help="Encoder backend")
+    parser.add_argument("--parity", action="store_true", help="Compare the ONNX backend with torch instead")
+    parser.add_argument("--output", help="Optional JSON results file")
+    args = parser.parse_args()
+
+    if args.parity:
+        report = run_parity(args)
+        if args.output and report:
+            with open(args.output, "w") as f:
+                json.dump(report, f, indent=2)
+            print(f"Results written to {args.output}")
+        return
+
+    if not (TRANSFORMER_AVAILABLE or (args.backend == "onnx" and ONNX_AVAILABLE)):
+        print(f"No encoder available for the '{args.backend}' backend.")
+        return
+
+    configs = {
+        "unbatched": SemanticAnalyzer(cache=EmbeddingCache(max_entries=0), batch_max_size=1, backend=args.backend),
+        "batched": SemanticAnalyzer(cache=EmbeddingCache(max_entries=0), batch_max_size=args.max_batch,
+                                    batch_max_wait_ms=args.max_wait_ms, backend=args.backend),
+    }
+    run(configs["unbatched"], 1, 10) # Warm-up
+
+    results = []
+    for callers in [int(c) for c in args.callers.split(",")]:
+        row = {}
+        for name, analyzer in configs.items():
+            r = run(analyzer, callers, args.utterances)
+            row[name] = r
+            print(f"{name:<10} callers={callers:<4} {r['throughput']:8.1f} utt/s  p50={r['p50_ms']:7.2f}ms  "
+                  f"p99={r['p99_ms']:7.2f}ms")
+        print(f"  speed-up x{row['batched']['throughput'] / row['unbatched']['throughput']:.1f}")
+        results.append(row)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"backend": args.backend, "max_batch": args.max_batch, "max_wait_ms": args.max_wait_ms,
+                       "results": results}, f, indent=2)
+        print(f"Results written to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -4,7 +4,12 @@ import wave
 import struct
 import math
 import os
+import json
+import glob
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from src.pipeline import DetectionPipeline
+from src.fingerprint import FingerprintIndex
 
 def generate_dummy_wav(filename: str, duration: float = 10.0):
     """Generates a dummy WAV file with sine wave tone."""
@@ -23,19 +28,134 @@ def generate_dummy_wav(filename: str, duration: float = 10.0):
             data = struct.pack('<h', value)
             wf.writeframes(data)
 
+# Per-process pipeline for batch mode. Built once by the pool initializer so
+# every worker loads Vosk/SBERT a single time and reuses them for all its calls.
+_batch_pipeline = None
+
+def _init_batch_worker(use_mock_asr: bool, language: str, fingerprint_path: str = None,
+                       prosody_backend: str = "auto", semantic_backend: str = "torch"):
+    """Process pool initializer: loads the models once per worker."""
+    global _batch_pipeline
+    _batch_pipeline = DetectionPipeline(use_mock_asr=use_mock_asr, language=language, verbose=False,
+                                        fingerprint_path=fingerprint_path, prosody_backend=prosody_backend,
+                                        semantic_backend=semantic_backend, fingerprint_read_only=True)
+
+def _score_call(wav_path: str, output_dir: str):
+    """
+    Re-scores one recorded call at max speed and writes its risk timeline as JSONL.
+    
+    Returns:
+        tuple: (wav_path, number of timeline events, peak risk score, chunks skipped by VAD, total chunks,
+            the call's fingerprint recording for the parent's index or None)
+    """
+    call_id = os.path.splitext(os.path.basename(wav_path))[0]
+    out_path = os.path.join(output_dir, f"{call_id}.jsonl")
+    
+    _batch_pipeline.start_call(call_id=call_id)
+    n_events = 0
+    peak = 0.0
+    with open(out_path, "w") as f:
+        for event in _batch_pipeline.iter_file_timeline(wav_path, realtime=False):
+            f.write(json.dumps(event) + "\n")
+            n_events += 1
+            peak = max(peak, event["score"])
+    vad = _batch_pipeline.vad
+    skipped, total = (vad.chunks_skipped, vad.chunks_total) if vad else (0, 0)
+    recording = None
+    if _batch_pipeline.fingerprint_recording is not None:
+        recording = _batch_pipeline.fingerprint_index.export(_batch_pipeline.fingerprint_recording)
+    return wav_path, n_events, peak, skipped, total, recording
+
+def run_batch(input_dir: str, output_dir: str, workers: int, use_mock_asr: bool, language: str,
+              fingerprint_path: str = None, prosody_backend: str = "auto", semantic_backend: str = "torch"):
+    """
+    Scores every WAV in `input_dir` across a pool of worker processes.
+    
+    With `fingerprint_path`, every worker starts from the saved index (read-only);
+    the recordings indexed during the batch are merged into the parent's copy and
+    written once, after all calls are scored.
+    """
+    wav_files = sorted(glob.glob(os.path.join(input_dir, "*.wav")))
+    if not wav_files:
+        print(f"No WAV files found in {input_dir}")
+        return
+    
+    os.makedirs(output_dir, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+    print(f"Batch scoring {len(wav_files)} calls with {workers} workers -> {output_dir}")
+    
+    index = FingerprintIndex(path=fingerprint_path) if fingerprint_path else None
+    start = time.time()
+    done = 0
+    with ProcessPoolExecutor(max_workers=workers,
+                             initializer=_init_batch_worker,
+                             initargs=(use_mock_asr, language, fingerprint_path, prosody_backend,
+                                       semantic_backend)) as pool:
+        futures = {pool.submit(_score_call, path, output_dir): path for path in wav_files}
+        for future in as_completed(futures):
+            path = futures[future]
+            try:
+                _, n_events, peak, skipped, total, recording = future.result()
+                if index is not None and recording is not None:
+                    index.add(*recording)
+                done += 1
+                print(f"[{done}/{len(wav_files)}] {os.path.basename(path)}: {n_events} events, "
+                      f"peak risk {peak:.2f}, VAD skipped {skipped}/{total} chunks")
+            except Exception as e:
+                print(f"Failed to score {path}: {e}")
+    
+    if index is not None:
+        index.save_if_dirty()
+    print(f"Batch complete: {done}/{len(wav_files)} calls in {time.time() - start:.1f}s")
+
 def main():
     parser = argparse.ArgumentParser(description="AI Honeypot Detection System Demo")
     parser.add_argument("--file", type=str, help="Path to a WAV file to simulate (16kHz mono recommended).")
     parser.add_argument("--backend", choices=['vosk', 'mock'], default='mock', help="ASR backend to use.")
     parser.add_argument("--live", action='store_true', help="Use live microphone input instead of file.")
     parser.add_argument("--language", choices=['en', 'hi', 'mix'], default='en', help="Language code (en, hi, or mix).")
+    parser.add_argument("--max-speed", action='store_true', help="Process files as fast as possible instead of in real time.")
+    parser.add_argument("--batch", type=str, metavar="DIR", help="Score every WAV in DIR at max speed using a process pool.")
+    parser.add_argument("--output", type=str, default="timelines", help="Output directory for batch JSONL risk timelines.")
+    parser.add_argument("--workers", type=int, default=0, help="Batch worker processes / server analysis threads (default: CPU count).")
+    parser.add_argument("--serve", action='store_true', help="Run the TCP ingestion server for live calls from the SIP gateway.")
+    parser.add_argument("--host", type=str, default="0.0.0.0", help="Ingestion server bind address.")
+    parser.add_argument("--port", type=int, default=9300, help="Ingestion server port.")
+    parser.add_argument("--asr-workers", type=int, default=0, help="Decode ASR in this many worker processes (server mode).")
+    parser.add_argument("--fingerprint-cache", type=str, metavar="PATH",
+                        help="Recognize replayed recordings and reuse their analysis; index persisted to PATH (+ PATH.json).")
+    parser.add_argument("--prosody", choices=['auto', 'opensmile', 'numpy'], default='auto',
+                        help="Paralinguistic backend (auto: OpenSMILE if installed, else NumPy).")
+    parser.add_argument("--semantic", choices=['torch', 'onnx'], default='torch',
+                        help="Intent encoder backend (onnx: int8 ONNX Runtime, exported on first use).")
     args = parser.parse_args()
     
     # Initialize Pipeline
     use_mock_asr = (args.backend == 'mock')
     
+    if args.batch:
+        run_batch(args.batch, args.output, args.workers, use_mock_asr, args.language, args.fingerprint_cache, args.prosody,
+                  args.semantic)
+        return
+    
+    if args.serve:
+        import asyncio
+        from src.server import CallIngestionServer
+        pipeline = DetectionPipeline(use_mock_asr=use_mock_asr, language=args.language, verbose=False,
+                                     asr_workers=args.asr_workers, fingerprint_path=args.fingerprint_cache,
+                                     prosody_backend=args.prosody, semantic_backend=args.semantic)
+        server = CallIngestionServer(pipeline, host=args.host, port=args.port, workers=args.workers or None)
+        try:
+            asyncio.run(server.serve_forever())
+        except KeyboardInterrupt:
+            print("\nStopping server.")
+        return
+    
+    pipeline = None
     try:
-        pipeline = DetectionPipeline(use_mock_asr=use_mock_asr, language=args.language)
+        pipeline = DetectionPipeline(use_mock_asr=use_mock_asr, language=args.language,
+                                     fingerprint_path=args.fingerprint_cache, prosody_backend=args.prosody,
+                                     semantic_backend=args.semantic)
         
         if args.live:
             pipeline.process_microphone_simulation()
@@ -48,12 +168,15 @@ def main():
                     generate_dummy_wav(target_file)
                     print("No file provided. Generated 'dummy_call.wav' for simulation.")
             
-            pipeline.process_file_simulation(target_file)
+            pipeline.process_file_simulation(target_file, realtime=not args.max_speed)
         
     except KeyboardInterrupt:
         print("\nStopping simulation.")
     except Exception as e:
         print(f"Error: {e}")
+    finally:
+        if pipeline:
+            pipeline.close()
 
 if __name__ == "__main__":
     main()
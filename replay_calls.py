@@ -0,0 +1,82 @@
+"""
+Loopback test client for the call ingestion server (main.py --serve).
+
+Replays WAV files (16-bit PCM or G.711) over TCP as if they were live calls from
+the SIP gateway and prints the risk events the server sends back.
+
+    python replay_calls.py dummy_call.wav --copies 50 --realtime
+"""
+import argparse
+import asyncio
+import json
+import time
+from src.audio_chunker import MmapWavReader
+
+FRAME_MS = 20 # Gateway packetization interval
+
+async def replay(path: str, call_id: str, host: str, port: int, realtime: bool) -> dict:
+    reader_wav = MmapWavReader(path)
+    reader, writer = await asyncio.open_connection(host, port)
+
+    header = {
+        "call_id": call_id,
+        "encoding": reader_wav.encoding,
+        "sample_rate": reader_wav.sample_rate,
+        "channels": reader_wav.channels,
+    }
+    writer.write((json.dumps(header) + "\n").encode())
+
+    async def send_audio():
+        frames_per_packet = int(reader_wav.sample_rate * FRAME_MS / 1000)
+        start = time.time()
+        for i, first in enumerate(range(0, reader_wav.n_frames, frames_per_packet)):
+            writer.write(reader_wav.view(first, min(first + frames_per_packet, reader_wav.n_frames)))
+            await writer.drain() # Honours the server's backpressure
+            if realtime:
+                delay = start + (i + 1) * FRAME_MS / 1000 - time.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+        writer.write_eof()
+
+    sender = asyncio.create_task(send_audio())
+    summary = {}
+    events = 0
+    while True:
+        line = await reader.readline()
+        if not line:
+            break
+        msg = json.loads(line)
+        if msg.get("done") or "error" in msg:
+            summary = msg
+            break
+        events += 1
+        print(f"[{call_id}] t={msg['offset']:.1f}s {msg['level']:<8} {msg['score']:.2f} '{msg['text']}'")
+
+    await sender
+    writer.close()
+    reader_wav.close()
+    summary["events"] = events
+    return summary
+
+async def run(args):
+    start = time.time()
+    tasks = [
+        replay(path, f"{path}#{i}", args.host, args.port, args.realtime)
+        for path in args.files for i in range(args.copies)
+    ]
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+    for r in results:
+        print(r)
+    print(f"Replayed {len(tasks)} calls in {time.time() - start:.1f}s")
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay WAV files to the call ingestion server")
+    parser.add_argument("files", nargs="+", help="WAV files to replay")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9300)
+    parser.add_argument("--copies", type=int, default=1, help="Concurrent calls per file")
+    parser.add_argument("--realtime", action="store_true", help="Pace audio at real-time speed")
+    asyncio.run(run(parser.parse_args()))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,334 @@
+import atexit
+import itertools
+import multiprocessing as mp
+import queue
+import threading
+import time
+import uuid
+import weakref
+from concurrent.futures import Future
+from multiprocessing import shared_memory
+from queue import Queue
+from typing import Optional, Dict, List, Tuple
+
+from .models import AudioChunk, TranscriptSegment
+from .asr_service import ASRService, VOSK_AVAILABLE, vosk_model_path
+
+def _worker_main(worker_id: int, language: str, shm_name: str, slot_bytes: int,
+                 requests: mp.Queue, results: mp.Queue):
+    """
+    ASR worker process: owns the models and one recognizer stream per pinned call.
+    Audio arrives in shared-memory slots; only small control tuples are pickled.
+    
+    The first message on `results` is the startup handshake: (None, None, "ready", None),
+    or (None, None, None, error) if the models couldn't be loaded.
+    """
+    # Attach only: the parent created the segment and unlinks it on shutdown
+    shm = shared_memory.SharedMemory(name=shm_name)
+
+    try:
+        from .asr_service import VoskASRService, MultiVoskASRService
+        template = MultiVoskASRService(adaptive=True) if language == "mix" else VoskASRService(language=language)
+    except Exception as e:
+        results.put((None, None, None, repr(e)))
+        shm.close()
+        return
+    streams: Dict[str, ASRService] = {}
+    results.put((None, None, "ready", None))
+    print(f"[ASRPool] Worker {worker_id} ready ({language}).")
+
+    while True:
+        msg = requests.get()
+        kind = msg[0]
+        if kind == "stop":
+            break
+        if kind == "close":
+            streams.pop(msg[1], None)
+            continue
+
+        req_id, call_id = msg[1], msg[2]
+        try:
+            stream = streams.get(call_id)
+            if stream is None and kind == "chunk":
+                stream = streams[call_id] = template.new_stream()
+
+            if kind == "chunk":
+                _, _, _, slot, nbytes, sample_rate, offset, timestamp, duration = msg
+                start = slot * slot_bytes
+                chunk = AudioChunk(
+                    data=bytes(shm.buf[start:start + nbytes]), # Vosk needs bytes
+                    timestamp=timestamp,
+                    duration=duration,
+                    sample_rate=sample_rate,
+                    offset=offset
+                )
+                results.put((req_id, slot, stream.process_chunk(chunk), None))
+            elif kind == "stats":
+                # Unknown / closed call: nothing to report (don't create a recognizer for it)
+                results.put((req_id, None, stream.stats() if stream else {}, None))
+            elif kind == "flush":
+                results.put((req_id, None, stream.flush() if stream else None, None))
+        except Exception as e:
+            results.put((req_id, msg[3] if kind == "chunk" else None, None, repr(e)))
+
+    shm.close()
+
+class ASRWorkerPool:
+    """
+    Pool of ASR worker processes fed through shared memory.
+
+    Each worker loads the Vosk model(s) once and keeps a recognizer per call. A call
+    is pinned to one worker for its whole life (a KaldiRecognizer is stateful), and
+    new calls go to the worker with the fewest active calls, so load spreads across
+    all cores.
+
+    Audio hand-off: every worker has a shared-memory segment split into fixed-size
+    slots. The parent copies a chunk's fresh audio into a free slot and sends only the
+    slot index; the slot is returned when the worker replies. If all of a worker's
+    slots are busy, submitters block (backpressure).
+
+    Startup waits for every worker to load its models and raises if one can't. If a
+    worker dies later, its in-flight requests fail with RuntimeError, as does any
+    further request pinned to it.
+    """
+
+    _shared: Dict[str, "ASRWorkerPool"] = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(self, language: str = "en", workers: Optional[int] = None,
+                 slots_per_worker: int = 64, slot_bytes: int = 64000, startup_timeout: float = 300.0):
+        """
+        Args:
+            language (str): 'en', 'hi' or 'mix' (decoded by each worker).
+            workers (Optional[int]): Number of worker processes (default: CPU count).
+            slots_per_worker (int): Chunks that can be in flight per worker.
+            slot_bytes (int): Largest chunk accepted (64000 bytes = 2 s of 16 kHz int16).
+            startup_timeout (float): Longest wait (seconds) for the workers to load their models.
+        
+        Raises:
+            FileNotFoundError: If a Vosk model isn't downloaded (checked before spawning).
+            RuntimeError: If a worker fails to start.
+        """
+        for lang in (("en", "hi") if language == "mix" else (language,)):
+            vosk_model_path(lang)
+        self.language = language
+        self.n_workers = workers or mp.cpu_count()
+        self.slot_bytes = slot_bytes
+        ctx = mp.get_context("spawn") # Parent may already run threads; don't fork them
+
+        self._ids = itertools.count()
+        # req_id -> (worker_id, shared-memory slot or None, future)
+        self._futures: Dict[int, Tuple[int, Optional[int], Future]] = {}
+        self._futures_lock = threading.Lock()
+        self._dead = [False] * self.n_workers
+        self._closing = False
+        self._calls_per_worker = [0] * self.n_workers
+        self._assign_lock = threading.Lock()
+
+        self._shm: List[shared_memory.SharedMemory] = []
+        self._free_slots: List[Queue] = []
+        self._requests: List[mp.Queue] = []
+        self._procs = []
+        self._dispatchers = []
+
+        for worker_id in range(self.n_workers):
+            shm = shared_memory.SharedMemory(create=True, size=slots_per_worker * slot_bytes)
+            free = Queue()
+            for slot in range(slots_per_worker):
+                free.put(slot)
+            requests, results = ctx.Queue(), ctx.Queue()
+            proc = ctx.Process(target=_worker_main, name=f"asr-worker-{worker_id}", daemon=True,
+                               args=(worker_id, language, shm.name, slot_bytes, requests, results))
+            proc.start()
+
+            self._shm.append(shm)
+            self._free_slots.append(free)
+            self._requests.append(requests)
+            self._procs.append(proc)
+            self._dispatchers.append((None, results))
+
+        atexit.register(self.shutdown)
+        deadline = time.monotonic() + startup_timeout
+        for worker_id, (proc, (_, results)) in enumerate(zip(self._procs, self._dispatchers)):
+            error = self._await_ready(proc, results, deadline)
+            if error:
+                self.shutdown()
+                raise RuntimeError(f"ASR worker {worker_id} failed to start: {error}")
+        for worker_id, (proc, (_, results)) in enumerate(zip(self._procs, self._dispatchers)):
+            dispatcher = threading.Thread(target=self._dispatch, args=(worker_id, proc, results),
+                                          name=f"asr-dispatch-{worker_id}", daemon=True)
+            dispatcher.start()
+            self._dispatchers[worker_id] = (dispatcher, results)
+        print(f"[ASRPool] Started {self.n_workers} ASR worker processes ({language}).")
+
+    @classmethod
+    def shared(cls, language: str = "en", workers: Optional[int] = None) -> "ASRWorkerPool":
+        """Process-wide pool per language, started on first use."""
+        with cls._shared_lock:
+            pool = cls._shared.get(language)
+            if pool is None:
+                pool = cls._shared[language] = cls(language=language, workers=workers)
+            return pool
+
+    @staticmethod
+    def _await_ready(proc, results: mp.Queue, deadline: float) -> Optional[str]:
+        """Waits for a worker's startup handshake. Returns the error, or None once it's ready."""
+        while True:
+            try:
+                _, _, payload, error = results.get(timeout=0.5)
+                return error if payload != "ready" else None
+            except queue.Empty:
+                if not proc.is_alive():
+                    return f"exited with code {proc.exitcode} during startup"
+                if time.monotonic() > deadline:
+                    return "timed out loading models"
+
+    def _dispatch(self, worker_id: int, proc, results: mp.Queue):
+        """Routes a worker's replies to the waiting futures and recycles slots."""
+        while True:
+            try:
+                msg = results.get(timeout=0.5)
+            except queue.Empty:
+                if self._closing:
+                    break
+                if not proc.is_alive():
+                    self._worker_died(worker_id, proc)
+                    break
+                continue
+            if msg is None:
+                break
+            req_id, slot, payload, error = msg
+            if slot is not None:
+                self._free_slots[worker_id].put(slot)
+            with self._futures_lock:
+                _, _, future = self._futures.pop(req_id, (None, None, None))
+            if future is None:
+                continue
+            if error:
+                future.set_exception(RuntimeError(f"ASR worker {worker_id}: {error}"))
+            else:
+                future.set_result(payload)
+
+    def _worker_died(self, worker_id: int, proc):
+        """Fails every request still waiting on a dead worker and returns their slots."""
+        with self._futures_lock:
+            self._dead[worker_id] = True
+            lost = [req_id for req_id, (wid, _, _) in self._futures.items() if wid == worker_id]
+            pending = [self._futures.pop(req_id) for req_id in lost]
+        print(f"[ASRPool] Worker {worker_id} died (exit code {proc.exitcode}); "
+              f"failing {len(pending)} pending requests.")
+        error = RuntimeError(f"ASR worker {worker_id} died (exit code {proc.exitcode})")
+        for _, slot, future in pending:
+            if slot is not None:
+                self._free_slots[worker_id].put(slot)
+            future.set_exception(error)
+
+    def assign(self) -> int:
+        """Pins a new call to the least-loaded worker."""
+        with self._assign_lock:
+            worker_id = min(range(self.n_workers), key=self._calls_per_worker.__getitem__)
+            self._calls_per_worker[worker_id] += 1
+            return worker_id
+
+    def release(self, worker_id: int, call_id: str):
+        """Ends a call: the worker drops its recognizer stream."""
+        with self._assign_lock:
+            self._calls_per_worker[worker_id] -= 1
+        self.close_stream(worker_id, call_id)
+
+    def close_stream(self, worker_id: int, call_id: str):
+        self._requests[worker_id].put(("close", call_id))
+
+    def _new_future(self, worker_id: int, slot: Optional[int] = None) -> Tuple[int, Future]:
+        req_id = next(self._ids)
+        future = Future()
+        with self._futures_lock:
+            if self._dead[worker_id]:
+                if slot is not None:
+                    self._free_slots[worker_id].put(slot)
+                raise RuntimeError(f"ASR worker {worker_id} is not running")
+            self._futures[req_id] = (worker_id, slot, future)
+        return req_id, future
+
+    def submit(self, worker_id: int, call_id: str, chunk: AudioChunk) -> Future:
+        """
+        Copies the chunk's fresh audio into a shared-memory slot and queues it for the call's worker.
+        """
+        data = chunk.fresh_data
+        nbytes = len(data)
+        if nbytes > self.slot_bytes:
+            raise ValueError(f"Chunk of {nbytes} bytes exceeds the {self.slot_bytes}-byte shared memory slot")
+
+        if self._dead[worker_id]:
+            raise RuntimeError(f"ASR worker {worker_id} is not running")
+        slot = self._free_slots[worker_id].get() # Blocks while the worker is saturated
+        req_id, future = self._new_future(worker_id, slot)
+        start = slot * self.slot_bytes
+        self._shm[worker_id].buf[start:start + nbytes] = data
+
+        self._requests[worker_id].put(("chunk", req_id, call_id, slot, nbytes, chunk.sample_rate,
+                                       chunk.fresh_offset, chunk.timestamp, chunk.duration))
+        return future
+
+    def stats(self, worker_id: int, call_id: str) -> Dict[str, int]:
+        req_id, future = self._new_future(worker_id)
+        self._requests[worker_id].put(("stats", req_id, call_id))
+        return future.result()
+
+    def flush(self, worker_id: int, call_id: str) -> Future:
+        req_id, future = self._new_future(worker_id)
+        self._requests[worker_id].put(("flush", req_id, call_id))
+        return future
+
+    def shutdown(self):
+        """Stops the workers and frees the shared memory."""
+        if not self._procs:
+            return
+        self._closing = True
+        for requests in self._requests:
+            requests.put(("stop",))
+        for proc in self._procs:
+            proc.join(timeout=5)
+            if proc.is_alive():
+                proc.terminate() # Still loading its models, or stuck
+        for _, results in self._dispatchers:
+            results.put(None)
+        for shm in self._shm:
+            shm.close()
+            shm.unlink()
+        self._procs = []
+
+class ProcessPoolASRService(ASRService):
+    """
+    ASR engine backed by `ASRWorkerPool`: decoding runs in worker processes, so ASR
+    scales with cores instead of being bound to one interpreter.
+
+    Each instance is one call pinned to one worker. `new_stream()` pins another call.
+    """
+
+    def __init__(self, language: str = "en", workers: Optional[int] = None,
+                 pool: Optional[ASRWorkerPool] = None):
+        if not VOSK_AVAILABLE:
+            raise ImportError("Vosk library is not installed.")
+        self.pool = pool or ASRWorkerPool.shared(language, workers)
+        self.call_id = uuid.uuid4().hex
+        self.worker_id = self.pool.assign()
+        # Free the worker-side recognizer when this call object goes away
+        self._finalizer = weakref.finalize(self, self.pool.release, self.worker_id, self.call_id)
+
+    def process_chunk(self, chunk: AudioChunk) -> Optional[TranscriptSegment]:
+        return self.pool.submit(self.worker_id, self.call_id, chunk).result()
+
+    def flush(self) -> Optional[TranscriptSegment]:
+        return self.pool.flush(self.worker_id, self.call_id).result()
+
+    def reset(self):
+        self.pool.close_stream(self.worker_id, self.call_id)
+
+    def new_stream(self) -> "ProcessPoolASRService":
+        return ProcessPoolASRService(pool=self.pool)
+
+    def stats(self) -> Dict[str, int]:
+        stats = dict(self.pool.stats(self.worker_id, self.call_id))
+        stats["asr_worker"] = self.worker_id
+        return stats
@@ -1,9 +1,15 @@
 from abc import ABC, abstractmethod
+import copy
 import json
 import os
 import sys
-from typing import Optional
-from .models import AudioChunk, TranscriptSegment
+import threading
+from concurrent.futures import ThreadPoolExecutor, Future, wait
+from dataclasses import replace
+from typing import Optional, Dict, List
+import numpy as np
+from .models import AudioChunk, TranscriptSegment, WORD_TIMING_DTYPE
+from .registry import registry
 
 # Try importing vosk, handle failure if not installed
 try:
@@ -13,6 +19,28 @@ except ImportError as e:
     VOSK_AVAILABLE = False
     print(f"[ASRService] Warning: 'vosk' import failed: {e}")
 
+VOSK_MODEL_PATHS = {
+    "en": "models/vosk-model-small-en-us-0.15",
+    "hi": "models/vosk-model-small-hi-0.22"
+}
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def vosk_model_path(language: str) -> str:
+    """
+    Absolute path of the Vosk model for `language` ('en' or 'hi'; anything else is 'en').
+    
+    Looked up relative to the working directory first, then to the project root, so
+    worker processes started from elsewhere resolve the same model.
+    
+    Raises:
+        FileNotFoundError: If the model isn't downloaded.
+    """
+    relative = VOSK_MODEL_PATHS.get(language, VOSK_MODEL_PATHS["en"])
+    for path in (os.path.abspath(relative), os.path.join(_PROJECT_ROOT, relative)):
+        if os.path.isdir(path):
+            return path
+    raise FileNotFoundError(f"Vosk model not found at '{relative}'. Please download it.")
+
 class ASRService(ABC):
     """
     Abstract Base Class for Automatic Speech Recognition services.
@@ -32,6 +60,33 @@ class ASRService(ABC):
         """
         pass
 
+    def reset(self):
+        """
+        Drops any per-call decoding state so the service can be reused for a new call.
+        Loaded models are kept.
+        """
+        pass
+
+    def new_stream(self) -> "ASRService":
+        """
+        Returns an independent service for another concurrent call.
+        Implementations should share loaded models and only create fresh decoding state.
+        """
+        return self.__class__()
+
+    def stats(self) -> Dict[str, int]:
+        """Per-call counters (e.g. how many partial results were suppressed)."""
+        return {}
+
+    def flush(self) -> Optional[TranscriptSegment]:
+        """
+        Finalizes the utterance still in progress at the end of the stream.
+        
+        Returns:
+            Optional[TranscriptSegment]: The last final result, or None if nothing was pending.
+        """
+        return None
+
 class VoskASRService(ASRService):
     """
     Implementation of ASR using the offline Vosk engine.
@@ -40,34 +95,79 @@ class VoskASRService(ASRService):
         - ASR Processing: 150-300ms typical for small models.
     """
     
-    def __init__(self, language: str = "en"):
+    def __init__(self, language: str = "en", partial_interval_ms: float = 300.0, partial_deltas: bool = True):
         """
         Initialize Vosk model.
         
         Args:
             language (str): 'en' or 'hi'.
+            partial_interval_ms (float): Minimum stream time between two emitted partial results.
+            partial_deltas (bool): Emit partials as word deltas (see `TranscriptSegment.is_delta`)
+                instead of the full hypothesis.
         """
         if not VOSK_AVAILABLE:
             raise ImportError("Vosk library is not installed.")
             
-        model_paths = {
-            "en": "models/vosk-model-small-en-us-0.15",
-            "hi": "models/vosk-model-small-hi-0.22"
-        }
-        
-        model_path = model_paths.get(language, model_paths["en"])
-            
-        if not os.path.exists(model_path):
-             raise FileNotFoundError(f"Vosk model not found at '{model_path}'. Please download it.")
+        model_path = vosk_model_path(language)
              
-        print(f"[ASRService] Loading Vosk model for '{language}' from {model_path}...")
-        self.model = Model(model_path)
+        # The Model is loaded once per process and shared by every call;
+        # each service instance only owns its (cheap) KaldiRecognizer.
+        self.model = registry.get(("vosk", model_path), lambda: Model(model_path))
         # We don't initialize the recognizer here because it needs sample_rate
         # We will initialize it on the first chunk or require it in init.
         # For simplicity, we'll lazy init or assume 16k.
         self.recognizer = None
         self.sample_rate = 16000 # Default
-        print("[ASRService] Vosk model loaded successfully.")
+        
+        # Partial-result throttling: a partial is only emitted when its words changed
+        # and at most every `partial_interval_ms`; everything else never reaches the
+        # (expensive) semantic + scoring stages.
+        self.partial_interval_ms = partial_interval_ms
+        self.partial_deltas = partial_deltas
+        self._reset_partials()
+        self.counters = dict.fromkeys(
+            ("finals", "partials_emitted", "partials_unchanged", "partials_throttled"), 0)
+
+    def _reset_partials(self):
+        self._last_partial_words = []
+        self._last_partial_offset = float("-inf")
+
+    def _reset_clock(self):
+        """
+        Vosk reports word times in seconds of audio *fed to the recognizer*. Chunks the
+        VAD skipped never reach it, so we keep breakpoints mapping recognizer time back
+        to stream time (one entry per discontinuity, not per chunk).
+        """
+        self._fed_seconds = 0.0
+        self._clock_fed = [] # Recognizer time at each breakpoint
+        self._clock_stream = [] # Stream time at the same breakpoint
+
+    def _advance_clock(self, stream_offset: float, seconds: float):
+        """Records that `seconds` of audio starting at `stream_offset` were fed."""
+        if self._clock_fed:
+            expected = self._clock_stream[-1] + (self._fed_seconds - self._clock_fed[-1])
+        if not self._clock_fed or abs(stream_offset - expected) > 1e-3:
+            self._clock_fed.append(self._fed_seconds)
+            self._clock_stream.append(stream_offset)
+        self._fed_seconds += seconds
+
+    def _to_stream_time(self, t: np.ndarray) -> np.ndarray:
+        """Maps recognizer-relative times to stream-relative times."""
+        fed = np.asarray(self._clock_fed)
+        idx = np.maximum(np.searchsorted(fed, t, side="right") - 1, 0)
+        return np.asarray(self._clock_stream)[idx] + (t - fed[idx])
+
+    def _word_timings(self, words: List[Dict]) -> np.ndarray:
+        """Converts Vosk's SetWords() output into a compact stream-relative array."""
+        timings = np.empty(len(words), dtype=WORD_TIMING_DTYPE)
+        timings["start"] = self._to_stream_time(np.array([w.get("start", 0.0) for w in words]))
+        timings["end"] = self._to_stream_time(np.array([w.get("end", 0.0) for w in words]))
+        timings["conf"] = [w.get("conf", 1.0) for w in words]
+        
+        # Breakpoints before this utterance are no longer needed
+        keep = max(np.searchsorted(self._clock_fed, words[-1].get("end", 0.0), side="right") - 1, 0)
+        del self._clock_fed[:keep], self._clock_stream[:keep]
+        return timings
 
     def process_chunk(self, chunk: AudioChunk) -> Optional[TranscriptSegment]:
         """
@@ -77,54 +177,252 @@ class VoskASRService(ASRService):
         if self.recognizer is None or self.sample_rate != chunk.sample_rate:
             self.sample_rate = chunk.sample_rate
             self.recognizer = KaldiRecognizer(self.model, self.sample_rate)
+            self.recognizer.SetWords(True) # Per-word times and confidences in final results
+            self._reset_clock()
             
-        # Vosk expects bytes
+        # Vosk expects bytes (its cffi binding won't take a memoryview), and must only
+        # see each sample once, so we skip the part overlapping the previous chunk.
+        if isinstance(chunk.data, bytes) and not chunk.overlap_bytes:
+            data = chunk.data
+        else:
+            data = bytes(chunk.fresh_data)
+        if not data:
+            return None
+        self._advance_clock(chunk.fresh_offset, len(data) / (2 * self.sample_rate))
+        
         # AcceptWaveform returns True if a result (silence pause) is available
-        if self.recognizer.AcceptWaveform(chunk.data):
-            res = json.loads(self.recognizer.Result())
-            text = res.get("text", "")
-            if text:
-                return TranscriptSegment(
-                    text=text,
-                    start_time=chunk.timestamp, # Approx
-                    end_time=chunk.timestamp + chunk.duration,
-                    confidence=1.0, # Vosk basic result doesn't always have conf per word easily in this mode
-                    is_final=True
-                )
+        if self.recognizer.AcceptWaveform(data):
+            return self._final_result(json.loads(self.recognizer.Result()),
+                                      chunk.fresh_offset, chunk.offset + chunk.duration)
         else:
-            # Partial result
-            res = json.loads(self.recognizer.PartialResult())
-            partial = res.get("partial", "")
-            if partial:
-                 return TranscriptSegment(
-                    text=partial,
-                    start_time=chunk.timestamp,
-                    end_time=chunk.timestamp + chunk.duration,
-                    confidence=0.5,
-                    is_final=False
-                )
+            return self._partial_result(chunk)
+
+    def _final_result(self, res: Dict, start_time: float, end_time: float) -> Optional[TranscriptSegment]:
+        """
+        Builds a final segment from a Vosk result. `start_time`/`end_time` are only
+        used when the result has no word timings.
+        """
+        text = res.get("text", "")
+        if not text:
+            return None
+        self._reset_partials()
+        self.counters["finals"] += 1
+        words = res.get("result", [])
+        if not words:
+            return TranscriptSegment(
+                text=text,
+                start_time=start_time,
+                end_time=end_time,
+                confidence=1.0,
+                is_final=True
+            )
+        timings = self._word_timings(words)
+        return TranscriptSegment(
+            text=text,
+            start_time=float(timings["start"][0]),
+            end_time=float(timings["end"][-1]),
+            confidence=float(timings["conf"].mean()), # Mean word confidence
+            is_final=True,
+            words=timings
+        )
+
+    def _partial_result(self, chunk: AudioChunk) -> Optional[TranscriptSegment]:
+        """
+        Returns the current partial hypothesis, unless it is throttled or unchanged.
+        """
+        # Throttle before even asking Vosk for the partial (saves the JSON round trip)
+        if (chunk.offset - self._last_partial_offset) * 1000 < self.partial_interval_ms:
+            self.counters["partials_throttled"] += 1
+            return None
         
-        return None
+        res = json.loads(self.recognizer.PartialResult())
+        words = res.get("partial", "").split()
+        if not words or words == self._last_partial_words:
+            self.counters["partials_unchanged"] += 1
+            return None
+        
+        previous = self._last_partial_words
+        self._last_partial_words = words
+        self._last_partial_offset = chunk.offset
+        self.counters["partials_emitted"] += 1
+        
+        revised = 0
+        if self.partial_deltas:
+            common = 0
+            for old_word, new_word in zip(previous, words):
+                if old_word != new_word:
+                    break
+                common += 1
+            revised = len(previous) - common
+            words = words[common:]
+        
+        return TranscriptSegment(
+            text=" ".join(words),
+            start_time=chunk.fresh_offset,
+            end_time=chunk.offset + chunk.duration,
+            confidence=0.5,
+            is_final=False,
+            is_delta=self.partial_deltas,
+            revised_words=revised
+        )
 
-        return None
+    def flush(self) -> Optional[TranscriptSegment]:
+        if self.recognizer is None or not self._clock_fed:
+            return None
+        end = float(self._to_stream_time(np.array([self._fed_seconds]))[0])
+        return self._final_result(json.loads(self.recognizer.FinalResult()), self._clock_stream[-1], end)
+
+    def reset(self):
+        """Discards the recognizer; a fresh one is built on the next chunk."""
+        self.recognizer = None
+        self._reset_partials()
+        self._reset_clock()
+        self.counters = dict.fromkeys(self.counters, 0)
+
+    def new_stream(self) -> "VoskASRService":
+        """Shares the loaded Model; the new stream builds its own KaldiRecognizer."""
+        stream = copy.copy(self)
+        stream.reset()
+        return stream
+
+    def stats(self) -> Dict[str, int]:
+        return dict(self.counters)
+
+def _merge_final(first: TranscriptSegment, second: Optional[TranscriptSegment]) -> TranscriptSegment:
+    """
+    Joins a late final result with the one that follows it. A following partial is
+    dropped (the next chunk's partial supersedes it).
+    """
+    if second is None or not second.is_final:
+        return first
+    words = None
+    if first.words is not None and second.words is not None:
+        words = np.concatenate((first.words, second.words))
+    n_first, n_second = len(first.text.split()), len(second.text.split())
+    return replace(
+        first,
+        text=f"{first.text} {second.text}",
+        end_time=second.end_time,
+        confidence=(first.confidence * n_first + second.confidence * n_second) / (n_first + n_second),
+        words=words
+    )
+
+# Shared by every MultiVoskASRService in the process, so hundreds of calls don't
+# each spawn their own threads.
+_asr_pool: Optional[ThreadPoolExecutor] = None
+_asr_pool_lock = threading.Lock()
+
+def _asr_executor() -> ThreadPoolExecutor:
+    global _asr_pool
+    with _asr_pool_lock:
+        if _asr_pool is None:
+            _asr_pool = ThreadPoolExecutor(max_workers=max(2, os.cpu_count() or 1),
+                                           thread_name_prefix="asr")
+        return _asr_pool
 
 class MultiVoskASRService(ASRService):
     """
     Runs English and Hindi ASR models in parallel to support mixed-language usage.
+    
+    Both recognizers decode each chunk concurrently on a shared thread pool (Kaldi
+    releases the GIL), so mixed mode costs roughly one decode of latency instead of two.
+    A recognizer that misses the per-chunk deadline is left to finish in the background;
+    its result is picked up on the next chunk so no final utterance is lost.
+    
+    Adaptive mode (opt-in): once one language's smoothed word confidence is high enough (and
+    clearly ahead), the service locks in to it and frees the other recognizer, halving
+    ASR work. If the locked language's confidence drops, dual decoding resumes.
     """
-    def __init__(self):
+    def __init__(self, deadline_ms: float = 250.0, parallel: bool = True,
+                 adaptive: bool = False, lock_threshold: float = 0.8, unlock_threshold: float = 0.6,
+                 lock_margin: float = 0.1, min_finals: int = 3):
+        """
+        Args:
+            deadline_ms (float): How long to wait for both recognizers before deciding with what's ready.
+            parallel (bool): Decode on the thread pool. False runs the recognizers back to back.
+            adaptive (bool): Lock in to one language once it is clearly the call's language.
+            lock_threshold (float): Smoothed word confidence a language needs before locking in.
+            unlock_threshold (float): Locked language's confidence below which dual decoding resumes.
+            lock_margin (float): Required lead over the other language's confidence.
+            min_finals (int): Final utterances a language must produce before it can be locked in.
+        """
         print("[ASRService] Initializing Multi-Language Mode (En + Hi)...")
         # Initialize both sub-services
-        self.service_en = VoskASRService(language='en')
-        self.service_hi = VoskASRService(language='hi')
+        # Sub-services emit full partial strings: they are compared against each other
+        self.service_en = VoskASRService(language='en', partial_deltas=False)
+        self.service_hi = VoskASRService(language='hi', partial_deltas=False)
+        self.deadline = deadline_ms / 1000.0
+        self.parallel = parallel
+        self.deadline_misses = 0
+        self._pending: Dict[str, Future] = {} # Late decodes still running, per language
+        self._carry: Dict[str, TranscriptSegment] = {} # Final results that arrived late
+        
+        self.adaptive = adaptive
+        self.lock_threshold = lock_threshold
+        self.unlock_threshold = unlock_threshold
+        self.lock_margin = lock_margin
+        self.min_finals = min_finals
+        self._reset_language_state()
+
+    def _reset_language_state(self):
+        self.locked_language: Optional[str] = None
+        self.language_confidence: Dict[str, Optional[float]] = {"en": None, "hi": None}
+        self.language_finals: Dict[str, int] = {"en": 0, "hi": 0}
+        self.chunks_dual = 0
+        self.chunks_single = 0
+
+    def _services(self) -> Dict[str, VoskASRService]:
+        return {"en": self.service_en, "hi": self.service_hi}
+
+    def stats(self) -> Dict[str, int]:
+        totals = {"deadline_misses": self.deadline_misses,
+                  "chunks_dual": self.chunks_dual, "chunks_single": self.chunks_single}
+        for service in self._services().values():
+            for key, value in service.stats().items():
+                totals[key] = totals.get(key, 0) + value
+        return totals
+
+    def reset(self):
+        for future in self._pending.values():
+            future.result()
+        self._pending = {}
+        self._carry = {}
+        self._reset_language_state()
+        self.service_en.reset()
+        self.service_hi.reset()
+
+    def new_stream(self) -> "MultiVoskASRService":
+        stream = copy.copy(self)
+        stream.service_en = self.service_en.new_stream()
+        stream.service_hi = self.service_hi.new_stream()
+        stream.deadline_misses = 0
+        stream._pending = {}
+        stream._carry = {}
+        stream._reset_language_state()
+        return stream
         
     def process_chunk(self, chunk: AudioChunk) -> Optional[TranscriptSegment]:
-        # Run both processes
-        # Note: Sequential for simplicity, but Vosk is fast enough.
-        # Ideally this would be threaded.
+        if self.locked_language:
+            return self._decode_locked(chunk)
+        
+        self.chunks_dual += 1
+        if self.parallel:
+            results = self._decode_parallel(chunk)
+        else:
+            results = {lang: service.process_chunk(chunk) for lang, service in self._services().items()}
+        
+        if self.adaptive:
+            for lang, segment in results.items():
+                self._observe(lang, segment)
+            self._maybe_lock()
         
-        res_en = self.service_en.process_chunk(chunk)
-        res_hi = self.service_hi.process_chunk(chunk)
+        return self._pick(results)
+
+    @staticmethod
+    def _pick(results: Dict[str, Optional[TranscriptSegment]]) -> Optional[TranscriptSegment]:
+        """Chooses between the English and Hindi hypotheses for the same audio."""
+        res_en = results.get("en")
+        res_hi = results.get("hi")
         
         # Heuristic: Pick the one that has text.
         # If both have text, pick the longer one (usually correct model produces more coherent/longer words)
@@ -147,6 +445,104 @@ class MultiVoskASRService(ASRService):
         else:
              return res_hi
 
+    def flush(self) -> Optional[TranscriptSegment]:
+        for lang, future in self._pending.items():
+            self._keep_if_final(lang, future.result())
+        self._pending = {}
+        
+        languages = [self.locked_language] if self.locked_language else ["en", "hi"]
+        results = {}
+        for lang in languages:
+            segment = self._services()[lang].flush()
+            carried = self._carry.pop(lang, None)
+            results[lang] = _merge_final(carried, segment) if carried is not None else segment
+        return self._pick(results)
+
+    def _decode_parallel(self, chunk: AudioChunk) -> Dict[str, Optional[TranscriptSegment]]:
+        """
+        Feeds the chunk to both recognizers on the pool and waits up to the deadline.
+        """
+        # The decode may outlive this call, and chunk.data can be a view into a buffer
+        # the chunker is about to reuse, so hand the workers their own copy.
+        chunk = replace(chunk, data=bytes(chunk.fresh_data), offset=chunk.fresh_offset, overlap_bytes=0)
+        
+        futures = {}
+        for lang, service in self._services().items():
+            # A recognizer is stateful: finish its previous (late) chunk before feeding the next
+            late = self._pending.pop(lang, None)
+            if late is not None:
+                self._keep_if_final(lang, late.result())
+            futures[lang] = _asr_executor().submit(service.process_chunk, chunk)
+        
+        done, _ = wait(futures.values(), timeout=self.deadline)
+        
+        results = {}
+        for lang, future in futures.items():
+            if future in done:
+                results[lang] = future.result()
+            else:
+                self._pending[lang] = future
+                self.deadline_misses += 1
+            
+            carried = self._carry.pop(lang, None)
+            if carried is not None:
+                results[lang] = _merge_final(carried, results.get(lang))
+        return results
+
+    def _decode_locked(self, chunk: AudioChunk) -> Optional[TranscriptSegment]:
+        """Single-recognizer decoding once the call's language is known."""
+        lang = self.locked_language
+        self.chunks_single += 1
+        segment = self._services()[lang].process_chunk(chunk)
+        
+        carried = self._carry.pop(lang, None)
+        if carried is not None:
+            segment = _merge_final(carried, segment)
+        
+        self._observe(lang, segment)
+        if self.language_confidence[lang] < self.unlock_threshold:
+            print(f"[ASRService] Confidence in '{lang}' dropped to "
+                  f"{self.language_confidence[lang]:.2f}, resuming dual decoding.")
+            self.locked_language = None
+        return segment
+
+    def _observe(self, lang: str, segment: Optional[TranscriptSegment]):
+        """Updates the smoothed per-language confidence from final word-level results."""
+        if segment is None or not segment.is_final or not segment.text:
+            return
+        previous = self.language_confidence[lang]
+        self.language_confidence[lang] = segment.confidence if previous is None \
+            else 0.3 * segment.confidence + 0.7 * previous
+        self.language_finals[lang] += 1
+
+    def _maybe_lock(self):
+        """Commits to the leading language and frees the other recognizer."""
+        (lead, lead_conf), (other, other_conf) = sorted(
+            self.language_confidence.items(), key=lambda kv: kv[1] or 0.0, reverse=True)
+        if lead_conf is None or self.language_finals[lead] < self.min_finals:
+            return
+        if lead_conf < self.lock_threshold or lead_conf - (other_conf or 0.0) < self.lock_margin:
+            return
+        
+        # Let in-flight decodes finish: late finals of the kept language are still returned
+        for lang, future in self._pending.items():
+            self._keep_if_final(lang, future.result())
+        self._pending = {}
+        self._carry.pop(other, None)
+        
+        self._services()[other].reset()
+        self.language_confidence[other] = None
+        self.language_finals[other] = 0
+        self.locked_language = lead
+        print(f"[ASRService] Locked in to '{lead}' (confidence {lead_conf:.2f}); "
+              f"'{other}' recognizer released.")
+
+    def _keep_if_final(self, lang: str, segment: Optional[TranscriptSegment]):
+        # Late partials are superseded by the next chunk's partial; late finals must be kept
+        if segment is not None and segment.is_final:
+            previous = self._carry.get(lang)
+            self._carry[lang] = segment if previous is None else _merge_final(previous, segment)
+
 class MockASRService(ASRService):
     """
     Mock ASR for testing pipeline flow without heavy models.
@@ -157,8 +553,8 @@ class MockASRService(ASRService):
         if random.random() > 0.8:
             return TranscriptSegment(
                 text="hello this is a test call",
-                start_time=chunk.timestamp,
-                end_time=chunk.timestamp + chunk.duration,
+                start_time=chunk.offset,
+                end_time=chunk.offset + chunk.duration,
                 confidence=0.9,
                 is_final=True
             )
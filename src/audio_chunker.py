@@ -1,8 +1,11 @@
-import wave
+import mmap
+import struct
 import time
 import threading
 from queue import Queue
-from typing import Generator, Optional
+from math import gcd
+from typing import Generator, Optional, Tuple, Iterable
+import numpy as np
 from .models import AudioChunk
 
 try:
@@ -12,83 +15,542 @@ except ImportError:
     SD_AVAILABLE = False
     print("[AudioChunker] Warning: 'sounddevice' not found. Live mic not available.")
 
+def _build_ulaw_table() -> np.ndarray:
+    """ITU-T G.711 mu-law -> int16 decode table for all 256 code words."""
+    u = ~np.arange(256, dtype=np.int32) & 0xFF
+    exponent = (u >> 4) & 0x07
+    mantissa = u & 0x0F
+    magnitude = (((mantissa << 3) + 0x84) << exponent) - 0x84
+    return np.where(u & 0x80, -magnitude, magnitude).astype(np.int16)
+
+def _build_alaw_table() -> np.ndarray:
+    """ITU-T G.711 A-law -> int16 decode table for all 256 code words."""
+    a = np.arange(256, dtype=np.int32) ^ 0x55
+    exponent = (a >> 4) & 0x07
+    mantissa = a & 0x0F
+    magnitude = np.where(exponent == 0,
+                         (mantissa << 4) + 8,
+                         ((mantissa << 4) + 0x108) << np.maximum(exponent - 1, 0))
+    return np.where(a & 0x80, magnitude, -magnitude).astype(np.int16)
+
+ULAW_TABLE = _build_ulaw_table()
+ALAW_TABLE = _build_alaw_table()
+
+class TelephonyNormalizer:
+    """
+    Converts telephony audio into the 16-bit mono PCM the rest of the pipeline expects.
+
+    Stages (all vectorized NumPy, no per-sample Python loops):
+    1. G.711 decode: mu-law / A-law bytes -> int16 via a 256-entry lookup table.
+    2. Downmix: interleaved channels averaged to mono.
+    3. Polyphase resampling to `target_rate` (e.g. 8 kHz -> 16 kHz for Vosk).
+
+    The resampler keeps its filter history and phase between calls, so a stream
+    fed chunk by chunk is identical to the whole signal resampled at once (no
+    clicks at chunk boundaries). Use one instance per stream.
+    """
+
+    ENCODINGS = ("pcm16", "mulaw", "alaw")
+
+    def __init__(self, encoding: str = "pcm16", sample_rate: int = 8000, channels: int = 1,
+                 target_rate: int = 16000, taps_per_phase: int = 24):
+        """
+        Args:
+            encoding (str): 'pcm16', 'mulaw' or 'alaw'.
+            sample_rate (int): Input sample rate.
+            channels (int): Number of interleaved input channels.
+            target_rate (int): Output sample rate.
+            taps_per_phase (int): FIR length per polyphase branch (quality vs. cost).
+        """
+        if encoding not in self.ENCODINGS:
+            raise ValueError(f"Unsupported encoding '{encoding}', expected one of {self.ENCODINGS}")
+
+        self.encoding = encoding
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.target_rate = target_rate
+        self.bytes_per_sample = 2 if encoding == "pcm16" else 1
+
+        g = gcd(target_rate, sample_rate)
+        self.up = target_rate // g
+        self.down = sample_rate // g
+        self.taps = taps_per_phase
+        self._phases = self._design_filter() if (self.up, self.down) != (1, 1) else None
+        self.reset()
+
+    @property
+    def is_passthrough(self) -> bool:
+        """True if the input is already 16-bit mono at the target rate."""
+        return self.encoding == "pcm16" and self.channels == 1 and self._phases is None
+
+    def _design_filter(self) -> np.ndarray:
+        """
+        Kaiser-windowed sinc low-pass at the upsampled rate, split into `up` phases.
+
+        Returns:
+            np.ndarray: (up, taps) matrix; row p holds h[p], h[p + up], ... reversed,
+                so it can be dotted directly with a forward-ordered input window.
+        """
+        n = self.up * self.taps
+        cutoff = 0.9 / max(self.up, self.down) # Fraction of the upsampled Nyquist
+        t = np.arange(n) - (n - 1) / 2.0
+        h = cutoff * np.sinc(cutoff * t) * np.kaiser(n, 8.0)
+        h *= self.up / h.sum() # Unity passband gain after zero-stuffing
+        return h.reshape(self.taps, self.up).T[:, ::-1].astype(np.float32).copy()
+
+    def reset(self):
+        """Clears filter history for a new stream."""
+        self._history = np.zeros(self.taps - 1, dtype=np.float32)
+        self._next_t = 0 # Next output position in upsampled units, relative to the current input
+
+    def max_output_bytes(self, input_bytes: int) -> int:
+        """Upper bound on the int16 output size produced by `process` for `input_bytes` of input."""
+        frames = input_bytes // (self.bytes_per_sample * self.channels)
+        return 2 * (frames * self.up // self.down + 1)
+
+    def decode(self, data) -> np.ndarray:
+        """G.711 / PCM bytes -> interleaved int16 samples."""
+        if self.encoding == "mulaw":
+            return ULAW_TABLE[np.frombuffer(data, dtype=np.uint8)]
+        if self.encoding == "alaw":
+            return ALAW_TABLE[np.frombuffer(data, dtype=np.uint8)]
+        return np.frombuffer(data, dtype=np.int16)
+
+    def process(self, data) -> np.ndarray:
+        """
+        Normalizes one block of raw input.
+
+        Args:
+            data: Raw bytes (or any buffer) holding whole frames in the input format.
+
+        Returns:
+            np.ndarray: int16 mono samples at `target_rate`.
+        """
+        samples = self.decode(data)
+
+        if self.channels > 1:
+            samples = samples.reshape(-1, self.channels).mean(axis=1, dtype=np.float32)
+
+        if self._phases is None:
+            if samples.dtype != np.int16:
+                # Downmixed: round like the resampler does (astype would truncate toward zero)
+                samples = np.rint(samples).astype(np.int16)
+            return samples
+
+        return self._resample(samples.astype(np.float32, copy=False))
+
+    def _resample(self, x: np.ndarray) -> np.ndarray:
+        """Streaming rational resampling by up/down using the polyphase branches."""
+        xb = np.concatenate((self._history, x))
+        windows = np.lib.stride_tricks.sliding_window_view(xb, self.taps)
+
+        # Output n sits at upsampled position t = next_t + n * down; it reads input
+        # window t // up through branch t % up.
+        total = len(x) * self.up
+        positions = np.arange(self._next_t, total, self.down)
+        idx = positions // self.up
+        phase = positions % self.up
+
+        out = np.empty(len(positions), dtype=np.float32)
+        for p in range(self.up):
+            sel = phase == p
+            out[sel] = windows[idx[sel]] @ self._phases[p]
+
+        self._history = xb[len(xb) - (self.taps - 1):]
+        self._next_t = (int(positions[-1]) + self.down - total) if len(positions) else self._next_t - total
+
+        return np.clip(np.rint(out), -32768, 32767).astype(np.int16)
+
+    def normalize(self, chunk: AudioChunk) -> AudioChunk:
+        """
+        Returns a 16-bit mono chunk at `target_rate` built from `chunk.fresh_data`.
+        """
+        if self.is_passthrough:
+            return chunk
+
+        out = self.process(chunk.fresh_data)
+        return AudioChunk(
+            data=memoryview(out).cast('B'),
+            timestamp=chunk.timestamp,
+            duration=len(out) / self.target_rate,
+            sample_rate=self.target_rate,
+            offset=chunk.offset
+        )
+
+class AudioRingBuffer:
+    """
+    Preallocated byte buffer that hands out overlapping windows as zero-copy views.
+
+    Incoming audio is written into a fixed NumPy array; every complete window of
+    `window_bytes` is yielded as a memoryview into that array, advancing by `hop_bytes`.
+    Consumed bytes are reclaimed by sliding the unconsumed tail back to the front, so
+    there is no per-chunk allocation.
+
+    Note: a yielded view is only valid until the next `write`. Consumers that need
+    to keep the audio around must copy it (e.g. `bytes(view)`).
+    """
+
+    def __init__(self, window_bytes: int, hop_bytes: int, capacity: int = 0):
+        """
+        Args:
+            window_bytes (int): Size of each yielded window.
+            hop_bytes (int): Distance between consecutive window starts (window - overlap).
+            capacity (int): Buffer size in bytes. Defaults to two windows.
+        """
+        if window_bytes <= 0 or hop_bytes <= 0 or hop_bytes > window_bytes:
+            raise ValueError("Ring buffer requires 0 < hop_bytes <= window_bytes")
+
+        self.window_bytes = window_bytes
+        self.hop_bytes = hop_bytes
+        self.capacity = max(capacity, 2 * window_bytes)
+        self._buf = np.zeros(self.capacity, dtype=np.uint8)
+        self._start = 0    # Where the next window begins
+        self._end = 0      # One past the last written byte
+        self._emitted = 0  # One past the last byte already handed out in a window
+
+    def write(self, data):
+        """
+        Appends raw audio (bytes, memoryview or ndarray) to the buffer.
+        """
+        src = np.frombuffer(data, dtype=np.uint8)
+        n = src.size
+        if self._end + n > self.capacity:
+            self._compact()
+        if self._end + n > self.capacity:
+            raise ValueError(f"Write of {n} bytes exceeds free ring capacity ({self.capacity - self._end})")
+
+        self._buf[self._end:self._end + n] = src
+        self._end += n
+
+    def _compact(self):
+        """Slides the unconsumed tail to the front of the buffer (NumPy handles the overlap)."""
+        if self._start == 0:
+            return
+        keep = self._end - self._start
+        self._buf[:keep] = self._buf[self._start:self._end]
+        self._emitted = max(0, self._emitted - self._start)
+        self._end = keep
+        self._start = 0
+
+    def windows(self) -> Generator[Tuple[memoryview, int], None, None]:
+        """
+        Yields every complete window currently buffered.
+
+        Yields:
+            Tuple[memoryview, int]: The window view and how many of its leading bytes
+                were already part of the previous window.
+        """
+        while self._end - self._start >= self.window_bytes:
+            start = self._start
+            end = start + self.window_bytes
+            overlap = max(0, self._emitted - start)
+            self._emitted = end
+            self._start += self.hop_bytes
+            yield memoryview(self._buf[start:end]), overlap
+
+    def flush(self) -> Generator[Tuple[memoryview, int], None, None]:
+        """
+        Yields a final, shorter window if the stream ended with bytes that were never emitted.
+        """
+        if self._end > self._emitted:
+            start = self._start
+            overlap = max(0, self._emitted - start)
+            self._emitted = self._end
+            yield memoryview(self._buf[start:self._end]), overlap
+        self.clear()
+
+    def clear(self):
+        """Drops all buffered audio."""
+        self._start = self._end = self._emitted = 0
+
+class MmapWavReader:
+    """
+    Memory-mapped reader for PCM (16-bit) and G.711 WAV files.
+
+    The PCM data region is mapped read-only and chunks are handed out as memoryviews
+    over the map, so nothing is copied and pages already consumed are released back
+    to the OS. Resident memory stays flat regardless of recording length, and any
+    time offset can be reached without reading what precedes it.
+    """
+
+    WAVE_FORMAT_PCM = 0x0001
+    WAVE_FORMAT_ALAW = 0x0006
+    WAVE_FORMAT_MULAW = 0x0007
+    WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+    # WAVE_FORMAT_EXTENSIBLE sub-format GUIDs are the plain format tag followed by this
+    KSDATAFORMAT_GUID_TAIL = b'\x00\x00\x00\x00\x10\x00\x80\x00\x00\xaa\x00\x38\x9b\x71'
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+        self._file = open(file_path, 'rb')
+        try:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            self._parse_header()
+        except Exception:
+            self._file.close()
+            raise
+
+        if hasattr(mmap, "MADV_SEQUENTIAL"):
+            self._mmap.madvise(mmap.MADV_SEQUENTIAL)
+
+        self._released = 0 # Bytes at the start of the map already dropped from memory
+        self.frame_bytes = self.channels * self.sample_width
+        self.n_frames = self.data_size // self.frame_bytes
+        self.duration = self.n_frames / self.sample_rate
+
+    def _parse_header(self):
+        """Walks the RIFF chunks to locate 'fmt ' and 'data'."""
+        mm = self._mmap
+        if len(mm) < 12 or mm[0:4] != b'RIFF' or mm[8:12] != b'WAVE':
+            raise ValueError(f"Not a RIFF/WAVE file: {self.file_path}")
+
+        pos = 12
+        fmt_found = False
+        while pos + 8 <= len(mm):
+            chunk_id = mm[pos:pos + 4]
+            chunk_size = struct.unpack_from('<I', mm, pos + 4)[0]
+            body = pos + 8
+
+            if chunk_id == b'fmt ':
+                (self.audio_format, self.channels, self.sample_rate,
+                 _byte_rate, _block_align, bits) = struct.unpack_from('<HHIIHH', mm, body)
+                self.sample_width = bits // 8
+                if self.audio_format == self.WAVE_FORMAT_EXTENSIBLE:
+                    # The actual encoding is the sub-format; the container width still applies
+                    if chunk_size < 40:
+                        raise ValueError(f"Truncated WAVE_FORMAT_EXTENSIBLE header in {self.file_path}")
+                    subformat = mm[body + 24:body + 40]
+                    if subformat[2:] != self.KSDATAFORMAT_GUID_TAIL:
+                        raise ValueError(f"Unsupported WAVE_FORMAT_EXTENSIBLE sub-format {subformat.hex()}")
+                    self.audio_format, = struct.unpack_from('<H', subformat)
+                fmt_found = True
+            elif chunk_id == b'data':
+                if not fmt_found:
+                    raise ValueError("WAV 'data' chunk precedes 'fmt ' chunk")
+                self.data_offset = body
+                # Streaming writers often leave the size at 0 or 0xFFFFFFFF
+                self.data_size = min(chunk_size, len(mm) - body) if chunk_size else len(mm) - body
+                break
+
+            pos = body + chunk_size + (chunk_size & 1) # Chunks are word-aligned
+        else:
+            raise ValueError(f"No 'data' chunk in {self.file_path}")
+
+        encodings = {
+            self.WAVE_FORMAT_PCM: "pcm16",
+            self.WAVE_FORMAT_MULAW: "mulaw",
+            self.WAVE_FORMAT_ALAW: "alaw",
+        }
+        if self.audio_format not in encodings:
+            raise ValueError(f"Unsupported WAV format tag {self.audio_format:#x} (PCM or G.711 required)")
+        self.encoding = encodings[self.audio_format]
+        if self.encoding == "pcm16" and self.sample_width != 2:
+            raise ValueError(f"Unsupported PCM sample width: {self.sample_width * 8} bits (16 required)")
+
+    def frame_at(self, seconds: float) -> int:
+        """Converts a stream time offset to a frame index, clamped to the file."""
+        return min(max(int(seconds * self.sample_rate), 0), self.n_frames)
+
+    def view(self, start_frame: int, end_frame: int) -> memoryview:
+        """Zero-copy view of the PCM bytes for frames [start_frame, end_frame)."""
+        start = self.data_offset + start_frame * self.frame_bytes
+        end = self.data_offset + end_frame * self.frame_bytes
+        return memoryview(self._mmap)[start:end]
+
+    def _release(self, end_frame: int):
+        """Drops mapped pages before `end_frame` from resident memory (they refault from disk if reused)."""
+        if not hasattr(mmap, "MADV_DONTNEED"):
+            return
+        end = self.data_offset + end_frame * self.frame_bytes
+        end -= end % mmap.PAGESIZE
+        if end > self._released:
+            self._mmap.madvise(mmap.MADV_DONTNEED, self._released, end - self._released)
+            self._released = end
+
+    def chunks(self, chunk_duration: float, overlap: float = 0.0,
+               start_time: float = 0.0, end_time: Optional[float] = None) -> Generator[AudioChunk, None, None]:
+        """
+        Yields (optionally overlapping) chunks as views over the map.
+
+        Args:
+            chunk_duration (float): Window length in seconds.
+            overlap (float): Seconds shared with the previous window.
+            start_time (float): Stream offset to seek to before reading.
+            end_time (Optional[float]): Stream offset to stop at (default: end of file).
+        """
+        frames_per_chunk = int(self.sample_rate * chunk_duration)
+        frames_per_hop = max(1, frames_per_chunk - int(self.sample_rate * overlap))
+        overlap_frames = frames_per_chunk - frames_per_hop
+
+        start = self.frame_at(start_time)
+        stop = self.n_frames if end_time is None else self.frame_at(end_time)
+        first = True
+        while start < stop:
+            end = min(start + frames_per_chunk, stop)
+            yield AudioChunk(
+                data=self.view(start, end),
+                timestamp=time.time(),
+                duration=(end - start) / self.sample_rate,
+                sample_rate=self.sample_rate,
+                offset=start / self.sample_rate,
+                overlap_bytes=0 if first else overlap_frames * self.frame_bytes
+            )
+            first = False
+            if end >= stop:
+                break
+            start += frames_per_hop
+            self._release(start)
+
+    def close(self):
+        """Unmaps the file. If a consumer still holds a chunk view, the map is left to the GC."""
+        try:
+            self._mmap.close()
+        except BufferError:
+            pass
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
 class AudioChunker:
     """
     Splits an audio stream (or file) into fixed-duration chunks for processing.
-    
+
     This component ensures that the downstream components (ASR, Paralinguistics)
     receive data in manageable windows (e.g., 0.5s to 2.0s) to maintain low latency.
+
+    Chunks are views into a per-stream `AudioRingBuffer`. With `overlap > 0`, each
+    chunk repeats the tail of the previous one; `AudioChunk.fresh_data` gives only
+    the new audio for stateful consumers such as ASR.
     """
-    
-    def __init__(self, chunk_duration: float = 1.0, overlap: float = 0.0):
+
+    def __init__(self, chunk_duration: float = 1.0, overlap: float = 0.0, realtime: bool = True,
+                 target_rate: int = 16000):
         """
         Initialize the AudioChunker.
 
         Args:
             chunk_duration (float): Length of each chunk in seconds.
-            overlap (float): Overlap between chunks (not yet implemented in this simple version).
+            overlap (float): Seconds each chunk shares with the previous one (must be < chunk_duration).
+            realtime (bool): If False, file streams are read at max speed (no pacing sleeps).
+            target_rate (int): Sample rate chunks are normalized to (G.711 / stereo / other-rate
+                sources go through a `TelephonyNormalizer`).
         """
+        if not 0.0 <= overlap < chunk_duration:
+            raise ValueError("overlap must be >= 0 and smaller than chunk_duration")
+
         self.chunk_duration = chunk_duration
         self.overlap = overlap
+        self.realtime = realtime
+        self.target_rate = target_rate
         self.queue = Queue()
         self.is_running = False
-        
-    def process_file_stream(self, file_path: str) -> Generator[AudioChunk, None, None]:
+
+    def _frames(self, sample_rate: int) -> Tuple[int, int]:
+        """Returns (frames per window, frames per hop) for the given sample rate."""
+        frames_per_chunk = int(sample_rate * self.chunk_duration)
+        frames_per_hop = frames_per_chunk - int(sample_rate * self.overlap)
+        return frames_per_chunk, max(1, frames_per_hop)
+
+    def process_file_stream(self, file_path: str, realtime: Optional[bool] = None,
+                            start_time: float = 0.0, end_time: Optional[float] = None) -> Generator[AudioChunk, None, None]:
         """
         Simulates a live stream by reading a WAV file chunk by chunk with real-time delays.
-        
+
+        The file is memory-mapped (see `MmapWavReader`), so chunks are views over the
+        map and long recordings don't grow resident memory.
+
         Args:
             file_path (str): Path to the WAV file to stream.
-            
+            realtime (Optional[bool]): Overrides the chunker's pacing mode for this stream.
+                False reads the file as fast as possible (batch re-scoring).
+            start_time (float): Seek to this offset (seconds) before streaming.
+            end_time (Optional[float]): Stop at this offset (seconds); default is end of file.
+
         Yields:
             AudioChunk: Sequential audio chunks as if they were arriving in real-time.
         """
+        if realtime is None:
+            realtime = self.realtime
+
         try:
-            with wave.open(file_path, 'rb') as wf:
-                sample_rate = wf.getframerate()
-                channels = wf.getnchannels()
-                width = wf.getsampwidth()
-                
-                # Calculate bytes per chunk
-                # bytes_per_sample = width * channels
-                # samples_per_chunk = int(sample_rate * self.chunk_duration)
-                # chunk_size = samples_per_chunk * bytes_per_sample
-                
-                # For simplicity, we assume we want to read 'chunk_duration' worth of frames
-                frames_per_chunk = int(sample_rate * self.chunk_duration)
-                
-                print(f"[AudioChunker] Streaming file: {file_path}")
-                print(f"[AudioChunker] Sample Rate: {sample_rate}, Channels: {channels}")
-                
-                while True:
-                    data = wf.readframes(frames_per_chunk)
-                    if not data:
-                        break
-                        
-                    # Calculate actual duration of this chunk (last chunk might be shorter)
-                    # duration = len(data) / (sample_rate * width * channels)
-                    actual_frames = len(data) // (width * channels)
-                    duration = actual_frames / sample_rate
-                    
-                    chunk = AudioChunk(
-                        data=data,
-                        timestamp=time.time(),
-                        duration=duration,
-                        sample_rate=sample_rate
-                    )
-                    
+            with MmapWavReader(file_path) as reader:
+                if realtime:
+                    print(f"[AudioChunker] Streaming file: {file_path}")
+                    print(f"[AudioChunker] Sample Rate: {reader.sample_rate}, Channels: {reader.channels}")
+
+                normalizer = TelephonyNormalizer(reader.encoding, reader.sample_rate,
+                                                 reader.channels, self.target_rate)
+                if normalizer.is_passthrough:
+                    chunks = reader.chunks(self.chunk_duration, self.overlap, start_time, end_time)
+                else:
+                    # Normalize hop-sized blocks, then re-window at the target rate
+                    hop_blocks = reader.chunks(self.chunk_duration - self.overlap, 0.0, start_time, end_time)
+                    chunks = self.normalized_stream(hop_blocks, normalizer)
+
+                hop_duration = self.chunk_duration - self.overlap
+                for chunk in chunks:
                     yield chunk
-                    
+
                     # Simulate real-time latency
                     # We sleep for the duration of the chunk to mimic a live stream
                     # In a real system, this would be blocked by hardware input
-                    time.sleep(duration)
-                    
+                    if realtime:
+                        time.sleep(min(hop_duration, chunk.duration))
+
         except FileNotFoundError:
             print(f"[AudioChunker] Error: File not found at {file_path}")
         except Exception as e:
             print(f"[AudioChunker] Error processing file: {e}")
 
+    def make_ring(self, sample_rate: int, max_write_bytes: int = 0) -> AudioRingBuffer:
+        """
+        Ring buffer that windows 16-bit mono audio at `sample_rate` with this chunker's
+        duration and overlap. `max_write_bytes` sizes it for the largest single write.
+        """
+        frames_per_chunk, frames_per_hop = self._frames(sample_rate)
+        window_bytes = frames_per_chunk * 2
+        return AudioRingBuffer(window_bytes, frames_per_hop * 2, capacity=window_bytes + max_write_bytes)
+
+    def normalized_stream(self, blocks: Iterable[AudioChunk],
+                          normalizer: TelephonyNormalizer) -> Generator[AudioChunk, None, None]:
+        """
+        Normalizes consecutive, non-overlapping raw blocks and re-chunks them into
+        (optionally overlapping) windows at the normalizer's target rate.
+        """
+        frame_bytes = 2
+        frames_per_chunk, frames_per_hop = self._frames(normalizer.target_rate)
+        ring = AudioRingBuffer(frames_per_chunk * frame_bytes, frames_per_hop * frame_bytes)
+        hop_duration = frames_per_hop / normalizer.target_rate
+
+        offset = None
+        for block in blocks:
+            if offset is None:
+                offset = block.offset
+            ring.write(normalizer.process(block.fresh_data))
+            for view, overlap_bytes in ring.windows():
+                yield self.make_chunk(view, overlap_bytes, frame_bytes, normalizer.target_rate, offset)
+                offset += hop_duration
+
+        for view, overlap_bytes in ring.flush():
+            yield self.make_chunk(view, overlap_bytes, frame_bytes, normalizer.target_rate, offset or 0.0)
+
+    @staticmethod
+    def make_chunk(view: memoryview, overlap_bytes: int, frame_bytes: int,
+                   sample_rate: int, offset: float) -> AudioChunk:
+        """Wraps a ring buffer view in an AudioChunk without copying it."""
+        return AudioChunk(
+            data=view,
+            timestamp=time.time(),
+            duration=(len(view) // frame_bytes) / sample_rate,
+            sample_rate=sample_rate,
+            offset=offset,
+            overlap_bytes=overlap_bytes
+        )
+
     def stop(self):
         """Stops the chunking process."""
         self.is_running = False
@@ -103,26 +565,26 @@ class AudioChunker:
 
         sample_rate = 16000
         channels = 1
-        block_size = int(sample_rate * self.chunk_duration) # Frames per chunk
+        frame_bytes = 2 * channels
+        frames_per_chunk, block_size = self._frames(sample_rate) # Read one hop per block
         dtype = 'int16'
-        
+        ring = AudioRingBuffer(frames_per_chunk * frame_bytes, block_size * frame_bytes)
+
         print(f"[AudioChunker] Starting microphone stream ({sample_rate}Hz, Mono)...")
         print("[AudioChunker] Speak now! (Ctrl+C to stop)")
-        
+
         try:
             with sd.InputStream(samplerate=sample_rate, channels=channels, dtype=dtype, blocksize=block_size) as stream:
+                offset = 0.0
+                hop_duration = block_size / sample_rate
                 while True:
                      data, overflowed = stream.read(block_size)
                      if overflowed:
                          print("[AudioChunker] Warning: Audio buffer overflow")
-                     
-                     raw_bytes = data.tobytes()
-                     chunk = AudioChunk(
-                        data=raw_bytes,
-                        timestamp=time.time(),
-                        duration=self.chunk_duration,
-                        sample_rate=sample_rate
-                     )
-                     yield chunk
+
+                     ring.write(data)
+                     for view, overlap_bytes in ring.windows():
+                         yield self.make_chunk(view, overlap_bytes, frame_bytes, sample_rate, offset)
+                         offset += hop_duration
         except Exception as e:
             print(f"[AudioChunker] Microphone error: {e}")
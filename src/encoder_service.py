@@ -0,0 +1,106 @@
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import Future
+from queue import Queue, Empty
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+
+class BatchingEncoder:
+    """
+    Micro-batching front end for a sentence encoder shared by concurrent callers.
+
+    Callers submit one text and get a Future back. A single worker thread collects
+    requests and runs the model once per batch. It flushes when `max_batch_size` texts
+    are waiting, or `max_wait_ms` after the oldest one arrived, whichever comes first.
+    A flushed batch is split into length buckets (powers of two, in words) so short
+    utterances aren't padded to the longest one. Identical texts share one row.
+
+    Single-caller latency grows by at most `max_wait_ms`; under concurrent load many
+    small encodes become a few large ones.
+    """
+
+    def __init__(self, model: Any, max_batch_size: int = 32, max_wait_ms: float = 5.0):
+        """
+        Args:
+            model (Any): Encoder with a SentenceTransformer-style `encode(list, ...)`.
+            max_batch_size (int): Texts per model call at most.
+            max_wait_ms (float): Longest a request waits for others to batch with.
+        """
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue: "Queue[Optional[Tuple[str, Future, float]]]" = Queue()
+        self._stats_lock = threading.Lock()
+        self.batches = 0
+        self.texts = 0
+        self.model_calls = 0
+        self._worker = threading.Thread(target=self._run, name="encoder-batcher", daemon=True)
+        self._worker.start()
+
+    def submit(self, text: str) -> Future:
+        """Queues `text`; the Future resolves to its unit-norm float32 embedding."""
+        future = Future()
+        self._queue.put((text, future, time.monotonic()))
+        return future
+
+    def encode(self, text: str) -> np.ndarray:
+        """Blocking convenience wrapper around `submit`."""
+        return self.submit(text).result()
+
+    def _collect(self) -> Optional[List[Tuple[str, Future, float]]]:
+        first = self._queue.get()
+        if first is None:
+            return None
+        batch = [first]
+        deadline = first[2] + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except Empty:
+                break
+            if item is None:
+                self._queue.put(None) # Stop after this batch
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            if batch is None:
+                return
+            # Bucket by length so padding stays close to each text's own length
+            buckets: Dict[int, Dict[str, List[Future]]] = defaultdict(lambda: defaultdict(list))
+            for text, future, _ in batch:
+                if future.set_running_or_notify_cancel():
+                    buckets[len(text.split()).bit_length()][text].append(future)
+            for bucket in buckets.values():
+                texts = list(bucket)
+                try:
+                    embeddings = self.model.encode(texts, batch_size=len(texts), convert_to_numpy=True,
+                                                   normalize_embeddings=True)
+                    embeddings = np.asarray(embeddings, dtype=np.float32)
+                except Exception as e:
+                    for futures in bucket.values():
+                        for future in futures:
+                            future.set_exception(e)
+                    continue
+                for text, embedding in zip(texts, embeddings):
+                    for future in bucket[text]:
+                        future.set_result(embedding)
+            with self._stats_lock:
+                self.batches += 1
+                self.texts += len(batch)
+                self.model_calls += len(buckets)
+
+    def close(self):
+        """Stops the worker once the queued requests are served."""
+        self._queue.put(None)
+        self._worker.join()
+
+    def stats(self) -> Dict[str, float]:
+        with self._stats_lock:
+            return {"batches": self.batches, "texts": self.texts, "model_calls": self.model_calls,
+                    "mean_batch": round(self.texts / self.batches, 2) if self.batches else 0.0}
@@ -0,0 +1,474 @@
+import json
+import os
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict
+from dataclasses import dataclass, field, fields, replace, asdict
+from typing import Optional, Dict, List, Tuple, Any
+
+import numpy as np
+
+from .models import AudioChunk, TranscriptSegment, ParalinguisticFeatures, SemanticIntent, WORD_TIMING_DTYPE
+
+@dataclass
+class CachedChunk:
+    """
+    Analysis results for one chunk of a fingerprinted recording.
+
+    Attributes:
+        offset (float): Start of the chunk in the recording (seconds).
+        segment (Optional[TranscriptSegment]): Resolved transcript (no word deltas), if any.
+        features (ParalinguisticFeatures): Paralinguistic features of the chunk.
+        intent (Optional[SemanticIntent]): Intent of `segment`, if any.
+    """
+    offset: float
+    segment: Optional[TranscriptSegment]
+    features: ParalinguisticFeatures
+    intent: Optional[SemanticIntent] = None
+
+def _chunk_to_json(chunk: CachedChunk) -> Dict[str, Any]:
+    """JSON form of a cached chunk; the segment's word timings are stored separately."""
+    segment = None
+    if chunk.segment is not None:
+        segment = {f.name: getattr(chunk.segment, f.name) for f in fields(TranscriptSegment) if f.name != "words"}
+        segment["n_words"] = -1 if chunk.segment.words is None else len(chunk.segment.words)
+    return {
+        "offset": chunk.offset,
+        "segment": segment,
+        "features": {k: float(v) for k, v in asdict(chunk.features).items()},
+        "intent": None if chunk.intent is None else {"label": chunk.intent.label,
+                                                      "confidence": float(chunk.intent.confidence),
+                                                      "keywords_detected": list(chunk.intent.keywords_detected)},
+    }
+
+def _chunk_from_json(data: Dict[str, Any], words: np.ndarray, word_pos: int) -> Tuple[CachedChunk, int]:
+    """Inverse of `_chunk_to_json`; takes the segment's words from `words` at `word_pos`."""
+    segment = None
+    if data["segment"] is not None:
+        fields_ = dict(data["segment"])
+        n_words = fields_.pop("n_words")
+        if n_words >= 0:
+            fields_["words"] = words[word_pos:word_pos + n_words].copy()
+            word_pos += n_words
+        segment = TranscriptSegment(**fields_)
+    intent = SemanticIntent(**data["intent"]) if data["intent"] is not None else None
+    return CachedChunk(offset=data["offset"], segment=segment,
+                       features=ParalinguisticFeatures(**data["features"]), intent=intent), word_pos
+
+@dataclass
+class _Recording:
+    hashes: np.ndarray # uint32 landmark hashes
+    frames: np.ndarray # int32 anchor frame of each hash
+    chunks: List[CachedChunk]
+    created: float = field(default_factory=time.time)
+
+class FingerprintStream:
+    """
+    Incremental landmark fingerprinting of one call's audio (spectral peak pairs).
+
+    Every STFT frame contributes its strongest bin in each of `n_bands` log-spaced
+    bands of the telephony range. Each peak is paired with the peaks of neighbouring
+    bands in the next `fan_frames` frames, and a pair is hashed as
+    (anchor bin, target bin, frame gap). Hashes survive re-encoding and level changes
+    and, paired with the anchor frame, let an index vote on the time alignment.
+
+    Audio is consumed chunk by chunk; the frame tail and the last `fan_frames` peak
+    rows are carried over, so the hashes don't depend on the chunk boundaries.
+    """
+
+    def __init__(self, sample_rate: int = 16000, frame_size: int = 1024, hop: int = 512,
+                 n_bands: int = 6, fan_frames: int = 3, min_hz: float = 300.0, max_hz: float = 3400.0):
+        self.sample_rate = sample_rate
+        self.frame_size = frame_size
+        self.hop = hop
+        self.fan_frames = fan_frames
+        self.window = np.hanning(frame_size).astype(np.float32)
+
+        # Band edges in FFT bins, log-spaced over the telephony band
+        lo = int(min_hz * frame_size / sample_rate)
+        hi = int(max_hz * frame_size / sample_rate)
+        self.band_edges = np.geomspace(lo, hi, n_bands + 1).astype(np.int64)
+        self.reset()
+
+    @property
+    def frame_seconds(self) -> float:
+        return self.hop / self.sample_rate
+
+    def reset(self):
+        self._tail = np.zeros(0, dtype=np.float32)
+        self._next_frame = 0 # Index of the next frame to be produced
+        self._recent = np.full((0, len(self.band_edges) - 1), -1, dtype=np.int64) # Peak bins, -1 = none
+
+    def _peaks(self, frames: np.ndarray) -> np.ndarray:
+        """Strongest bin per band for each frame, -1 where the band is not prominent."""
+        spectrum = np.log1p(np.abs(np.fft.rfft(frames * self.window, axis=1)))
+        n_bands = len(self.band_edges) - 1
+        peaks = np.empty((len(frames), n_bands), dtype=np.int64)
+        strength = np.empty((len(frames), n_bands), dtype=np.float32)
+        for b in range(n_bands):
+            band = spectrum[:, self.band_edges[b]:self.band_edges[b + 1]]
+            idx = band.argmax(axis=1)
+            peaks[:, b] = idx + self.band_edges[b]
+            strength[:, b] = band[np.arange(len(frames)), idx]
+
+        # Keep peaks standing out from their frame (drops silence and flat noise)
+        floor = np.median(spectrum[:, self.band_edges[0]:self.band_edges[-1]], axis=1, keepdims=True)
+        peaks[strength < floor + 1.0] = -1
+        return peaks
+
+    def process(self, chunk: AudioChunk) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Fingerprints the chunk's fresh audio.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: uint32 hashes and the int32 anchor frame of each.
+        """
+        samples = np.frombuffer(chunk.fresh_data, dtype=np.int16).astype(np.float32)
+        if len(self._tail):
+            samples = np.concatenate((self._tail, samples))
+        n_frames = max(0, (len(samples) - self.frame_size) // self.hop + 1)
+        self._tail = samples[n_frames * self.hop:]
+        if n_frames == 0:
+            return np.zeros(0, dtype=np.uint32), np.zeros(0, dtype=np.int32)
+
+        frames = np.lib.stride_tricks.sliding_window_view(samples, self.frame_size)[::self.hop][:n_frames]
+        rows = np.concatenate((self._recent, self._peaks(frames)))
+        first = self._next_frame - len(self._recent) # Frame index of rows[0]
+        n_old = len(self._recent)
+
+        hashes, anchors = [], []
+        for dt in range(1, self.fan_frames + 1):
+            if len(rows) <= dt:
+                break
+            # Targets are the new frames only, so every pair is emitted exactly once
+            t = np.arange(max(n_old, dt), len(rows))
+            for shift in (-1, 0, 1):
+                a = rows[t - dt]
+                b = np.roll(rows[t], shift, axis=1)
+                if shift:
+                    # Drop the band that wrapped around
+                    keep = slice(1, None) if shift > 0 else slice(None, -1)
+                    a, b = a[:, keep], b[:, keep]
+                valid = (a >= 0) & (b >= 0)
+                h = (a.astype(np.uint32) << 15) | (b.astype(np.uint32) << 5) | np.uint32(dt)
+                hashes.append(h[valid])
+                anchors.append(np.broadcast_to((first + t - dt)[:, None], a.shape)[valid])
+
+        self._recent = rows[-self.fan_frames:]
+        self._next_frame += n_frames
+        return np.concatenate(hashes).astype(np.uint32), np.concatenate(anchors).astype(np.int32)
+
+class FingerprintIndex:
+    """
+    Index of fingerprinted recordings (e.g. pre-recorded IVR scam messages) and their
+    cached analysis results.
+
+    Recordings are kept in LRU order and expire after `ttl` seconds. The inverted
+    index maps each landmark hash to (recording, anchor frame) postings; a query
+    votes on (recording, frame offset) so only time-consistent hashes count.
+    With `path`, the index is loaded at start-up and saved at most every
+    `save_interval` seconds as recordings are added; owners call `save_if_dirty()`
+    when they shut down so the last recordings aren't lost. A `read_only` index
+    (e.g. in batch worker processes) loads `path` but never writes it.
+    Thread-safe: one index is shared by every call in the process.
+    """
+
+    VERSION = 2
+
+    def __init__(self, path: Optional[str] = None, max_recordings: int = 200, ttl: float = 7 * 24 * 3600,
+                 save_interval: float = 60.0, read_only: bool = False):
+        """
+        Args:
+            path (Optional[str]): File the index is persisted to (None: memory only).
+            max_recordings (int): Recordings kept before the least recently matched are evicted.
+            ttl (float): Seconds a recording stays in the index after it was added.
+            save_interval (float): Minimum seconds between two saves to `path`.
+            read_only (bool): Load `path` but never save to it.
+        """
+        self.path = path
+        self.max_recordings = max_recordings
+        self.ttl = ttl
+        self.save_interval = save_interval
+        self.read_only = read_only
+        self._recordings: "OrderedDict[int, _Recording]" = OrderedDict()
+        self._postings: Dict[int, List[Tuple[int, int]]] = {}
+        self._next_id = 0
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._last_save = time.time()
+        self.counters = {"lookups": 0, "hits": 0, "added": 0, "evicted": 0}
+
+        if path and os.path.exists(path):
+            self.load(path)
+
+    def __len__(self) -> int:
+        return len(self._recordings)
+
+    def add(self, hashes: np.ndarray, frames: np.ndarray, chunks: List[CachedChunk],
+            created: Optional[float] = None) -> int:
+        """
+        Indexes a recording and its per-chunk results.
+
+        Args:
+            created (Optional[float]): When the recording was first indexed (default: now).
+
+        Returns:
+            int: Id of the new recording.
+        """
+        recording = _Recording(hashes=hashes, frames=frames, chunks=chunks)
+        if created is not None:
+            recording.created = created
+        with self._lock:
+            rec_id = self._insert(recording)
+            self.counters["added"] += 1
+            self._evict()
+            self._dirty = True
+        self.maybe_save()
+        return rec_id
+
+    def _insert(self, recording: _Recording) -> int:
+        rec_id = self._next_id
+        self._next_id += 1
+        self._recordings[rec_id] = recording
+        for h, t in zip(recording.hashes.tolist(), recording.frames.tolist()):
+            self._postings.setdefault(h, []).append((rec_id, t))
+        return rec_id
+
+    def _remove(self, rec_id: int):
+        recording = self._recordings.pop(rec_id)
+        for h in np.unique(recording.hashes).tolist():
+            postings = [p for p in self._postings[h] if p[0] != rec_id]
+            if postings:
+                self._postings[h] = postings
+            else:
+                del self._postings[h]
+        self.counters["evicted"] += 1
+
+    def _evict(self):
+        now = time.time()
+        expired = [rec_id for rec_id, rec in self._recordings.items() if now - rec.created > self.ttl]
+        for rec_id in expired:
+            self._remove(rec_id)
+        while len(self._recordings) > self.max_recordings:
+            self._remove(next(iter(self._recordings)))
+
+    def votes(self, hashes: np.ndarray, frames: np.ndarray) -> Counter:
+        """
+        Counts, for each (recording, frame offset) alignment, the query hashes it explains.
+        """
+        votes = Counter()
+        with self._lock:
+            self.counters["lookups"] += 1
+            for h, t in zip(hashes.tolist(), frames.tolist()):
+                for rec_id, ref_t in self._postings.get(h, ()):
+                    votes[(rec_id, ref_t - t)] += 1
+        return votes
+
+    def cached_chunk(self, rec_id: int, offset: float, tolerance: float) -> Optional[CachedChunk]:
+        """
+        Cached results of the recording's chunk starting nearest to `offset` (within `tolerance`).
+        Marks the recording as recently used.
+        """
+        with self._lock:
+            recording = self._recordings.get(rec_id)
+            if recording is None or not recording.chunks:
+                return None
+            self._recordings.move_to_end(rec_id)
+            offsets = [c.offset for c in recording.chunks]
+            i = int(np.searchsorted(offsets, offset))
+            best = min((j for j in (i - 1, i) if 0 <= j < len(offsets)), key=lambda j: abs(offsets[j] - offset))
+            if abs(offsets[best] - offset) > tolerance:
+                return None
+            self.counters["hits"] += 1
+            return recording.chunks[best]
+
+    def export(self, rec_id: int) -> Optional[Tuple[np.ndarray, np.ndarray, List[CachedChunk], float]]:
+        """(hashes, frames, chunks, created) of a recording, to re-`add` it to another index."""
+        with self._lock:
+            recording = self._recordings.get(rec_id)
+            if recording is None:
+                return None
+            return recording.hashes, recording.frames, recording.chunks, recording.created
+
+    def save_if_dirty(self):
+        """Saves to `path` if recordings changed since the last save."""
+        if self._dirty:
+            self.save()
+
+    def maybe_save(self):
+        if self.path and self._dirty and time.time() - self._last_save >= self.save_interval:
+            self.save()
+
+    def save(self, path: Optional[str] = None):
+        """
+        Writes the index atomically (temp files + rename): the hashes, anchor frames and
+        word timings to `path` (NumPy .npz), the cached chunk results to `path`.json.
+        Both carry the same token, so a half-replaced pair is detected on load.
+        """
+        path = path or self.path
+        if not path or self.read_only:
+            return
+        with self._lock:
+            self._evict()
+            recordings = list(self._recordings.values())
+            self._dirty = False
+            self._last_save = time.time()
+
+        token = uuid.uuid4().hex
+        words = [c.segment.words for r in recordings for c in r.chunks
+                 if c.segment is not None and c.segment.words is not None]
+        arrays = {
+            "token": np.array(token),
+            "hashes": np.concatenate([r.hashes for r in recordings] or [np.zeros(0, np.uint32)]).astype(np.uint32),
+            "frames": np.concatenate([r.frames for r in recordings] or [np.zeros(0, np.int32)]).astype(np.int32),
+            "counts": np.array([len(r.hashes) for r in recordings], dtype=np.int64),
+            "words": np.concatenate(words).astype(WORD_TIMING_DTYPE) if words else np.zeros(0, WORD_TIMING_DTYPE),
+        }
+        meta = {
+            "version": self.VERSION,
+            "token": token,
+            "recordings": [{"created": r.created, "chunks": [_chunk_to_json(c) for c in r.chunks]}
+                           for r in recordings],
+        }
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            np.savez(f, **arrays)
+        with open(f"{tmp}.json", "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp, path)
+        os.replace(f"{tmp}.json", f"{path}.json")
+        print(f"[Fingerprint] Saved {len(recordings)} recordings to {path}")
+
+    def load(self, path: str):
+        """Loads recordings saved by `save()` (expired ones are dropped). No pickled objects are read."""
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                arrays = {name: data[name] for name in ("token", "hashes", "frames", "counts", "words")}
+            with open(f"{path}.json", encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"[Fingerprint] Could not load {path}: {e}")
+            return
+        if meta.get("version") != self.VERSION or meta.get("token") != str(arrays["token"]):
+            print(f"[Fingerprint] Ignoring {path}: unsupported version or mismatched files")
+            return
+        if len(meta["recordings"]) != len(arrays["counts"]):
+            print(f"[Fingerprint] Ignoring {path}: recording count mismatch")
+            return
+
+        bounds = np.concatenate(([0], np.cumsum(arrays["counts"])))
+        word_pos = 0
+        with self._lock:
+            for i, rec in enumerate(meta["recordings"]):
+                chunks = []
+                for chunk_data in rec["chunks"]:
+                    chunk, word_pos = _chunk_from_json(chunk_data, arrays["words"], word_pos)
+                    chunks.append(chunk)
+                self._insert(_Recording(hashes=arrays["hashes"][bounds[i]:bounds[i + 1]].copy(),
+                                        frames=arrays["frames"][bounds[i]:bounds[i + 1]].copy(),
+                                        chunks=chunks, created=rec["created"]))
+            self._evict()
+        print(f"[Fingerprint] Loaded {len(self._recordings)} recordings from {path}")
+
+class CallFingerprinter:
+    """
+    Per-call side of the fingerprint cache.
+
+    Fingerprints each chunk and votes on its alignment against the shared index. A
+    chunk agrees with an alignment when a sizeable share of its hashes fall on it (a
+    chance alignment only collects a few percent). The call locks onto a recording
+    once two consecutive chunks agree on the same alignment, and is then served the
+    cached results of the aligned chunks for as long as they keep agreeing (so a live
+    voice after the recorded message falls back to full analysis).
+    Calls that were mostly analysed for real are indexed when they end.
+    """
+
+    def __init__(self, index: FingerprintIndex, min_ratio: float = 0.25, min_chunk_votes: int = 20,
+                 min_index_hashes: int = 200):
+        """
+        Args:
+            index (FingerprintIndex): Shared index.
+            min_ratio (float): Share of a chunk's hashes that must fall on an alignment for the chunk to agree with it.
+            min_chunk_votes (int): Minimum aligned hashes for a chunk to agree (quiet chunks have few hashes).
+            min_index_hashes (int): Calls with fewer hashes (silence, very short) aren't indexed.
+        """
+        self.index = index
+        self.min_ratio = min_ratio
+        self.min_chunk_votes = min_chunk_votes
+        self.min_index_hashes = min_index_hashes
+        self.stream = FingerprintStream()
+        self.reset()
+
+    def reset(self):
+        self.stream.reset()
+        self._hashes: List[np.ndarray] = []
+        self._frames: List[np.ndarray] = []
+        self._chunks: List[CachedChunk] = []
+        self._match: Optional[Tuple[int, int]] = None # Locked (recording id, frame offset)
+        self._candidate: Optional[Tuple[int, int]] = None # Alignment of the previous chunk, not yet confirmed
+        self.hits = 0
+
+    def lookup(self, chunk: AudioChunk) -> Optional[CachedChunk]:
+        """
+        Fingerprints `chunk` and returns cached results for it if the call matches a known recording.
+        """
+        if chunk.sample_rate != self.stream.sample_rate:
+            return None
+        hashes, frames = self.stream.process(chunk)
+        self._hashes.append(hashes)
+        self._frames.append(frames)
+        if len(hashes) == 0 or len(self.index) == 0:
+            return None
+
+        votes = self.index.votes(hashes, frames)
+        if not votes:
+            self._match = self._candidate = None
+            return None
+        rec_id, delta = self._match or votes.most_common(1)[0][0]
+        # Tolerate one frame of jitter in the alignment
+        agreeing = sum(votes.get((rec_id, delta + d), 0) for d in (-1, 0, 1))
+        if agreeing < max(self.min_chunk_votes, self.min_ratio * len(hashes)):
+            self._match = self._candidate = None
+            return None
+
+        if self._match is None:
+            previous, self._candidate = self._candidate, (rec_id, delta)
+            if previous is None or previous[0] != rec_id or abs(previous[1] - delta) > 1:
+                return None
+            self._match = (rec_id, delta)
+
+        shift = delta * self.stream.frame_seconds
+        cached = self.index.cached_chunk(rec_id, chunk.offset + shift, tolerance=chunk.duration / 2)
+        if cached is None:
+            return None
+        self.hits += 1
+        if cached.segment is None:
+            return cached
+        return replace(cached, segment=_shift_segment(cached.segment, -shift))
+
+    def record(self, chunk: AudioChunk, segment: Optional[TranscriptSegment],
+               features: ParalinguisticFeatures, intent: Optional[SemanticIntent]):
+        """Stores the results of a chunk that was analysed for real."""
+        self._chunks.append(CachedChunk(offset=chunk.offset, segment=segment, features=features, intent=intent))
+
+    def finish(self) -> Optional[int]:
+        """
+        Indexes the call if it was mostly analysed for real.
+
+        Returns:
+            Optional[int]: The new recording id, or None if the call wasn't indexed.
+        """
+        hashes = np.concatenate(self._hashes) if self._hashes else np.zeros(0, dtype=np.uint32)
+        if len(hashes) < self.min_index_hashes or self.hits >= len(self._chunks):
+            return None
+        return self.index.add(hashes, np.concatenate(self._frames), self._chunks)
+
+def _shift_segment(segment: TranscriptSegment, shift: float) -> TranscriptSegment:
+    """Moves a cached segment's timings from the recording's timeline to the call's."""
+    words = segment.words
+    if words is not None:
+        words = words.copy()
+        words["start"] += shift
+        words["end"] += shift
+    return replace(segment, start_time=segment.start_time + shift, end_time=segment.end_time + shift, words=words)
@@ -1,6 +1,10 @@
 from dataclasses import dataclass, field
 from typing import List, Optional, Dict, Any
 import time
+import numpy as np
+
+# Per-word timing record: stream-relative start/end (seconds) and recognizer confidence.
+WORD_TIMING_DTYPE = np.dtype([("start", np.float32), ("end", np.float32), ("conf", np.float32)])
 
 @dataclass
 class AudioChunk:
@@ -8,15 +12,30 @@ class AudioChunk:
     Represents a chunk of raw audio data captured from the stream.
     
     Attributes:
-        data (bytes): The raw bytes of the audio chunk.
+        data (bytes): The raw bytes of the audio chunk. May be a memoryview into the
+            chunker's ring buffer, valid only until the next chunk is produced.
         timestamp (float): The system timestamp when this chunk was captured.
         duration (float): The duration of the chunk in seconds.
         sample_rate (int): The sample rate of the audio (e.g., 16000 Hz).
+        offset (float): Start of the chunk in seconds, relative to the start of the stream.
+        overlap_bytes (int): Leading bytes repeated from the previous chunk (overlapping windows).
     """
     data: bytes
     timestamp: float = field(default_factory=time.time)
     duration: float = 0.0
     sample_rate: int = 16000
+    offset: float = 0.0
+    overlap_bytes: int = 0
+
+    @property
+    def fresh_data(self) -> memoryview:
+        """The part of `data` not seen in the previous chunk (what stateful decoders should consume)."""
+        return memoryview(self.data)[self.overlap_bytes:]
+
+    @property
+    def fresh_offset(self) -> float:
+        """Stream offset (seconds) where `fresh_data` starts (16-bit mono audio)."""
+        return self.offset + self.overlap_bytes / (2 * self.sample_rate)
 
 @dataclass
 class TranscriptSegment:
@@ -29,12 +48,21 @@ class TranscriptSegment:
         end_time (float): Relative end time of the segment in the stream.
         confidence (float): The ASR model's confidence in this recognition (0.0 to 1.0).
         is_final (bool): Whether this result is final or partial.
+        is_delta (bool): Partial given as a word delta: `text` holds only the words appended
+            to the previously emitted partial of the same utterance.
+        revised_words (int): For deltas, trailing words of the previous partial to drop
+            before appending `text` (the recognizer revised its hypothesis).
+        words (Optional[np.ndarray]): Per-word timings (`WORD_TIMING_DTYPE`), aligned with
+            `text.split()`. Only set for final results from engines that report them.
     """
     text: str
     start_time: float
     end_time: float
     confidence: float
     is_final: bool = True
+    is_delta: bool = False
+    revised_words: int = 0
+    words: Optional[np.ndarray] = None
 
 @dataclass
 class ParalinguisticFeatures:
@@ -0,0 +1,122 @@
+import os
+import shutil
+import tempfile
+from typing import List, Union
+import numpy as np
+
+# Try importing the ONNX runtime stack (no torch needed once the model is exported)
+try:
+    import onnxruntime as ort
+    from tokenizers import Tokenizer
+    ONNX_AVAILABLE = True
+except ImportError as e:
+    ONNX_AVAILABLE = False
+    print(f"[Semantic] Warning: 'onnxruntime' import failed: {e}")
+
+# Resolved from the project root (like the Vosk models), not the working directory
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ONNX_MODEL_DIR = os.path.join(_PROJECT_ROOT, "models", "onnx")
+
+def export_onnx(model_name: str, out_dir: str) -> str:
+    """
+    Exports a Sentence-BERT model's transformer to ONNX and quantizes its weights to
+    int8 (dynamic quantization: activations stay float, MatMul weights are int8).
+
+    Needs torch and sentence-transformers, only for this one-off step. The model is
+    built in a scratch directory next to `out_dir` and renamed into place when complete,
+    so processes exporting at the same time never see (or delete) each other's files:
+    the first rename wins and the others discard their copy.
+
+    Returns:
+        str: Path of the quantized model (`model.int8.onnx` in `out_dir`).
+    """
+    import torch
+    from sentence_transformers import SentenceTransformer
+    from onnxruntime.quantization import quantize_dynamic, QuantType
+
+    out_dir = os.path.abspath(out_dir)
+    parent = os.path.dirname(out_dir)
+    os.makedirs(parent, exist_ok=True)
+    work_dir = tempfile.mkdtemp(prefix=f".{os.path.basename(out_dir)}.", dir=parent)
+    try:
+        st = SentenceTransformer(model_name, device="cpu")
+        transformer = st[0]
+        transformer.tokenizer.save_pretrained(work_dir)
+
+        fp32_path = os.path.join(work_dir, "model.onnx")
+        sample = transformer.tokenizer(["export sample"], return_tensors="pt")
+        with torch.no_grad():
+            torch.onnx.export(
+                transformer.auto_model,
+                (sample["input_ids"], sample["attention_mask"]),
+                fp32_path,
+                input_names=["input_ids", "attention_mask"],
+                output_names=["last_hidden_state"],
+                dynamic_axes={name: {0: "batch", 1: "tokens"}
+                              for name in ("input_ids", "attention_mask", "last_hidden_state")},
+                opset_version=14,
+            )
+        quantize_dynamic(fp32_path, os.path.join(work_dir, "model.int8.onnx"), weight_type=QuantType.QInt8)
+        os.remove(fp32_path)
+        try:
+            os.rename(work_dir, out_dir)
+            print(f"[Semantic] Exported {model_name} to {out_dir}")
+        except OSError:
+            # Another process finished first (out_dir exists and isn't empty)
+            if not os.path.exists(os.path.join(out_dir, "model.int8.onnx")):
+                raise
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return os.path.join(out_dir, "model.int8.onnx")
+
+class OnnxSentenceEncoder:
+    """
+    Int8 ONNX Runtime version of a mean-pooling Sentence-BERT model, on CPU.
+
+    Mirrors the part of `SentenceTransformer.encode` the analyzer uses, so it can stand
+    in for the torch model (and sit behind the batching encoder). The model is exported
+    and quantized on first use if `model_dir` doesn't hold it yet.
+    """
+
+    def __init__(self, model_name: str, model_dir: str = None, max_seq_length: int = 128, threads: int = 0):
+        """
+        Args:
+            model_name (str): Sentence-BERT model to export if needed.
+            model_dir (str): Exported model location; defaults to models/onnx/<model_name>.
+            max_seq_length (int): Longer inputs are truncated (the torch model's limit).
+            threads (int): ONNX Runtime intra-op threads (0 = runtime default).
+        """
+        model_dir = model_dir or os.path.join(ONNX_MODEL_DIR, model_name.replace("/", "__"))
+        path = os.path.join(model_dir, "model.int8.onnx")
+        if not os.path.exists(path):
+            path = export_onnx(model_name, model_dir)
+
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(path, options, providers=["CPUExecutionProvider"])
+
+        self.tokenizer = Tokenizer.from_file(os.path.join(model_dir, "tokenizer.json"))
+        pad_token = next((t for t in ("<pad>", "[PAD]") if self.tokenizer.token_to_id(t) is not None), "<pad>")
+        self.tokenizer.enable_padding(pad_id=self.tokenizer.token_to_id(pad_token) or 0, pad_token=pad_token)
+        self.tokenizer.enable_truncation(max_length=max_seq_length)
+
+    def encode(self, sentences: Union[str, List[str]], batch_size: int = 32, convert_to_numpy: bool = True,
+               normalize_embeddings: bool = False, **_) -> np.ndarray:
+        """
+        Mean-pooled sentence embeddings, shape (dim,) for a string or (n, dim) for a list.
+        """
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        out = []
+        for start in range(0, len(texts), batch_size):
+            encodings = self.tokenizer.encode_batch(texts[start:start + batch_size])
+            ids = np.array([e.ids for e in encodings], dtype=np.int64)
+            mask = np.array([e.attention_mask for e in encodings], dtype=np.int64)
+            hidden = self.session.run(None, {"input_ids": ids, "attention_mask": mask})[0]
+            weights = mask[:, :, None].astype(np.float32)
+            out.append((hidden * weights).sum(axis=1) / np.maximum(weights.sum(axis=1), 1e-9))
+        embeddings = np.concatenate(out) if out else np.zeros((0, 0), dtype=np.float32)
+        if normalize_embeddings:
+            embeddings = embeddings / np.maximum(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12)
+        embeddings = embeddings.astype(np.float32)
+        return embeddings[0] if single else embeddings
@@ -1,7 +1,15 @@
+import copy
 import numpy as np
 import tempfile
 import os
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
+from typing import Optional, Dict
 from .models import AudioChunk, ParalinguisticFeatures
+from .registry import registry
+from .prosody import NumpyProsodyExtractor
 
 # Try importing opensmile
 try:
@@ -11,88 +19,424 @@ except ImportError as e:
     OPENSMILE_AVAILABLE = False
     print(f"[Paralinguistic] Warning: 'opensmile' import failed: {e}")
 
+class RunningStats:
+    """
+    Mean / standard deviation of a per-frame descriptor over a sliding time window
+    and over the whole call, updated in O(1) per frame.
+    
+    The window keeps running sums (sum, sum of squares) and a queue of its values;
+    the whole-call statistics use Welford's update, so nothing is ever re-scanned.
+    """
+    
+    def __init__(self, window_seconds: float):
+        self.window_seconds = window_seconds
+        self.reset()
+
+    def reset(self):
+        self._window = deque() # (time, value)
+        self._sum = 0.0
+        self._sumsq = 0.0
+        self.count = 0
+        self._mean = 0.0
+        self._m2 = 0.0
+
+    def push(self, t: float, value: float):
+        """Adds the descriptor value of the frame starting at stream time `t`."""
+        self._window.append((t, value))
+        self._sum += value
+        self._sumsq += value * value
+        
+        self.count += 1
+        delta = value - self._mean
+        self._mean += delta / self.count
+        self._m2 += delta * (value - self._mean)
+
+    def expire(self, now: float):
+        """Drops window values older than `window_seconds` before `now`."""
+        window = self._window
+        while window and window[0][0] <= now - self.window_seconds:
+            _, value = window.popleft()
+            self._sum -= value
+            self._sumsq -= value * value
+        if not window:
+            self._sum = self._sumsq = 0.0 # Don't let rounding errors accumulate
+
+    def window_mean(self) -> float:
+        return self._sum / len(self._window) if self._window else 0.0
+
+    def window_std(self) -> float:
+        n = len(self._window)
+        if n < 2:
+            return 0.0
+        mean = self._sum / n
+        return float(np.sqrt(max(self._sumsq / n - mean * mean, 0.0)))
+
+    def call_mean(self) -> float:
+        return self._mean
+
+    def call_std(self) -> float:
+        return float(np.sqrt(self._m2 / self.count)) if self.count > 1 else 0.0
+
 class ParalinguisticAnalyzer:
     """
-    Analyzes audio for non-verbal cues (prosody, emotion indicators) using OpenSMILE.
+    Analyzes audio for non-verbal cues (prosody, emotion indicators) using OpenSMILE
+    or the built-in NumPy prosody extractor.
     
     Extracts features like:
     - F0 (Fundamental Frequency/Pitch): High pitch can indicate stress/urgency.
     - Jitter/Shimmer: Micro-tremors in voice indicating nervousness or synthetic nature.
     - Loudness: Aggression or dominance.
+    
+    Two modes:
+    - Per-chunk (default): eGeMAPS Functionals over each isolated chunk.
+    - Streaming: eGeMAPS low-level descriptors are computed once per 10 ms frame as
+      audio arrives, and running statistics give short-window (`window_seconds`) and
+      whole-call aggregates at any time. Stateful: one analyzer per call (`new_stream`).
+    
+    Backends: 'opensmile' (eGeMAPSv02), 'numpy' (`NumpyProsodyExtractor`: no extra
+    dependency, several times cheaper) or 'auto' (OpenSMILE when installed).
     """
     
-    def __init__(self):
-        if OPENSMILE_AVAILABLE:
+    # eGeMAPSv02 low-level descriptors used in streaming mode
+    LLD_PITCH = "F0semitoneFrom27.5Hz_sma3nz"
+    LLD_LOUDNESS = "Loudness_sma3"
+    LLD_JITTER = "jitterLocal_sma3nz"
+    LLD_SHIMMER = "shimmerLocaldB_sma3nz"
+    LLDS = (LLD_PITCH, LLD_LOUDNESS, LLD_JITTER, LLD_SHIMMER)
+    # eGeMAPSv02 functionals used per chunk, in ParalinguisticFeatures order
+    FUNCTIONALS = (
+        "F0semitoneFrom27.5Hz_sma3nz_amean",
+        "F0semitoneFrom27.5Hz_sma3nz_stddevNorm",
+        "loudness_sma3_amean",
+        "jitterLocal_sma3nz_amean",
+        "shimmerLocaldB_sma3nz_amean",
+    )
+    FRAME_HOP = 0.010 # eGeMAPS frame step
+    FRAME_SIZE = 0.060 # Longest eGeMAPS analysis window (pitch)
+    
+    BACKENDS = ("auto", "opensmile", "numpy")
+    
+    def __init__(self, streaming: bool = False, window_seconds: float = 3.0, backend: str = "auto"):
+        """
+        Args:
+            streaming (bool): Incremental per-frame analysis instead of per-chunk Functionals.
+            window_seconds (float): Span of the short-window aggregates in streaming mode.
+            backend (str): 'auto', 'opensmile' or 'numpy'.
+        """
+        if backend not in self.BACKENDS:
+            raise ValueError(f"Unknown paralinguistic backend '{backend}' (expected one of {self.BACKENDS})")
+        if backend == "opensmile" and not OPENSMILE_AVAILABLE:
+            print("[Paralinguistic] OpenSMILE not available, using the NumPy prosody backend.")
+        self.backend = "opensmile" if backend != "numpy" and OPENSMILE_AVAILABLE else "numpy"
+        self.streaming = streaming
+        self.window_seconds = window_seconds
+        self.extractor = NumpyProsodyExtractor()
+        if self.backend == "opensmile":
             # Initialize OpenSMILE with eGeMAPSv02 (Geneva Minimalistic Acoustic Parameter Set)
             # This is a standard set for affective computing.
-            self.smile = opensmile.Smile(
+            # Shared process-wide via the registry.
+            level = "LowLevelDescriptors" if streaming else "Functionals"
+            self.smile = registry.get(("opensmile", "eGeMAPSv02", level), lambda: opensmile.Smile(
                 feature_set=opensmile.FeatureSet.eGeMAPSv02,
-                feature_level=opensmile.FeatureLevel.Functionals,
-            )
-            print("[Paralinguistic] OpenSMILE initialized with eGeMAPSv02.")
+                feature_level=getattr(opensmile.FeatureLevel, level),
+            ))
+            # Resolve the columns we read once; per chunk we index the raw feature array
+            names = list(self.smile.feature_names)
+            wanted = self.LLDS if streaming else self.FUNCTIONALS
+            missing = [name for name in wanted if name not in names]
+            if missing:
+                raise ValueError(f"OpenSMILE eGeMAPSv02 {level} lacks features {missing}")
+            self._feature_index = np.array([names.index(name) for name in wanted])
         else:
             self.smile = None
+        self._values = np.zeros(len(self.FUNCTIONALS), dtype=np.float32) # OpenSMILE's output dtype
+        self._buffer = np.empty(0, dtype=np.float32)
+        self._stats = {name: RunningStats(window_seconds) for name in ("pitch", "loudness", "jitter", "shimmer")}
+        self.reset()
+
+    def reset(self):
+        """Clears the streaming state for a new call."""
+        self._pending = np.zeros(0, dtype=np.float32) # Context frame + samples of the frames not yet analysed
+        self._pending_offset = 0.0 # Stream time of _pending[0]
+        self._expected_offset: Optional[float] = None
+        self._context = 0 # Leading frames of _pending already added to the statistics
+        for stats in self._stats.values():
+            stats.reset()
+
+    def new_stream(self) -> "ParalinguisticAnalyzer":
+        """Analyzer for another concurrent call, sharing the OpenSMILE instance."""
+        stream = copy.copy(self)
+        stream._stats = {name: RunningStats(self.window_seconds) for name in self._stats}
+        stream._values = np.zeros(len(self.FUNCTIONALS), dtype=np.float32)
+        stream._buffer = np.empty(0, dtype=np.float32)
+        stream.reset()
+        return stream
 
     def analyze(self, chunk: AudioChunk) -> ParalinguisticFeatures:
         """
         Extracts features from the audio chunk.
+        
+        In streaming mode, feeds the chunk's new audio and returns the short-window aggregates.
         """
-        if not self.smile or len(chunk.data) == 0:
+        if self.streaming:
+            return self._analyze_streaming(chunk)
+        if len(chunk.data) == 0:
             return ParalinguisticFeatures()
+        if self.backend == "numpy":
+            return self._analyze_numpy(chunk)
 
         try:
-            # Convert raw bytes to numpy array (assumes 16-bit PCM)
-            # data is bytes, need to convert to float32 or int16
-            audio_data = np.frombuffer(chunk.data, dtype=np.int16)
-            
-            # OpenSMILE expects float audio [-1, 1] or file
-             # Normalizing to float [-1, 1]
-            audio_data_norm = audio_data.astype(np.float32) / 32768.0
-            
-            # process_signal expects (channels, samples) or (samples,)
-            # We assume mono for now.
-            result_df = self.smile.process_signal(
-                audio_data_norm,
-                chunk.sample_rate
-            )
-            
-            if result_df.empty:
+            # Raw (channels, features, frames) array: no DataFrame per chunk
+            signal = self._normalized(chunk.data)
+            result = self.smile(signal.reshape(1, -1), chunk.sample_rate)
+            if result.shape[-1] == 0:
                 return ParalinguisticFeatures()
-             
-            # Extract key metrics mapping from eGeMAPS
-            # Note: actual feature names in eGeMAPS are complex (e.g., F0semitoneFrom27.5Hz_sma3nz_amean)
-            # We map a few key ones.
-            
-            # F0 (Pitch)
-            pitch = result_df.get('F0semitoneFrom27.5Hz_sma3nz_amean', [0])
-            pitch = pitch.iloc[0] if hasattr(pitch, 'iloc') else pitch[0]
-            
-            pitch_var = result_df.get('F0semitoneFrom27.5Hz_sma3nz_stddevNorm', [0])
-            pitch_var = pitch_var.iloc[0] if hasattr(pitch_var, 'iloc') else pitch_var[0]
-            
-            # Loudness
-            loudness = result_df.get('loudness_sma3_amean', [0])
-            loudness = loudness.iloc[0] if hasattr(loudness, 'iloc') else loudness[0]
-            
-            # Jitter/Shimmer (Voice Quality)
-            jitter = result_df.get('jitterLocal_sma3nz_amean', [0])
-            jitter = jitter.iloc[0] if hasattr(jitter, 'iloc') else jitter[0]
-
-            shimmer = result_df.get('shimmerLocaldB_sma3nz_amean', [0])
-            shimmer = shimmer.iloc[0] if hasattr(shimmer, 'iloc') else shimmer[0]
-            
-            # Rate (Simulation/Approximation as opensmile 'rate' features are specific)
-            # We use `temporal` features if available, otherwise 0
+            np.take(result[0, :, 0], self._feature_index, out=self._values)
+            pitch, pitch_var, loudness, jitter, shimmer = self._values.tolist()
             
             return ParalinguisticFeatures(
-                pitch_mean=float(pitch),
-                pitch_variance=float(pitch_var),
-                intensity_mean=float(loudness),
-                speaking_rate=0.0, # Not directly in standard function level without setup
-                jitter=float(jitter),
-                shimmer=float(shimmer)
+                pitch_mean=pitch,
+                pitch_variance=pitch_var,
+                intensity_mean=loudness,
+                speaking_rate=0.0, # Filled in per call by the pipeline's SpeakingRateEstimator
+                jitter=jitter,
+                shimmer=shimmer
             )
             
         except Exception as e:
             print(f"[Paralinguistic] Error processing chunk: {e}")
             return ParalinguisticFeatures()
+
+    def _normalized(self, data) -> np.ndarray:
+        """
+        16-bit PCM as float32 in [-1, 1), written into a buffer reused across chunks.
+        The result is only valid until the next call.
+        """
+        samples = np.frombuffer(data, dtype=np.int16)
+        if len(self._buffer) < len(samples):
+            self._buffer = np.empty(len(samples), dtype=np.float32)
+        out = self._buffer[:len(samples)]
+        np.multiply(samples, np.float32(1 / 32768), out=out)
+        return out
+
+    def _analyze_numpy(self, chunk: AudioChunk) -> ParalinguisticFeatures:
+        """Per-chunk functionals from the NumPy descriptors (same definitions as eGeMAPS)."""
+        signal = self._normalized(chunk.data)
+        lld = self.extractor.llds(signal, chunk.sample_rate)
+        voiced = lld["pitch"] > 0
+        if not voiced.any():
+            return ParalinguisticFeatures(intensity_mean=float(lld["loudness"].mean()) if len(signal) else 0.0)
+        pitch = lld["pitch"][voiced]
+        jitter = lld["jitter"][np.isfinite(lld["jitter"])]
+        shimmer = lld["shimmer"][np.isfinite(lld["shimmer"])]
+        return ParalinguisticFeatures(
+            pitch_mean=float(pitch.mean()),
+            pitch_variance=float(pitch.std() / pitch.mean()),
+            intensity_mean=float(lld["loudness"].mean()),
+            jitter=float(jitter.mean()) if len(jitter) else 0.0,
+            shimmer=float(shimmer.mean()) if len(shimmer) else 0.0
+        )
+
+    def _frame_llds(self, signal: np.ndarray, sample_rate: int) -> dict:
+        """Per-frame descriptors from the selected backend, keyed like `NumpyProsodyExtractor.llds`."""
+        if self.backend == "numpy":
+            return self.extractor.llds(signal, sample_rate)
+        # (features, frames); eGeMAPS LLD frames start every FRAME_HOP from 0
+        pitch, loudness, jitter, shimmer = self.smile(signal.reshape(1, -1), sample_rate)[0][self._feature_index]
+        return {
+            "start": np.arange(len(pitch)) * self.FRAME_HOP,
+            "pitch": pitch,
+            "loudness": loudness,
+            "jitter": jitter,
+            "shimmer": shimmer,
+        }
+
+    def _analyze_streaming(self, chunk: AudioChunk) -> ParalinguisticFeatures:
+        fresh = self._normalized(chunk.fresh_data)
+        if self._expected_offset is None or abs(chunk.fresh_offset - self._expected_offset) > 1e-3:
+            # First chunk, or a gap (chunks skipped by the VAD): start framing afresh
+            self._pending = fresh.copy() # The buffer is reused by the next chunk
+            self._pending_offset = chunk.fresh_offset
+            self._context = 0
+        else:
+            self._pending = np.concatenate((self._pending, fresh))
+        self._expected_offset = chunk.fresh_offset + len(fresh) / chunk.sample_rate
+        
+        total = len(self._pending) / chunk.sample_rate
+        if total < self.FRAME_SIZE:
+            return self.window_features()
+        
+        try:
+            lld = self._frame_llds(self._pending, chunk.sample_rate)
+        except Exception as e:
+            print(f"[Paralinguistic] Error processing chunk: {e}")
+            return self.window_features()
+        
+        # Only frames whose whole analysis window has arrived; the rest is recomputed
+        # with the next chunk's audio so every frame is analysed exactly once. The
+        # buffer keeps one analysed frame as context (frame-to-frame jitter/shimmer),
+        # which is skipped here.
+        complete = lld["start"] + self.FRAME_SIZE <= total + 1e-6
+        n_done = int(complete.sum())
+        if n_done <= self._context:
+            return self.window_features()
+        new = slice(self._context, n_done)
+        self.update(self._pending_offset + lld["start"][new], lld["pitch"][new], lld["loudness"][new],
+                    lld["jitter"][new], lld["shimmer"][new])
+        
+        keep_from = int(round((n_done - 1) * self.FRAME_HOP * chunk.sample_rate))
+        self._pending = self._pending[keep_from:]
+        self._pending_offset += keep_from / chunk.sample_rate
+        self._context = 1
+        return self.window_features()
+
+    def update(self, times: np.ndarray, pitch: np.ndarray, loudness: np.ndarray,
+               jitter: np.ndarray, shimmer: np.ndarray):
+        """
+        Adds per-frame descriptors (frame start times in stream seconds) to the running statistics.
+        Pitch, jitter and shimmer are only defined on voiced frames (pitch > 0); NaN
+        jitter/shimmer values (no previous voiced frame) are skipped.
+        """
+        stats = self._stats
+        for t, f0, loud, jit, shim in zip(times.tolist(), pitch.tolist(), loudness.tolist(),
+                                          jitter.tolist(), shimmer.tolist()):
+            stats["loudness"].push(t, loud)
+            if f0 > 0:
+                stats["pitch"].push(t, f0)
+                if jit == jit:
+                    stats["jitter"].push(t, jit)
+                if shim == shim:
+                    stats["shimmer"].push(t, shim)
+        if len(times):
+            now = float(times[-1])
+            for s in stats.values():
+                s.expire(now)
+
+    def window_features(self) -> ParalinguisticFeatures:
+        """Aggregates over the last `window_seconds` of analysed audio."""
+        stats = self._stats
+        pitch = stats["pitch"].window_mean()
+        return ParalinguisticFeatures(
+            pitch_mean=pitch,
+            pitch_variance=stats["pitch"].window_std() / pitch if pitch else 0.0, # As eGeMAPS stddevNorm
+            intensity_mean=stats["loudness"].window_mean(),
+            jitter=stats["jitter"].window_mean(),
+            shimmer=stats["shimmer"].window_mean()
+        )
+
+    def call_features(self) -> ParalinguisticFeatures:
+        """Aggregates over everything analysed since the call started."""
+        stats = self._stats
+        pitch = stats["pitch"].call_mean()
+        return ParalinguisticFeatures(
+            pitch_mean=pitch,
+            pitch_variance=stats["pitch"].call_std() / pitch if pitch else 0.0,
+            intensity_mean=stats["loudness"].call_mean(),
+            jitter=stats["jitter"].call_mean(),
+            shimmer=stats["shimmer"].call_mean()
+        )
+
+
+# Shared by every call's AsyncParalinguistics in the process
+_para_pool: Optional[ThreadPoolExecutor] = None
+_para_pool_lock = threading.Lock()
+
+def _para_executor() -> ThreadPoolExecutor:
+    global _para_pool
+    with _para_pool_lock:
+        if _para_pool is None:
+            _para_pool = ThreadPoolExecutor(max_workers=os.cpu_count() or 1, thread_name_prefix="para")
+        return _para_pool
+
+class AsyncParalinguistics:
+    """
+    Runs one call's `ParalinguisticAnalyzer` on a shared worker pool, off the
+    pipeline's critical path.
+    
+    Chunks are submitted as they arrive and analysed in order (the analyzer is
+    stateful), at most one task per call at a time. A scoring event joins the
+    features of its own chunk by stream time, waiting at most `budget_ms`; if they
+    aren't ready it falls back to the latest features available.
+    """
+    
+    def __init__(self, analyzer: ParalinguisticAnalyzer, budget_ms: float = 10.0):
+        """
+        Args:
+            analyzer (ParalinguisticAnalyzer): This call's analyzer (owned by the worker task).
+            budget_ms (float): Longest a scoring event waits for its chunk's features.
+        """
+        self.analyzer = analyzer
+        self.budget = budget_ms / 1000.0
+        self._queue = deque()
+        self._results = deque(maxlen=32) # (chunk end time, features), oldest first
+        self._running = False
+        self._cond = threading.Condition()
+        self.counters = {"joined": 0, "fallbacks": 0}
+        
+    def submit(self, chunk: AudioChunk):
+        """Queues the chunk for analysis and returns immediately."""
+        # chunk.data may be a view into a buffer the chunker reuses
+        chunk = replace(chunk, data=bytes(chunk.data))
+        with self._cond:
+            self._queue.append(chunk)
+            if self._running:
+                return
+            self._running = True
+        _para_executor().submit(self._drain)
+
+    def _drain(self):
+        while True:
+            with self._cond:
+                if not self._queue:
+                    self._running = False
+                    self._cond.notify_all()
+                    return
+                chunk = self._queue.popleft()
+            try:
+                features = self.analyzer.analyze(chunk)
+            except Exception as e:
+                print(f"[Paralinguistic] Error processing chunk: {e}")
+                features = ParalinguisticFeatures()
+            with self._cond:
+                self._results.append((chunk.offset + chunk.duration, features))
+                self._cond.notify_all()
+
+    @property
+    def latest(self) -> ParalinguisticFeatures:
+        """Most recent features available, without waiting."""
+        with self._cond:
+            return self._results[-1][1] if self._results else ParalinguisticFeatures()
+
+    def features_at(self, chunk: AudioChunk) -> ParalinguisticFeatures:
+        """
+        Features for the scoring event of `chunk`: its own, if ready within the
+        latency budget, otherwise the latest available.
+        """
+        end = chunk.offset + chunk.duration
+        with self._cond:
+            ready = self._cond.wait_for(lambda: self._results and self._results[-1][0] >= end - 1e-6,
+                                        timeout=self.budget)
+            if ready:
+                for t, features in reversed(self._results):
+                    if abs(t - end) < 1e-6:
+                        self.counters["joined"] += 1
+                        return features
+            self.counters["fallbacks"] += 1
+            return self._results[-1][1] if self._results else ParalinguisticFeatures()
+
+    def join(self):
+        """Waits until every submitted chunk has been analysed."""
+        with self._cond:
+            self._cond.wait_for(lambda: not self._running)
+
+    def reset(self):
+        """Drops queued work, waits for the in-flight chunk and resets the analyzer for a new call."""
+        with self._cond:
+            self._queue.clear()
+            self._cond.wait_for(lambda: not self._running)
+            self._results.clear()
+            self.counters = dict.fromkeys(self.counters, 0)
+        self.analyzer.reset()
+
+    def stats(self) -> Dict[str, int]:
+        return dict(self.counters)
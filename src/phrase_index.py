@@ -0,0 +1,219 @@
+from abc import ABC, abstractmethod
+import os
+import shutil
+import tempfile
+import threading
+from typing import List, Optional, Sequence, Tuple
+import numpy as np
+
+# (phrase, intent, cosine similarity)
+Match = Tuple[str, str, float]
+
+class PhraseIndex(ABC):
+    """
+    Labelled phrase embeddings (unit-norm float32) searchable by cosine similarity.
+
+    Subclasses implement `_insert` and `_candidates`; bookkeeping of phrases, intents
+    and labels lives here. Inserts may run while other threads search: writers take a
+    lock and publish new arrays by reference swap, readers never block.
+    """
+
+    def __init__(self, intents: Sequence[str], phrases: Sequence[str], labels: np.ndarray):
+        self.intents = list(intents)
+        self.phrases = list(phrases)
+        self.labels = np.asarray(labels, dtype=np.int32)
+        self._lock = threading.Lock()
+
+    def add(self, intent: str, phrases: Sequence[str], embeddings: np.ndarray):
+        """
+        Inserts phrases at runtime.
+
+        Args:
+            intent (str): Their label (new intents are registered).
+            phrases (Sequence[str]): The phrases.
+            embeddings (np.ndarray): Unit-norm embeddings, shape (len(phrases), dim).
+        """
+        embeddings = np.asarray(embeddings, dtype=np.float32).reshape(len(phrases), -1)
+        with self._lock:
+            if intent not in self.intents:
+                self.intents.append(intent)
+            ids = np.arange(len(self.phrases), len(self.phrases) + len(phrases))
+            self._insert(ids, embeddings)
+            # Phrases first: a reader that sees the new label also finds its phrase
+            self.phrases = self.phrases + list(phrases)
+            self.labels = np.concatenate((self.labels, np.full(len(phrases), self.intents.index(intent), np.int32)))
+
+    def search(self, query: np.ndarray, k: int = 5) -> List[Match]:
+        """Top-k phrases for a unit-norm query, best first."""
+        ids, sims = self._candidates(query)
+        if len(ids) > k:
+            top = np.argpartition(-sims, k - 1)[:k]
+            ids, sims = ids[top], sims[top]
+        order = np.argsort(-sims)
+        labels, phrases = self.labels, self.phrases
+        return [(phrases[i], self.intents[labels[i]], float(s))
+                for i, s in zip(ids[order].tolist(), sims[order].tolist()) if i < len(labels)]
+
+    @abstractmethod
+    def _insert(self, ids: np.ndarray, embeddings: np.ndarray):
+        """Adds rows `ids` with their embeddings (called under the write lock)."""
+        pass
+
+    @abstractmethod
+    def _candidates(self, query: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """(row ids, similarities) of the rows worth ranking for `query`."""
+        pass
+
+    def __len__(self) -> int:
+        return len(self.phrases)
+
+class ExactIndex(PhraseIndex):
+    """Brute force: one matrix-vector product over every phrase. Best below ~10k phrases."""
+
+    def __init__(self, intents: Sequence[str], phrases: Sequence[str], labels: np.ndarray, matrix: np.ndarray):
+        super().__init__(intents, phrases, labels)
+        self.matrix = matrix # May be a read-only memory map until the first insert
+
+    def _insert(self, ids: np.ndarray, embeddings: np.ndarray):
+        self.matrix = np.concatenate((self.matrix, embeddings))
+
+    def _candidates(self, query: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        matrix = self.matrix
+        return np.arange(len(matrix)), matrix @ query
+
+class IVFIndex(PhraseIndex):
+    """
+    Inverted-file approximate index: phrases are clustered with spherical k-means and
+    a query only scans the `n_probe` lists whose centroids are closest to it.
+
+    With about sqrt(N) lists, a query compares against the centroids plus roughly
+    n_probe * sqrt(N) phrases instead of all N. Inserted phrases join the list of their
+    nearest centroid (centroids aren't retrained).
+
+    With a `cache_dir` the trained structure (centroids, the matrix in list order and the
+    list bounds) is saved there once and loaded memory-mapped afterwards: restarts skip
+    the k-means and every list is a view into pages shared by all worker processes.
+    """
+
+    _FILES = ("centroids", "ids", "vectors", "bounds")
+
+    def __init__(self, intents: Sequence[str], phrases: Sequence[str], labels: np.ndarray, matrix: np.ndarray,
+                 n_lists: int = 0, n_probe: int = 16, train_iterations: int = 10, seed: int = 0,
+                 cache_dir: Optional[str] = None):
+        """
+        Args:
+            matrix (np.ndarray): Unit-norm phrase embeddings, shape (n_phrases, dim).
+            n_lists (int): Number of clusters (0 = sqrt of the number of phrases).
+            n_probe (int): Lists scanned per query; higher is more exact and slower.
+            train_iterations (int): k-means iterations.
+            seed (int): Seed for the centroid initialisation and training sample.
+            cache_dir (Optional[str]): Where to persist the trained structure; the caller keys
+                it by phrase library (the parameters get a subdirectory each).
+        """
+        super().__init__(intents, phrases, labels)
+        n = len(matrix)
+        self.n_lists = min(n_lists or max(int(np.sqrt(n)), 1), max(n, 1))
+        self.n_probe = n_probe
+
+        path = os.path.join(cache_dir, f"ivf-{self.n_lists}-{train_iterations}-{seed}") if cache_dir else None
+        structure = self._load(path, matrix.shape) if path else None
+        if structure is None:
+            structure = self._build(np.asarray(matrix, dtype=np.float32), train_iterations, seed)
+            if path and self._save(path, structure):
+                # Reload so this process maps the shared file too instead of keeping its copy
+                structure = self._load(path, matrix.shape) or structure
+        self.centroids, order, vectors, bounds = structure
+        # One contiguous block of vectors (and their ids) per list, as views
+        self._lists = [(order[a:b], vectors[a:b]) for a, b in zip(bounds[:-1].tolist(), bounds[1:].tolist())]
+
+    def _build(self, matrix: np.ndarray, iterations: int, seed: int) -> Tuple[np.ndarray, ...]:
+        """(centroids, row ids in list order, vectors in list order, list bounds)."""
+        self.centroids = self._train(matrix, iterations, seed)
+        assign = self._assign(matrix)
+        order = np.argsort(assign, kind="stable")
+        bounds = np.searchsorted(assign[order], np.arange(self.n_lists + 1))
+        return self.centroids, order, np.ascontiguousarray(matrix[order]), bounds
+
+    def _load(self, path: str, shape: Tuple[int, ...]) -> Optional[Tuple[np.ndarray, ...]]:
+        if not os.path.isdir(path):
+            return None
+        try:
+            structure = tuple(np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r")
+                              for name in self._FILES)
+        except (OSError, ValueError) as e:
+            print(f"[Semantic] Ignoring unreadable IVF cache {path}: {e}")
+            return None
+        centroids, order, vectors, bounds = structure
+        if (vectors.shape != tuple(shape) or len(order) != shape[0] or len(bounds) != self.n_lists + 1
+                or centroids.shape != (self.n_lists, shape[1]) or int(bounds[-1]) != shape[0]):
+            print(f"[Semantic] Ignoring mismatched IVF cache {path}")
+            return None
+        print(f"[Semantic] Loaded IVF index ({self.n_lists} lists) from {path}")
+        return structure
+
+    def _save(self, path: str, structure: Tuple[np.ndarray, ...]) -> bool:
+        """Writes the files into a scratch directory renamed into place (workers may race)."""
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            work_dir = tempfile.mkdtemp(prefix=f".{os.path.basename(path)}.", dir=os.path.dirname(path))
+        except OSError as e:
+            print(f"[Semantic] Could not persist IVF index: {e}")
+            return False
+        try:
+            for name, array in zip(self._FILES, structure):
+                np.save(os.path.join(work_dir, f"{name}.npy"), array)
+            os.rename(work_dir, path)
+        except OSError as e:
+            # Also the case where another process renamed its copy first
+            if not os.path.isdir(path):
+                print(f"[Semantic] Could not persist IVF index: {e}")
+                return False
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+        return True
+
+    def _train(self, matrix: np.ndarray, iterations: int, seed: int) -> np.ndarray:
+        rng = np.random.default_rng(seed)
+        # A sample of ~64 points per list is plenty to place the centroids
+        sample = matrix[rng.choice(len(matrix), min(len(matrix), 64 * self.n_lists), replace=False)]
+        centroids = sample[rng.choice(len(sample), self.n_lists, replace=False)].copy()
+        for _ in range(iterations):
+            assign = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assign, sample)
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            # Empty clusters keep their previous centroid
+            centroids = np.where(norms > 0, sums / np.maximum(norms, 1e-12), centroids)
+        return centroids.astype(np.float32)
+
+    def _assign(self, vectors: np.ndarray, batch: int = 8192) -> np.ndarray:
+        return np.concatenate([np.argmax(vectors[i:i + batch] @ self.centroids.T, axis=1)
+                               for i in range(0, len(vectors), batch)] or [np.zeros(0, np.int64)])
+
+    def _insert(self, ids: np.ndarray, embeddings: np.ndarray):
+        assign = self._assign(embeddings)
+        for lst in np.unique(assign).tolist():
+            rows = assign == lst
+            old_ids, old_vecs = self._lists[lst]
+            self._lists[lst] = (np.concatenate((old_ids, ids[rows])), np.concatenate((old_vecs, embeddings[rows])))
+
+    def _candidates(self, query: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        probe = min(self.n_probe, self.n_lists)
+        nearest = np.argpartition(-(self.centroids @ query), probe - 1)[:probe]
+        lists = [self._lists[i] for i in nearest.tolist()]
+        ids = np.concatenate([ids for ids, _ in lists])
+        sims = np.concatenate([vecs @ query for _, vecs in lists])
+        return ids, sims
+
+def build_index(intents: Sequence[str], phrases: Sequence[str], labels: np.ndarray, matrix: np.ndarray,
+                kind: str = "auto", ann_threshold: int = 10000, **kwargs) -> PhraseIndex:
+    """
+    Index over a phrase library.
+
+    Args:
+        kind (str): 'exact', 'ivf', or 'auto' (IVF from `ann_threshold` phrases up).
+        **kwargs: Passed to `IVFIndex`.
+    """
+    if kind == "ivf" or (kind == "auto" and len(phrases) >= ann_threshold):
+        return IVFIndex(intents, phrases, labels, matrix, **kwargs)
+    return ExactIndex(intents, phrases, labels, matrix)
@@ -1,41 +1,58 @@
+import copy
 import time
 import uuid
 import threading
-from typing import Optional
+from dataclasses import replace
+from typing import Optional, Generator, Dict, Any, Tuple
 
-from .models import CallState, AudioChunk
-from .audio_chunker import AudioChunker
+from .models import CallState, AudioChunk, RiskScore, TranscriptSegment, ParalinguisticFeatures, SemanticIntent
 from .audio_chunker import AudioChunker
 from .asr_service import VoskASRService, MockASRService, MultiVoskASRService
-from .paralinguistic import ParalinguisticAnalyzer
-from .paralinguistic import ParalinguisticAnalyzer
+from .asr_pool import ProcessPoolASRService
+from .paralinguistic import ParalinguisticAnalyzer, AsyncParalinguistics
 from .semantic import SemanticAnalyzer
 from .sequencer import BehavioralSequencer
 from .scorer import FraudRiskScorer
 from .honeypot import HoneypotAgent
+from .vad import VoiceActivityDetector
+from .fingerprint import FingerprintIndex, CallFingerprinter
+from .speaking_rate import SpeakingRateEstimator
 
 class DetectionPipeline:
     """
     Orchestrates the real-time detection flow.
     
     Data Flow:
-    Audio -> [Chunker] -> [ASR] & [Paralinguistic] -> [Semantic] -> [Sequencer] -> [Scorer] -> Decision
+    Audio -> [Chunker] -> [VAD] -> [ASR] & [Paralinguistic] -> [Semantic] -> [Sequencer] -> [Scorer] -> Decision
     """
     
-    def __init__(self, use_mock_asr=False, language="en"):
+    def __init__(self, use_mock_asr=False, language="en", verbose=True, use_vad=True, asr_workers=0,
+                 use_fingerprints=False, fingerprint_path=None, prosody_backend="auto", para_budget_ms=10.0,
+                 semantic_backend="torch", fingerprint_read_only=False):
         self.call_state = CallState(call_id=str(uuid.uuid4()))
+        self.verbose = verbose
         
         # Initialize Components
         print(f"[Pipeline] Initializing components (Language: {language})...")
         
         self.chunker = AudioChunker(chunk_duration=1.0) # 1 sec window
+        self.vad = VoiceActivityDetector() if use_vad else None
+        
+        # Replayed recordings (robocall IVR messages) reuse the results of their first analysis
+        self.fingerprint_index = (FingerprintIndex(path=fingerprint_path, read_only=fingerprint_read_only)
+                                  if use_fingerprints or fingerprint_path else None)
+        self.fingerprint_recording: Optional[int] = None # Index id of the last call, if it was indexed
+        self.fingerprints = CallFingerprinter(self.fingerprint_index) if self.fingerprint_index is not None else None
         
         if use_mock_asr:
             self.asr = MockASRService()
         else:
             try:
-                if language == "mix":
-                    self.asr = MultiVoskASRService()
+                if asr_workers:
+                    # Decode in a pool of worker processes (calls pinned per worker)
+                    self.asr = ProcessPoolASRService(language=language, workers=asr_workers)
+                elif language == "mix":
+                    self.asr = MultiVoskASRService(adaptive=True)
                 else:
                     self.asr = VoskASRService(language=language)
             except ImportError:
@@ -45,22 +62,120 @@ class DetectionPipeline:
                 print(f"[Pipeline] {e}")
                 print("[Pipeline] specific Vosk model not found. Falling back to Mock.")
                 self.asr = MockASRService()
+            except RuntimeError as e:
+                print(f"[Pipeline] {e}. Falling back to Mock ASR.")
+                self.asr = MockASRService()
         
-        self.para_analyzer = ParalinguisticAnalyzer()
-        self.sem_analyzer = SemanticAnalyzer()
+        # Per-frame descriptors with running statistics (one analyzer per call)
+        self.para_analyzer = ParalinguisticAnalyzer(streaming=True, backend=prosody_backend)
+        # ...computed on a worker pool while ASR decodes; scoring waits at most para_budget_ms for them
+        self.para_budget_ms = para_budget_ms
+        self.para_async = AsyncParalinguistics(self.para_analyzer, budget_ms=para_budget_ms)
+        self.speaking_rate = SpeakingRateEstimator()
+        self.sem_analyzer = SemanticAnalyzer(backend=semantic_backend)
         self.sequencer = BehavioralSequencer()
-        self.scorer = FraudRiskScorer()
+        self.scorer = FraudRiskScorer(jitter_threshold=FraudRiskScorer.JITTER_THRESHOLDS[self.para_analyzer.backend])
         self.honeypot = HoneypotAgent()
+        self._last_intent = None
+        self._partial_words = []
+        self._asr_flushed = False
         
         print("[Pipeline] Initialization complete.")
+
+    def new_call(self, call_id: Optional[str] = None) -> "DetectionPipeline":
+        """
+        Creates a lightweight pipeline for another concurrent call.
+        
+        The copy shares this pipeline's loaded models (ASR model, SBERT, OpenSMILE) and
+        gets its own per-call state: recognizer stream, VAD, paralinguistic statistics, FSM, honeypot and CallState.
+        """
+        call = copy.copy(self)
+        call.asr = self.asr.new_stream()
+        call.para_analyzer = self.para_analyzer.new_stream()
+        call.para_async = AsyncParalinguistics(call.para_analyzer, budget_ms=self.para_budget_ms)
+        call.speaking_rate = SpeakingRateEstimator()
+        call.vad = VoiceActivityDetector() if self.vad else None
+        call.fingerprints = CallFingerprinter(self.fingerprint_index) if self.fingerprint_index is not None else None
+        call.start_call(call_id)
+        return call
+
+    def start_call(self, call_id: Optional[str] = None):
+        """
+        Resets all per-call state so the loaded models can be reused for another call.
+        """
+        self.call_state = CallState(call_id=call_id or str(uuid.uuid4()))
+        self.sequencer = BehavioralSequencer()
+        self.honeypot = HoneypotAgent()
+        self._last_intent = None
+        self._partial_words = []
+        self._asr_flushed = False
+        self.asr.reset()
+        self.para_async.reset()
+        self.speaking_rate.reset()
+        if self.vad:
+            self.vad.reset()
+        if self.fingerprints:
+            self.fingerprints.reset()
+        self.fingerprint_recording = None
+
+    def end_call(self):
+        """
+        Wraps up the current call: a call that was analysed (not served from the
+        fingerprint cache) is added to the index so replays of it can be recognized.
+        Also scores the recognizer's last utterance (unless `flush_asr` already did) and
+        waits for the call's outstanding paralinguistic work.
+        """
+        self.flush_asr()
+        self.para_async.join()
+        if self.fingerprints:
+            self.fingerprint_recording = self.fingerprints.finish()
+            if self.fingerprint_recording is not None and self.verbose:
+                print(f"[Pipeline] Fingerprinted call {self.call_state.call_id} for replay detection.")
+
+    def flush_asr(self) -> Optional[RiskScore]:
+        """
+        Finalizes the utterance the recognizer still holds at the end of the audio and
+        scores it like any other final segment. Only the first call per call does anything.
         
-    def process_file_simulation(self, file_path: str):
+        Returns:
+            Optional[RiskScore]: The assessment for the flushed segment, or None if nothing was pending.
+        """
+        if self._asr_flushed:
+            return None
+        self._asr_flushed = True
+        transcript_segment = self.asr.flush()
+        if not transcript_segment:
+            return None
+        transcript_segment = self._resolve_partial(transcript_segment)
+        if transcript_segment.is_final:
+            self.speaking_rate.observe_words(transcript_segment)
+        self.para_async.join()
+        para_features = replace(self.para_async.latest, speaking_rate=self.speaking_rate.rate)
+        _, risk_score = self._score_segment(transcript_segment, para_features)
+        return risk_score
+
+    def close(self):
+        """
+        Shuts the pipeline down: writes the fingerprint index if it changed since its last save.
+        """
+        if self.fingerprint_index is not None:
+            self.fingerprint_index.save_if_dirty()
+        
+    def process_file_simulation(self, file_path: str, realtime: bool = True,
+                                start_time: float = 0.0, end_time: Optional[float] = None):
         """
         Runs the pipeline on a file as if it were a live call.
+        
+        Args:
+            file_path (str): WAV file to analyse.
+            realtime (bool): If False, chunks are processed at max speed without pacing.
+            start_time (float): Offset (seconds) to start analysing from.
+            end_time (Optional[float]): Offset (seconds) to stop at; default is end of file.
         """
         print(f"\n[Pipeline] Starting simulation on {file_path}")
         
-        chunk_gen = self.chunker.process_file_stream(file_path)
+        chunk_gen = self.chunker.process_file_stream(file_path, realtime=realtime,
+                                                     start_time=start_time, end_time=end_time)
         
         for chunk in chunk_gen:
             self._process_single_chunk(chunk)
@@ -71,6 +186,23 @@ class DetectionPipeline:
                 # and start generating output.
                 # For simulation, we just log that we are in honeypot mode.
                 pass
+        self.flush_asr()
+        
+        if self.vad:
+            print(f"[Pipeline] VAD skipped {self.vad.chunks_skipped}/{self.vad.chunks_total} "
+                  f"chunks ({self.vad.skip_ratio:.0%})")
+        asr_stats = self.asr.stats()
+        if asr_stats:
+            print(f"[Pipeline] ASR: {asr_stats}")
+        self.para_async.join()
+        print(f"[Pipeline] Paralinguistics: {self.para_async.stats()}")
+        if self.sem_analyzer.model:
+            print(f"[Pipeline] Embedding cache (process-wide): {self.sem_analyzer.cache.stats()}")
+        if self.para_analyzer.streaming:
+            print(f"[Pipeline] Whole-call prosody: {self.para_analyzer.call_features()}")
+        if self.fingerprints and self.fingerprints.hits:
+            print(f"[Pipeline] Reused cached analysis for {self.fingerprints.hits} chunks (known recording)")
+        self.end_call()
                 
     def process_microphone_simulation(self):
         """
@@ -87,50 +219,156 @@ class DetectionPipeline:
                 # In real system, output audio here
                 pass
 
-    def _process_single_chunk(self, chunk: AudioChunk):
-        """
-        Core logic for one window of audio.
+    def iter_file_timeline(self, file_path: str, realtime: bool = False,
+                           start_time: float = 0.0, end_time: Optional[float] = None) -> Generator[Dict[str, Any], None, None]:
         """
-        start_time = time.time()
+        Analyses a recorded call and yields one risk timeline event per scoring decision.
         
-        # 1. Parallel Analysis (ASR + Paralinguistics)
-        # In python, GIL prevents true parallel CPU work without multiprocessing,
-        # but for IO bound or C-extension libs (like Vosk/OpenSMILE) it might help.
-        # For simplicity/clarity, we run sequential here as latency is low enough for 1s chunks.
+        Used by the batch CLI: the caller is expected to call `start_call` between files.
+        `start_time`/`end_time` restrict the analysis to part of the call.
         
-        # ASR
-        transcript_segment = self.asr.process_chunk(chunk)
+        Yields:
+            Dict[str, Any]: JSON-serializable event with the stream offset, transcript,
+                intent, FSM phase and risk score.
+        """
+        chunk = None
+        for chunk in self.chunker.process_file_stream(file_path, realtime=realtime,
+                                                      start_time=start_time, end_time=end_time):
+            risk_score = self._process_single_chunk(chunk)
+            if risk_score is not None:
+                yield self.timeline_event(chunk, risk_score)
+        # The last utterance, finalized by the end of the audio
+        risk_score = self.flush_asr()
+        if risk_score is not None and chunk is not None:
+            yield self.timeline_event(chunk, risk_score)
+        self.end_call()
+
+    def timeline_event(self, chunk: AudioChunk, risk_score: RiskScore) -> Dict[str, Any]:
+        """
+        Builds the JSON-serializable timeline record for a scoring decision on `chunk`.
+        """
+        segment = self.call_state.transcript_history[-1]
+        return {
+            "call_id": self.call_state.call_id,
+            "offset": round(chunk.offset, 3),
+            "start": round(segment.start_time, 3),
+            "end": round(segment.end_time, 3),
+            "text": segment.text,
+            "is_final": segment.is_final,
+            "intent": self._last_intent.label,
+            "intent_confidence": round(self._last_intent.confidence, 4),
+            "phase": self.call_state.current_phase,
+            "score": round(risk_score.score, 4),
+            "level": risk_score.level,
+            "triggers": risk_score.trigger_factors,
+            "honeypot_active": self.honeypot.is_active,
+        }
+
+    def _resolve_partial(self, segment: TranscriptSegment) -> TranscriptSegment:
+        """
+        Rebuilds the utterance's running hypothesis from partial word deltas.
+        """
+        if segment.is_final:
+            self._partial_words = []
+            return segment
         
-        # Paralinguistics
-        para_features = self.para_analyzer.analyze(chunk)
+        if segment.is_delta:
+            keep = len(self._partial_words) - segment.revised_words
+            self._partial_words = self._partial_words[:keep] + segment.text.split()
+        else:
+            self._partial_words = segment.text.split()
+        return replace(segment, text=" ".join(self._partial_words), is_delta=False, revised_words=0)
+
+    def _score_segment(self, transcript_segment: TranscriptSegment, para_features: ParalinguisticFeatures,
+                       cached_intent: Optional[SemanticIntent] = None) -> Tuple[SemanticIntent, RiskScore]:
+        """
+        Semantic analysis, sequencing, scoring and escalation for one transcript segment.
         
-        if transcript_segment:
+        Args:
+            cached_intent (Optional[SemanticIntent]): Intent reused from the fingerprint cache.
+        """
+        self.call_state.transcript_history.append(transcript_segment)
+        if self.verbose:
             print(f"  » Transcript: '{transcript_segment.text}' (Conf: {transcript_segment.confidence:.2f})")
-            
-            # 2. Semantic Analysis
-            intent = self.sem_analyzer.analyze(transcript_segment.text)
+        
+        # 2. Semantic Analysis
+        intent = cached_intent if cached_intent is not None else self.sem_analyzer.analyze(transcript_segment.text)
+        self._last_intent = intent
+        if self.verbose:
             print(f"  » Intent: {intent.label} ({intent.confidence:.2f})")
-            
-            # 3. Sequencing
-            new_stage = self.sequencer.update_state(self.call_state, intent)
-            
-            # 4. Scoring
-            risk_score = self.scorer.calculate_score(self.call_state, para_features, intent)
-            self.call_state.risk_history.append(risk_score)
-            
+        
+        # 3. Sequencing
+        new_stage = self.sequencer.update_state(self.call_state, intent)
+        
+        # 4. Scoring
+        risk_score = self.scorer.calculate_score(self.call_state, para_features, intent)
+        self.call_state.risk_history.append(risk_score)
+        
+        if self.verbose:
             print(f"  » Risk Score: {risk_score.score:.2f} [{risk_score.level}]")
             if risk_score.trigger_factors:
                 print(f"    ⚠ Triggers: {', '.join(risk_score.trigger_factors)}")
-                
-            # 5. Escalation Decision
-            if risk_score.level in ["HIGH", "CRITICAL"]:
-                if not self.honeypot.is_active:
-                    self.honeypot.activate(self.call_state)
+            
+        # 5. Escalation Decision
+        if risk_score.level in ["HIGH", "CRITICAL"]:
+            if not self.honeypot.is_active:
+                self.honeypot.activate(self.call_state)
         
+        return intent, risk_score
+
+    def _process_single_chunk(self, chunk: AudioChunk) -> Optional[RiskScore]:
+        """
+        Core logic for one window of audio.
+        
+        Returns:
+            Optional[RiskScore]: The new risk assessment, or None if no transcript was produced.
+        """
+        start_time = time.time()
+        
+        # 0. Fingerprint lookup
+        # Runs on every chunk (the fingerprint stream must see contiguous audio). When the
+        # call replays a known recording, its cached transcript/features/intent are reused.
+        cached = self.fingerprints.lookup(chunk) if self.fingerprints else None
+        
+        # Voice Activity Gate
+        # Silence / line noise skips both ASR and Paralinguistics. The VAD's hangover
+        # still lets the trailing pause through so the recognizer can finalize.
+        if self.vad and not self.vad.is_speech(chunk):
+            return None
+        
+        # 1. Parallel Analysis (ASR + Paralinguistics)
+        # Paralinguistics runs on the worker pool (NumPy/OpenSMILE release the GIL) while
+        # ASR decodes here, so the decision latency is the ASR's alone.
+        if cached is not None:
+            transcript_segment, para_features = cached.segment, cached.features
+        else:
+            self.para_async.submit(chunk)
+            transcript_segment = self.asr.process_chunk(chunk)
+            # Joined by timestamp for a scoring event, otherwise whatever is ready
+            para_features = self.para_async.features_at(chunk) if transcript_segment else self.para_async.latest
+        if transcript_segment:
+            transcript_segment = self._resolve_partial(transcript_segment)
+        
+        # Rolling speaking rate: ASR word timings when available, energy envelope otherwise
+        self.speaking_rate.observe_audio(chunk)
+        if transcript_segment and transcript_segment.is_final:
+            self.speaking_rate.observe_words(transcript_segment)
+        para_features = replace(para_features, speaking_rate=self.speaking_rate.rate)
+        
+        intent = None
+        risk_score = None
+        if transcript_segment:
+            intent, risk_score = self._score_segment(transcript_segment, para_features,
+                                                     cached.intent if cached is not None else None)
         else:
              # Even without text, paralinguistics might be relevant (e.g. heavy silence or noise)
              # But our FSM relies on intent currently.
              pass
+        
+        if self.fingerprints and cached is None:
+            self.fingerprints.record(chunk, transcript_segment, para_features, intent)
              
         proc_time = (time.time() - start_time) * 1000
         # print(f"  [Perf] Chunk processed in {proc_time:.1f}ms") 
+        
+        return risk_score
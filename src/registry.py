@@ -0,0 +1,58 @@
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, List
+
+class ModelRegistry:
+    """
+    Process-wide cache for heavy, read-only models (Vosk, Sentence-BERT, OpenSMILE).
+
+    Every component asks the registry instead of loading its own copy, so N concurrent
+    calls in one process share a single instance of each model. Per-call objects
+    (KaldiRecognizer, FSM, VAD...) stay cheap and starting a call costs milliseconds.
+
+    Loading is lazy and thread-safe: concurrent first requests for the same key wait
+    for a single load, while loads of different models don't block each other.
+    Failed loads are not cached, so the next caller retries.
+    """
+
+    def __init__(self):
+        self._models: Dict[Hashable, Any] = {}
+        self._key_locks: Dict[Hashable, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """
+        Returns the model stored under `key`, calling `loader()` once if it isn't loaded yet.
+
+        Args:
+            key (Hashable): Identifies the model, e.g. ("vosk", model_path).
+            loader (Callable[[], Any]): Builds the model on first use.
+        """
+        model = self._models.get(key)
+        if model is not None:
+            return model
+
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            model = self._models.get(key)
+            if model is None:
+                start = time.time()
+                model = loader()
+                self._models[key] = model
+                print(f"[Registry] Loaded {key} in {time.time() - start:.2f}s")
+            return model
+
+    def loaded(self) -> List[Hashable]:
+        """Keys of the models currently held in memory."""
+        return list(self._models)
+
+    def clear(self):
+        """Drops every cached model (they are freed once no component references them)."""
+        with self._lock:
+            self._models.clear()
+            self._key_locks.clear()
+
+# Process-wide instance
+registry = ModelRegistry()
@@ -1,4 +1,4 @@
-from typing import List
+from typing import List, Optional
 from .models import RiskScore, CallState, ParalinguisticFeatures, SemanticIntent
 from .sequencer import BehavioralSequencer
 
@@ -16,9 +16,21 @@ class FraudRiskScorer:
     RISK_THRESHOLD_MEDIUM = 0.4
     RISK_THRESHOLD_HIGH = 0.7
     RISK_THRESHOLD_CRITICAL = 0.9
+    FAST_SPEAKING_RATE = 5.5 # Syllables/s; conversational speech is around 4-5
+    # Jitter above which the voice counts as stressed, per paralinguistic backend. The
+    # NumPy backend's frame-to-frame jitter isn't on the eGeMAPS cycle-to-cycle scale
+    # (nor monotonic in it: octave errors and voicing dropouts dominate), so it isn't
+    # used for scoring.
+    JITTER_THRESHOLDS = {"opensmile": 0.05, "numpy": None}
 
-    def __init__(self):
+    def __init__(self, jitter_threshold: Optional[float] = JITTER_THRESHOLDS["opensmile"]):
+        """
+        Args:
+            jitter_threshold (Optional[float]): Stress threshold on `ParalinguisticFeatures.jitter`
+                (None ignores jitter); see `JITTER_THRESHOLDS`.
+        """
         self.sequencer_ref = BehavioralSequencer() # Just for accessing constant STATES
+        self.jitter_threshold = jitter_threshold
 
     def calculate_score(self, 
                         call_state: CallState, 
@@ -62,9 +74,9 @@ class FraudRiskScorer:
         stress_score = 0.0
         if para_features.pitch_variance > 0.5: # Arbitrary threshold for demo
             stress_score += 0.1
-        if para_features.jitter > 0.05:
+        if self.jitter_threshold is not None and para_features.jitter > self.jitter_threshold:
             stress_score += 0.1
-        if para_features.speaking_rate > 4: # Very fast talking
+        if para_features.speaking_rate > self.FAST_SPEAKING_RATE: # Very fast talking
             stress_score += 0.1
             
         score += stress_score
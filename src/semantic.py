@@ -1,18 +1,132 @@
-from typing import List, Dict
+import hashlib
+import json
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import List, Dict, Optional, Hashable
 import numpy as np
 from .models import SemanticIntent
+from .registry import registry
+from .encoder_service import BatchingEncoder
+from .onnx_encoder import OnnxSentenceEncoder, ONNX_AVAILABLE
+from .phrase_index import PhraseIndex, build_index
 
 import os
 # Fix for Railway Read-Only File System
 os.environ["HF_HOME"] = "/tmp"
+# Prototype matrices persisted across restarts and shared (memory-mapped) by worker processes
+PROTOTYPE_CACHE_DIR = os.environ.get("PROTOTYPE_CACHE_DIR", os.path.join(os.environ["HF_HOME"], "sbert-prototypes"))
 
 try:
-    from sentence_transformers import SentenceTransformer, util
+    from sentence_transformers import SentenceTransformer
     TRANSFORMER_AVAILABLE = True
 except ImportError as e:
     TRANSFORMER_AVAILABLE = False
     print(f"[Semantic] Warning: 'sentence-transformers' import failed: {e}")
 
+@dataclass
+class PrototypeMatrix:
+    """
+    Every prototype phrase embedded as one row of a single L2-normalized matrix,
+    rows grouped by intent. This is what gets persisted; searches go through the
+    `PhraseIndex` built on top of it.
+    """
+    intents: List[str]
+    phrases: List[str]
+    labels: np.ndarray # Intent index of each row
+    matrix: np.ndarray # (n_phrases, dim) float32, unit-norm rows
+
+    @classmethod
+    def build(cls, prototypes: Dict[str, List[str]], embeddings: np.ndarray,
+              normalized: bool = False) -> "PrototypeMatrix":
+        """
+        Args:
+            prototypes (Dict[str, List[str]]): Phrases per intent, in the order they were embedded.
+            embeddings (np.ndarray): One embedding per phrase, shape (n_phrases, dim).
+            normalized (bool): Rows are already unit-norm float32 (kept as is, e.g. a memory map).
+        """
+        intents = [intent for intent, phrases in prototypes.items() if phrases]
+        counts = [len(prototypes[intent]) for intent in intents]
+        matrix = np.asarray(embeddings, dtype=np.float32)
+        if not normalized:
+            matrix = matrix / np.maximum(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12)
+        return cls(
+            intents=intents,
+            phrases=[phrase for intent in intents for phrase in prototypes[intent]],
+            labels=np.repeat(np.arange(len(intents), dtype=np.int32), counts),
+            matrix=np.ascontiguousarray(matrix),
+        )
+
+    def __len__(self) -> int:
+        return len(self.phrases)
+
+def phrase_digest(prototypes: Dict[str, List[str]]) -> str:
+    """Stable hash of a phrase library (intents, phrases and their order)."""
+    return hashlib.sha1(json.dumps(prototypes, ensure_ascii=False).encode("utf-8")).hexdigest()[:16]
+
+_PUNCTUATION = re.compile(r"[^\w\s']")
+
+def normalize_text(text: str) -> str:
+    """Cache key form of an utterance: lower case, no punctuation, single spaces."""
+    return " ".join(_PUNCTUATION.sub(" ", text.lower()).split())
+
+class EmbeddingCache:
+    """
+    Bounded, thread-safe LRU cache of sentence embeddings.
+
+    Scam scripts repeat the same sentences across calls, so one instance is shared by
+    every analyzer in the process (`embedding_cache`). Keys include the model name;
+    cached arrays are read-only.
+    """
+
+    def __init__(self, max_entries: int = 10000):
+        """
+        Args:
+            max_entries (int): Least recently used entries are evicted beyond this size.
+        """
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[np.ndarray]:
+        with self._lock:
+            embedding = self._entries.get(key)
+            if embedding is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return embedding
+
+    def put(self, key: Hashable, embedding: np.ndarray):
+        embedding.setflags(write=False)
+        with self._lock:
+            self._entries[key] = embedding
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses,
+                    "evictions": self.evictions, "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+# Process-wide instance
+embedding_cache = EmbeddingCache()
+
 class SemanticAnalyzer:
     """
     Analyzes the meaning/intent of the transcript text.
@@ -49,26 +163,108 @@ class SemanticAnalyzer:
         ]
     }
 
-    def __init__(self, model_name: str = 'paraphrase-multilingual-MiniLM-L12-v2'):
+    BACKENDS = ("torch", "onnx")
+    MATCH_THRESHOLD = 0.25 # Cosine similarity below which a phrase isn't considered a match
+
+    def __init__(self, model_name: str = 'paraphrase-multilingual-MiniLM-L12-v2',
+                 prototypes: Optional[Dict[str, List[str]]] = None, cache: Optional[EmbeddingCache] = None,
+                 batch_max_size: int = 32, batch_max_wait_ms: float = 5.0, backend: str = "torch",
+                 prototype_cache_dir: Optional[str] = PROTOTYPE_CACHE_DIR, index: str = "auto", top_k: int = 3):
+        """
+        Args:
+            model_name (str): Sentence-BERT model.
+            prototypes (Optional[Dict[str, List[str]]]): Phrase library per intent; defaults to SCAM_PROTOTYPES.
+            cache (Optional[EmbeddingCache]): Utterance embedding cache; defaults to the process-wide one.
+            batch_max_size (int): Concurrent utterances encoded together (1 disables micro-batching).
+            batch_max_wait_ms (float): Longest an utterance waits for others to batch with.
+            backend (str): 'torch' (sentence-transformers) or 'onnx' (int8 ONNX Runtime, CPU).
+            prototype_cache_dir (Optional[str]): Where prototype embeddings are persisted (None disables).
+            index (str): Phrase search: 'exact', 'ivf' (approximate) or 'auto' (IVF for large libraries).
+            top_k (int): Matched phrases reported in `keywords_detected`.
+        """
+        if backend not in self.BACKENDS:
+            raise ValueError(f"Unknown semantic backend '{backend}' (expected one of {self.BACKENDS})")
+        if backend == "onnx" and not ONNX_AVAILABLE:
+            print("[Semantic] ONNX Runtime not available, using the torch encoder.")
+            backend = "torch"
+        self.backend = backend
         self.model = None
-        self.prototype_embeddings = {}
+        self.encoder: Optional[BatchingEncoder] = None
+        self.model_name = model_name
+        # Identifies the embedding space in cache / registry keys
+        self.model_id = model_name if backend == "torch" else f"{model_name}:onnx-int8"
+        self.cache = cache if cache is not None else embedding_cache
+        self.prototypes = prototypes if prototypes is not None else self.SCAM_PROTOTYPES
+        self.prototype_cache_dir = prototype_cache_dir
+        self.prototype_matrix: Optional[PrototypeMatrix] = None
+        self.index: Optional[PhraseIndex] = None
+        self.top_k = top_k
+        
+        if backend == "onnx":
+            loader = lambda: OnnxSentenceEncoder(model_name)
+        else:
+            loader = (lambda: SentenceTransformer(model_name)) if TRANSFORMER_AVAILABLE else None
         
-        if TRANSFORMER_AVAILABLE:
+        if loader:
             try:
-                print(f"[Semantic] Loading Sentence-BERT model: {model_name}...")
-                self.model = SentenceTransformer(model_name)
-                self._precompute_prototypes()
-                print("[Semantic] Model loaded and prototypes embedded.")
+                # Model and prototype embeddings are shared process-wide via the registry
+                self.model = registry.get(("sbert", self.model_id), loader)
+                self.prototype_matrix = registry.get(("sbert-prototypes", self.model_id, phrase_digest(self.prototypes)),
+                                                     self._precompute_prototypes)
+                # Shared too, so phrases added at runtime reach every call
+                pm = self.prototype_matrix
+                prefix = self._cache_prefix()
+                self.index = registry.get(("sbert-index", self.model_id, phrase_digest(self.prototypes), index),
+                                          lambda: build_index(pm.intents, pm.phrases, pm.labels, pm.matrix, kind=index,
+                                                              cache_dir=f"{prefix}.ivf" if prefix else None))
+                if batch_max_size > 1:
+                    # One batching queue per model, shared by every call in the process
+                    self.encoder = registry.get(("sbert-batcher", self.model_id, batch_max_size, batch_max_wait_ms),
+                                                lambda: BatchingEncoder(self.model, batch_max_size, batch_max_wait_ms))
             except Exception as e:
                 print(f"[Semantic] Failed to load model: {e}")
                 self.model = None
 
-    def _precompute_prototypes(self):
+    def _cache_prefix(self) -> Optional[str]:
+        """`<prototype_cache_dir>/<hash>` for this model and phrase library (None without a cache dir)."""
+        if not self.prototype_cache_dir:
+            return None
+        key = hashlib.sha1(f"{self.model_id}\n{phrase_digest(self.prototypes)}".encode("utf-8")).hexdigest()[:16]
+        return os.path.join(self.prototype_cache_dir, key)
+
+    def _precompute_prototypes(self) -> PrototypeMatrix:
         """
         Pre-computes embeddings for the scam prototype phrases for fast comparison.
+        
+        The matrix is stored as `<prototype_cache_dir>/<hash>.npy`, the hash covering the
+        model and the phrase library, and later loaded memory-mapped: restarts skip the
+        encoding and worker processes share the pages. A changed phrase set or model
+        gets a new file. An IVF index over it is kept in `<hash>.ivf/`.
         """
-        for intent, phrases in self.SCAM_PROTOTYPES.items():
-            self.prototype_embeddings[intent] = self.model.encode(phrases, convert_to_tensor=True)
+        phrases = [phrase for intent_phrases in self.prototypes.values() for phrase in intent_phrases]
+        prefix = self._cache_prefix()
+        path = f"{prefix}.npy" if prefix else None
+        if path and os.path.exists(path):
+            try:
+                matrix = np.load(path, mmap_mode="r")
+                if matrix.shape[0] == len(phrases) and matrix.dtype == np.float32:
+                    print(f"[Semantic] Loaded {len(phrases)} prototype embeddings from {path}")
+                    return PrototypeMatrix.build(self.prototypes, matrix, normalized=True)
+            except (OSError, ValueError) as e:
+                print(f"[Semantic] Ignoring unreadable prototype cache {path}: {e}")
+        
+        embeddings = self.model.encode(phrases, batch_size=64, convert_to_numpy=True, normalize_embeddings=True)
+        prototype_matrix = PrototypeMatrix.build(self.prototypes, embeddings)
+        if path:
+            try:
+                os.makedirs(self.prototype_cache_dir, exist_ok=True)
+                tmp = f"{path}.{os.getpid()}.tmp" # Workers may build it concurrently
+                with open(tmp, "wb") as f:
+                    np.save(f, prototype_matrix.matrix)
+                os.replace(tmp, path)
+            except OSError as e:
+                print(f"[Semantic] Could not persist prototype embeddings: {e}")
+        return prototype_matrix
 
     def analyze(self, text: str) -> SemanticIntent:
         """
@@ -88,43 +284,60 @@ class SemanticAnalyzer:
             return self._keyword_fallback(text)
             
         try:
-            # Encode input text
-            input_embedding = self.model.encode(text, convert_to_tensor=True)
+            input_embedding = self.embed(text)
             
-            best_intent = "UNKNOWN"
-            best_score = 0.0
-            
-            # Compare against all categories
-            for intent, proto_embeddings in self.prototype_embeddings.items():
-                # Compute cosine similarities
-                cosine_scores = util.cos_sim(input_embedding, proto_embeddings)
-                # Take the max score for this category (closest match)
-                max_score = float(cosine_scores.max())
-                
-                if max_score > best_score:
-                    best_score = max_score
-                    best_intent = intent
+            # Closest phrases in the library; the best one decides the category
+            matches = self.index.search(input_embedding, k=self.top_k)
+            _, best_intent, best_score = matches[0] if matches else ("", "NEUTRAL", 0.0)
+            best_score = max(best_score, 0.0)
             
             # Threshold for relevance
-            if best_score < 0.25:
+            if best_score < self.MATCH_THRESHOLD:
                 best_intent = "NEUTRAL"
                 
             return SemanticIntent(
                 label=best_intent,
                 confidence=best_score,
-                keywords_detected=[text] # Simplify for now
+                keywords_detected=[phrase for phrase, _, score in matches if score >= self.MATCH_THRESHOLD]
             )
             
         except Exception as e:
             print(f"[Semantic] Error analyzing text: {e}")
             return SemanticIntent("ERROR", 0.0)
 
+    def add_phrases(self, intent: str, phrases: List[str]):
+        """
+        Adds labelled phrases to the (process-wide) index at runtime, e.g. newly mined
+        scam lines. They are not persisted with the prototype matrix.
+        """
+        if not self.model or not phrases:
+            return
+        embeddings = self.model.encode(list(phrases), batch_size=64, convert_to_numpy=True, normalize_embeddings=True)
+        self.index.add(intent, phrases, embeddings)
+
+    def embed(self, text: str) -> np.ndarray:
+        """
+        Unit-norm float32 embedding of an utterance (so dot products are cosine
+        similarities), served from the shared cache when the sentence was seen before.
+        """
+        normalized = normalize_text(text)
+        key = (self.model_id, normalized)
+        embedding = self.cache.get(key)
+        if embedding is None:
+            if self.encoder:
+                embedding = self.encoder.encode(normalized)
+            else:
+                embedding = self.model.encode(normalized, convert_to_numpy=True, normalize_embeddings=True)
+                embedding = embedding.astype(np.float32)
+            self.cache.put(key, embedding)
+        return embedding
+
     def _keyword_fallback(self, text: str) -> SemanticIntent:
         """
         Simple keyword matching if ML model fails.
         """
         text_lower = text.lower()
-        for intent, phrases in self.SCAM_PROTOTYPES.items():
+        for intent, phrases in self.prototypes.items():
             for phrase in phrases:
                 if phrase.lower() in text_lower:
                     return SemanticIntent(intent, 0.8, [phrase])
@@ -0,0 +1,180 @@
+import asyncio
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Any
+
+from .audio_chunker import TelephonyNormalizer
+from .pipeline import DetectionPipeline
+
+class CallIngestionServer:
+    """
+    Asyncio TCP server that ingests live call audio from the SIP gateway.
+
+    Protocol (one call per connection):
+    1. Client sends a JSON header line, e.g.
+       {"call_id": "abc", "encoding": "mulaw", "sample_rate": 8000, "channels": 1}
+    2. Client streams raw audio bytes in that format, then half-closes (EOF).
+    3. Server answers with JSON lines: one risk timeline event per scoring decision,
+       then a final {"call_id": ..., "done": true, ...} summary.
+
+    Each connection gets a lightweight per-call pipeline (`DetectionPipeline.new_call`)
+    sharing the loaded models; the CPU-heavy stages of all calls are multiplexed onto
+    one shared thread pool.
+
+    Backpressure: a bounded per-call queue sits between the socket reader and the
+    pipeline. When a call's analysis falls behind, the reader stops pulling from the
+    socket and TCP flow control pushes back on the gateway instead of buffering
+    unbounded audio in memory.
+    """
+
+    def __init__(self,
+                 pipeline: DetectionPipeline,
+                 host: str = "0.0.0.0",
+                 port: int = 9300,
+                 workers: Optional[int] = None,
+                 max_calls: int = 500,
+                 max_queued_blocks: int = 32,
+                 read_size: int = 4096):
+        """
+        Args:
+            pipeline (DetectionPipeline): Template pipeline that owns the shared models.
+            host (str): Interface to bind.
+            port (int): TCP port to listen on.
+            workers (Optional[int]): Threads in the shared analysis pool (default: CPU count).
+            max_calls (int): Concurrent calls accepted before new connections are refused.
+            max_queued_blocks (int): Socket reads buffered per call before backpressure kicks in.
+            read_size (int): Bytes per socket read.
+        """
+        self.pipeline = pipeline
+        self.host = host
+        self.port = port
+        self.max_calls = max_calls
+        self.max_queued_blocks = max_queued_blocks
+        self.read_size = read_size
+        self.executor = ThreadPoolExecutor(max_workers=workers or os.cpu_count(),
+                                           thread_name_prefix="call-worker")
+        self.active_calls = 0
+
+    async def serve_forever(self):
+        server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        print(f"[Server] Listening for call audio on {self.host}:{self.port}")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            self.pipeline.close()
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        if self.active_calls >= self.max_calls:
+            await self._send(writer, {"error": "server at capacity"})
+            writer.close()
+            return
+
+        try:
+            header = json.loads(await reader.readline())
+            if not isinstance(header, dict):
+                raise ValueError("expected a JSON object")
+            sample_rate = header.get("sample_rate", 16000)
+            channels = header.get("channels", 1)
+            for name, value in (("sample_rate", sample_rate), ("channels", channels)):
+                if isinstance(value, bool) or not isinstance(value, int) or value <= 0:
+                    raise ValueError(f"{name} must be a positive integer, got {value!r}")
+            normalizer = TelephonyNormalizer(
+                encoding=header.get("encoding", "pcm16"),
+                sample_rate=sample_rate,
+                channels=channels,
+                target_rate=self.pipeline.chunker.target_rate
+            )
+        except (ValueError, TypeError) as e:
+            await self._send(writer, {"error": f"invalid header: {e}"})
+            writer.close()
+            return
+
+        call = self.pipeline.new_call(header.get("call_id"))
+        call_id = call.call_state.call_id
+        stats = {"chunks": 0, "backpressure_waits": 0}
+
+        self.active_calls += 1
+        print(f"[Server] Call {call_id} connected ({normalizer.encoding}, {normalizer.sample_rate}Hz, "
+              f"{normalizer.channels}ch). Active calls: {self.active_calls}")
+
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.max_queued_blocks)
+        producer = asyncio.create_task(self._read_audio(reader, queue, stats))
+        try:
+            await self._analyse(call, normalizer, queue, writer, stats)
+            await asyncio.get_running_loop().run_in_executor(self.executor, call.end_call)
+            summary = {"call_id": call_id, "done": True, **stats}
+            if call.vad:
+                summary["vad_skipped"] = call.vad.chunks_skipped
+            if call.fingerprints:
+                summary["fingerprint_hits"] = call.fingerprints.hits
+            summary.update(call.asr.stats())
+            await self._send(writer, summary)
+        except (ConnectionError, asyncio.IncompleteReadError) as e:
+            print(f"[Server] Call {call_id} dropped: {e}")
+        finally:
+            producer.cancel()
+            self.active_calls -= 1
+            writer.close()
+            print(f"[Server] Call {call_id} closed. Active calls: {self.active_calls}")
+
+    async def _read_audio(self, reader: asyncio.StreamReader, queue: asyncio.Queue, stats: Dict[str, int]):
+        """Socket -> bounded queue. Blocks (and stops reading the socket) while the queue is full."""
+        try:
+            while True:
+                data = await reader.read(self.read_size)
+                if not data:
+                    break
+                if queue.full():
+                    stats["backpressure_waits"] += 1
+                await queue.put(data)
+        finally:
+            await queue.put(None)
+
+    async def _analyse(self, call: DetectionPipeline, normalizer: TelephonyNormalizer,
+                       queue: asyncio.Queue, writer: asyncio.StreamWriter, stats: Dict[str, int]):
+        """Queue -> normalize -> window -> shared worker pool, one chunk in flight per call."""
+        loop = asyncio.get_running_loop()
+        target_rate = normalizer.target_rate
+        ring = call.chunker.make_ring(target_rate, normalizer.max_output_bytes(self.read_size * 2))
+        frame_in = normalizer.bytes_per_sample * normalizer.channels
+        hop_duration = ring.hop_bytes / 2 / target_rate
+        offset = 0.0
+        pending = b""
+        chunk = None
+
+        while True:
+            data = await queue.get()
+            if data is None:
+                windows = ring.flush()
+            else:
+                # Socket reads needn't end on a frame boundary
+                if pending:
+                    data = pending + data
+                usable = len(data) - len(data) % frame_in
+                pending = data[usable:]
+                ring.write(normalizer.process(memoryview(data)[:usable]))
+                windows = ring.windows()
+
+            for view, overlap_bytes in windows:
+                chunk = call.chunker.make_chunk(view, overlap_bytes, 2, target_rate, offset)
+                offset += hop_duration
+                stats["chunks"] += 1
+                # The ring view stays valid: nothing writes to this call's ring until this returns
+                risk_score = await loop.run_in_executor(self.executor, call._process_single_chunk, chunk)
+                if risk_score is not None:
+                    await self._send(writer, call.timeline_event(chunk, risk_score))
+
+            if data is None:
+                break
+
+        # The recognizer's last utterance, finalized now that the audio has ended
+        risk_score = await loop.run_in_executor(self.executor, call.flush_asr)
+        if risk_score is not None and chunk is not None:
+            await self._send(writer, call.timeline_event(chunk, risk_score))
+
+    @staticmethod
+    async def _send(writer: asyncio.StreamWriter, message: Dict[str, Any]):
+        writer.write((json.dumps(message) + "\n").encode())
+        await writer.drain()
@@ -0,0 +1,140 @@
+import re
+from collections import deque
+from typing import Optional
+import numpy as np
+from .models import AudioChunk, TranscriptSegment
+
+_LATIN_VOWEL_GROUPS = re.compile(r"[aeiouy]+")
+# Devanagari: every consonant or independent vowel starts an akshara, except a consonant followed by virama
+_DEVANAGARI_AKSHARA = re.compile(r"[ऄ-औक-हक़-ॡ](?!्)")
+
+def count_syllables(word: str) -> int:
+    """Rough syllable count of a transcribed word (English vowel groups or Devanagari aksharas)."""
+    word = word.lower()
+    n = len(_DEVANAGARI_AKSHARA.findall(word))
+    if n:
+        return n
+    n = len(_LATIN_VOWEL_GROUPS.findall(word))
+    if n > 1 and word.endswith("e") and not word.endswith(("le", "ee")):
+        n -= 1 # Silent final e ("code", "share")
+    return max(n, 1)
+
+class _Window:
+    """Sliding sums of (syllables, seconds) over stream time."""
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self._items = deque()
+        self.syllables = 0.0
+        self.duration = 0.0
+
+    def add(self, t: float, syllables: float, duration: float):
+        self._items.append((t, syllables, duration))
+        self.syllables += syllables
+        self.duration += duration
+
+    def expire(self, now: float):
+        items = self._items
+        while items and items[0][0] <= now - self.seconds:
+            _, syllables, duration = items.popleft()
+            self.syllables -= syllables
+            self.duration -= duration
+        if not items:
+            self.syllables = self.duration = 0.0
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+class SpeakingRateEstimator:
+    """
+    Rolling per-call speaking rate, in syllables per second of speech.
+
+    Two sources, both incremental:
+    - ASR word timings (final results with `words`): syllables counted from the text,
+      over the words' durations plus short inter-word gaps (pauses are excluded).
+    - Syllable nuclei in the energy envelope, used while no timed words are in the
+      window (mock ASR, partials only, start of the call): peaks of the 10 ms dB
+      envelope that stand out from the speech level and are separated by a dip.
+
+    Costs about a tenth of a millisecond per 1 s chunk.
+    """
+
+    FRAME = 0.010
+
+    def __init__(self, window_seconds: float = 10.0, max_gap: float = 0.3, min_words: int = 3,
+                 peak_range_db: float = 25.0, min_dip_db: float = 2.0):
+        """
+        Args:
+            window_seconds (float): Stream time the rolling rate covers.
+            max_gap (float): Inter-word gaps longer than this count as pauses, not speech.
+            min_words (int): Timed words needed in the window before they are preferred over the envelope.
+            peak_range_db (float): Envelope peaks more than this below the chunk's loudest frame are ignored.
+            min_dip_db (float): Drop in level needed between two peaks for them to be separate syllables.
+        """
+        self.max_gap = max_gap
+        self.min_words = min_words
+        self.peak_range_db = peak_range_db
+        self.min_dip_db = min_dip_db
+        self.window_seconds = window_seconds
+        self.reset()
+
+    def reset(self):
+        self._words = _Window(self.window_seconds)
+        self._envelope = _Window(self.window_seconds)
+        self._last_word_end: Optional[float] = None
+
+    @property
+    def rate(self) -> float:
+        """Current rolling speaking rate (syllables/s), 0.0 until enough speech was seen."""
+        if len(self._words) >= self.min_words and self._words.duration > 0:
+            return self._words.syllables / self._words.duration
+        if self._envelope.duration >= 1.0:
+            return self._envelope.syllables / self._envelope.duration
+        return 0.0
+
+    def observe_words(self, segment: TranscriptSegment):
+        """Adds the timed words of a final ASR result."""
+        if segment.words is None or not len(segment.words):
+            return
+        starts = segment.words["start"].tolist()
+        ends = segment.words["end"].tolist()
+        for word, start, end in zip(segment.text.split(), starts, ends):
+            gap = 0.0 if self._last_word_end is None else min(max(start - self._last_word_end, 0.0), self.max_gap)
+            self._words.add(end, count_syllables(word), (end - start) + gap)
+            self._last_word_end = end
+        self._words.expire(ends[-1])
+
+    def observe_audio(self, chunk: AudioChunk):
+        """Counts syllable nuclei in the chunk's new audio (16-bit PCM)."""
+        samples = np.frombuffer(chunk.fresh_data, dtype=np.int16)
+        frame = int(self.FRAME * chunk.sample_rate)
+        n = len(samples) // frame
+        end = chunk.fresh_offset + len(samples) / chunk.sample_rate
+        if n < 3:
+            return
+        power = np.mean(np.square(samples[:n * frame].reshape(n, frame), dtype=np.float32), axis=1)
+        db = 10 * np.log10(power + 1.0)
+        # 30 ms smoothing merges the ripples inside one vowel
+        db = np.convolve(db, np.ones(3) / 3, mode="same")
+
+        floor = max(float(np.median(db)) + 2.0, float(db.max()) - self.peak_range_db)
+        active = db > floor
+        self._envelope.expire(end)
+        if not active.any():
+            return
+
+        peaks = np.flatnonzero((db[1:-1] > db[:-2]) & (db[1:-1] >= db[2:]) & active[1:-1]) + 1
+        syllables = 0
+        last_peak = None
+        for p in peaks.tolist():
+            # Separate syllable only if the level dipped enough since the previous nucleus
+            if last_peak is None or min(db[last_peak], db[p]) - db[last_peak:p].min() >= self.min_dip_db:
+                syllables += 1
+                last_peak = p
+            elif db[p] > db[last_peak]:
+                last_peak = p
+        # Speech time: active frames plus the short dips between them (pauses are excluded)
+        idx = np.flatnonzero(active)
+        gaps = np.diff(idx) - 1
+        frames = len(idx) + int(gaps[gaps * self.FRAME <= self.max_gap].sum())
+        self._envelope.add(end, syllables, frames * self.FRAME)
@@ -0,0 +1,105 @@
+import numpy as np
+from .models import AudioChunk
+
+class VoiceActivityDetector:
+    """
+    Lightweight energy / zero-crossing Voice Activity Detector.
+
+    Sits in front of ASR and Paralinguistics so that silence, line noise and
+    dead air don't cost a full decode. Each chunk is split into short frames and
+    scored in one vectorized pass:
+    - Frame energy (dBFS) compared against an adaptive noise floor.
+    - Zero-crossing rate, to reject broadband hiss that is loud but not voiced.
+
+    A short hangover keeps passing chunks after speech ends, so the recognizer
+    still hears the trailing pause it needs to finalize the utterance.
+    """
+
+    def __init__(self,
+                 frame_ms: float = 20.0,
+                 margin_db: float = 9.0,
+                 min_energy_db: float = -55.0,
+                 voiced_energy_db: float = -40.0,
+                 max_zcr: float = 0.35,
+                 min_speech_ratio: float = 0.1,
+                 hangover_chunks: int = 1):
+        """
+        Args:
+            frame_ms (float): Analysis frame length in milliseconds.
+            margin_db (float): How far above the noise floor a frame must be to count as speech.
+            min_energy_db (float): Absolute energy floor (dBFS); quieter frames are never speech.
+                Also the initial noise floor estimate.
+            voiced_energy_db (float): Frames louder than this (dBFS) pass the energy test however
+                high the noise floor has drifted, so sustained speech can't become its own floor.
+            max_zcr (float): Frames crossing zero more often than this (per sample) are treated as noise.
+            min_speech_ratio (float): Fraction of speech frames needed to mark the chunk as speech.
+            hangover_chunks (int): Non-speech chunks still passed through after speech ends.
+        """
+        self.frame_ms = frame_ms
+        self.margin_db = margin_db
+        self.min_energy_db = min_energy_db
+        self.voiced_energy_db = voiced_energy_db
+        self.max_zcr = max_zcr
+        self.min_speech_ratio = min_speech_ratio
+        self.hangover_chunks = hangover_chunks
+        self.reset()
+
+    def reset(self):
+        """Clears the noise floor estimate and counters for a new call."""
+        self.noise_floor_db = self.min_energy_db
+        self._hangover = 0
+        self.chunks_total = 0
+        self.chunks_skipped = 0
+
+    def is_speech(self, chunk: AudioChunk) -> bool:
+        """
+        Decides whether the chunk should be passed downstream.
+
+        Returns:
+            bool: False if the chunk is silence/noise and can be skipped.
+        """
+        self.chunks_total += 1
+        speech = self._detect(chunk)
+
+        if speech:
+            self._hangover = self.hangover_chunks
+            return True
+        if self._hangover > 0:
+            self._hangover -= 1
+            return True
+
+        self.chunks_skipped += 1
+        return False
+
+    def _detect(self, chunk: AudioChunk) -> bool:
+        samples = np.frombuffer(chunk.data, dtype=np.int16)
+        frame_len = max(1, int(chunk.sample_rate * self.frame_ms / 1000))
+        n_frames = len(samples) // frame_len
+        if n_frames == 0:
+            return False
+
+        frames = samples[:n_frames * frame_len].reshape(n_frames, frame_len).astype(np.float32)
+        frames *= 1.0 / 32768.0
+
+        energy_db = 10.0 * np.log10(np.mean(frames * frames, axis=1) + 1e-10)
+        signs = np.signbit(frames)
+        zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / frame_len
+
+        # Noise floor: quiet end of this chunk's frames. Starts at the absolute floor, falls
+        # immediately, rises slowly, so a long stretch of speech doesn't drag the floor up
+        # with it (and the threshold is capped for the case where it still does).
+        chunk_floor = float(np.percentile(energy_db, 10))
+        if chunk_floor < self.noise_floor_db:
+            self.noise_floor_db = chunk_floor
+        else:
+            self.noise_floor_db += 0.05 * (chunk_floor - self.noise_floor_db)
+
+        threshold = min(max(self.noise_floor_db + self.margin_db, self.min_energy_db), self.voiced_energy_db)
+        speech_frames = (energy_db > threshold) & (zcr < self.max_zcr)
+
+        return np.count_nonzero(speech_frames) >= self.min_speech_ratio * n_frames
+
+    @property
+    def skip_ratio(self) -> float:
+        """Fraction of chunks skipped so far."""
+        return self.chunks_skipped / self.chunks_total if self.chunks_total else 0.0
@@ -0,0 +1,85 @@
+import os
+import tempfile
+import numpy as np
+from src.models import AudioChunk, ParalinguisticFeatures, SemanticIntent, TranscriptSegment, WORD_TIMING_DTYPE
+from src.fingerprint import FingerprintIndex, CallFingerprinter
+
+def recording(seconds: float, seed: int, sample_rate: int = 16000) -> np.ndarray:
+    """Speech-like audio: 120 ms harmonic tones with random pitch and timbre."""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(0.12 * sample_rate)) / sample_rate
+    tones = []
+    for _ in range(int(seconds / 0.12)):
+        f0 = rng.uniform(100, 300)
+        tones.append(sum(a * np.sin(2 * np.pi * f0 * (k + 1) * t) for k, a in enumerate(rng.uniform(0, 1, 12))))
+    x = np.concatenate(tones)
+    return (x / np.abs(x).max() * 12000).astype(np.int16)
+
+def chunks(samples: np.ndarray, sample_rate: int = 16000):
+    for start in range(0, len(samples) - sample_rate + 1, sample_rate):
+        yield AudioChunk(data=samples[start:start + sample_rate].tobytes(), duration=1.0,
+                         sample_rate=sample_rate, offset=start / sample_rate)
+
+def analysed(chunk: AudioChunk):
+    """Stand-in analysis results; every other chunk has a final segment with word timings."""
+    i = int(chunk.offset)
+    segment = None
+    if i % 2 == 0:
+        words = np.array([(chunk.offset, chunk.offset + 0.4, 0.9), (chunk.offset + 0.5, chunk.offset + 0.9, 0.8)],
+                         dtype=WORD_TIMING_DTYPE)
+        segment = TranscriptSegment(f"word{i} next{i}", chunk.offset, chunk.offset + 1.0, 0.85, words=words)
+    intent = SemanticIntent("URGENCY", 0.7, ["now"]) if i % 4 == 0 else None
+    return segment, ParalinguisticFeatures(pitch_mean=20.0 + i, jitter=0.01), intent
+
+def replay(index: FingerprintIndex, samples: np.ndarray):
+    fingerprinter = CallFingerprinter(index)
+    return [fingerprinter.lookup(c) for c in chunks(samples)]
+
+def test_fingerprint():
+    ivr = recording(12, seed=0)
+    index = FingerprintIndex()
+    fingerprinter = CallFingerprinter(index)
+    for chunk in chunks(ivr):
+        fingerprinter.lookup(chunk)
+        fingerprinter.record(chunk, *analysed(chunk))
+    assert fingerprinter.finish() is not None, "recording wasn't indexed"
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "fingerprints.idx")
+        index.save(path)
+        assert os.path.exists(path) and os.path.exists(path + ".json"), "index or sidecar not written"
+        reloaded = FingerprintIndex(path=path)
+        assert len(reloaded) == len(index)
+
+        # A replay (noisy, after some unrelated audio) is served the same cached results
+        rng = np.random.default_rng(1)
+        call = np.concatenate((recording(3.3, seed=2), ivr)).astype(np.float64)
+        call = np.clip(call + rng.normal(0, 600, len(call)), -32768, 32767).astype(np.int16)
+        before, after = replay(index, call), replay(reloaded, call)
+        assert sum(c is not None for c in before) >= 5, "replay not recognized"
+        assert any(c is not None and c.segment is not None for c in before), "no cached transcript served"
+        for a, b in zip(before, after):
+            assert (a is None) == (b is None)
+            if a is None:
+                continue
+            assert a.offset == b.offset and a.features == b.features and a.intent == b.intent
+            assert (a.segment is None) == (b.segment is None)
+            if a.segment is not None:
+                assert a.segment.text == b.segment.text and a.segment.start_time == b.segment.start_time
+                assert np.array_equal(a.segment.words, b.segment.words)
+        print("✅ Saved index serves the same cached results after reload")
+
+        # Read-only copies (batch workers) never write
+        os.remove(path)
+        read_only = FingerprintIndex(path=path, read_only=True)
+        read_only.add(*index.export(next(iter(index._recordings))))
+        read_only.save_if_dirty()
+        assert not os.path.exists(path), "read-only index wrote its file"
+        print("✅ Read-only index doesn't save")
+
+        # Unrelated audio isn't matched
+        assert all(c is None for c in replay(reloaded, recording(12, seed=3)))
+        print("✅ Unrelated call not matched")
+
+if __name__ == "__main__":
+    test_fingerprint()
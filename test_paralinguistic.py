@@ -0,0 +1,26 @@
+import numpy as np
+from src.models import AudioChunk
+from src.paralinguistic import ParalinguisticAnalyzer, OPENSMILE_AVAILABLE
+
+def voiced_tone(seconds: float = 1.0, sample_rate: int = 16000) -> AudioChunk:
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    samples = (0.3 * 32767 * np.sin(2 * np.pi * 150 * t)).astype(np.int16)
+    return AudioChunk(data=samples.tobytes(), duration=seconds, sample_rate=sample_rate)
+
+def test_paralinguistic():
+    chunk = voiced_tone()
+    backends = ["numpy"] + (["opensmile"] if OPENSMILE_AVAILABLE else [])
+    if not OPENSMILE_AVAILABLE:
+        print("⚠ OpenSMILE not installed, checking the NumPy backend only")
+
+    for backend in backends:
+        analyzer = ParalinguisticAnalyzer(backend=backend)
+        # A second stream must work too (it gets its own buffers)
+        for name, a in (("analyzer", analyzer), ("new_stream", analyzer.new_stream())):
+            features = a.analyze(chunk)
+            assert features.pitch_mean > 0, f"{backend} {name}: zero pitch on a voiced tone ({features})"
+            assert features.intensity_mean > 0, f"{backend} {name}: zero loudness on a voiced tone ({features})"
+        print(f"✅ {backend}: pitch {features.pitch_mean:.1f}, loudness {features.intensity_mean:.3f}")
+
+if __name__ == "__main__":
+    test_paralinguistic()
@@ -0,0 +1,47 @@
+import os
+import tempfile
+import numpy as np
+from src.phrase_index import IVFIndex, ExactIndex
+
+def library(n: int = 5000, dim: int = 64, seed: int = 0):
+    """Unit-norm random phrase embeddings with their phrases, intents and labels."""
+    rng = np.random.default_rng(seed)
+    matrix = rng.normal(size=(n, dim)).astype(np.float32)
+    matrix /= np.linalg.norm(matrix, axis=1, keepdims=True)
+    return ["URGENCY", "PAYMENT", "NEUTRAL"], [f"phrase {i}" for i in range(n)], rng.integers(0, 3, n), matrix
+
+def test_phrase_index():
+    intents, phrases, labels, matrix = library()
+    queries = matrix[:50] + np.random.default_rng(1).normal(0, 0.05, (50, matrix.shape[1])).astype(np.float32)
+    queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        built = IVFIndex(intents, phrases, labels, matrix, cache_dir=tmp)
+        assert os.listdir(tmp), "IVF structure not persisted"
+        loaded = IVFIndex(intents, phrases, labels, matrix, cache_dir=tmp)
+        in_memory = IVFIndex(intents, phrases, labels, matrix)
+
+        # Reloaded lists are views into the memory-mapped file
+        assert all(isinstance(vecs.base, np.memmap) for _, vecs in loaded._lists if len(vecs))
+        for q in queries:
+            assert built.search(q, 5) == loaded.search(q, 5) == in_memory.search(q, 5)
+        print("✅ Reloaded IVF index returns the same results")
+
+        exact = ExactIndex(intents, phrases, labels, matrix)
+        recall = np.mean([loaded.search(q, 1)[0][0] == exact.search(q, 1)[0][0] for q in queries])
+        assert recall >= 0.9, f"IVF top-1 recall {recall:.2f}"
+        print(f"✅ IVF top-1 recall vs exact: {recall:.2f}")
+
+        # Runtime inserts work on top of the read-only map
+        loaded.add("BANKING", ["new phrase"], queries[:1])
+        assert loaded.search(queries[0], 1)[0][:2] == ("new phrase", "BANKING")
+        print("✅ Inserted phrase found after reload")
+
+        # A structure for a different library is ignored, not misused
+        _, phrases2, labels2, matrix2 = library(n=4000, seed=2)
+        other = IVFIndex(intents, phrases2, labels2, matrix2, n_lists=int(np.sqrt(5000)), cache_dir=tmp)
+        assert other.search(matrix2[7], 1)[0][0] == "phrase 7"
+        print("✅ Mismatched cache ignored")
+
+if __name__ == "__main__":
+    test_phrase_index()
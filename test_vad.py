@@ -0,0 +1,43 @@
+import os
+import wave
+import numpy as np
+from src.models import AudioChunk
+from src.vad import VoiceActivityDetector
+
+def chunks(samples: np.ndarray, sample_rate: int = 16000, seconds: float = 1.0):
+    step = int(sample_rate * seconds)
+    for start in range(0, len(samples) - step + 1, step):
+        yield AudioChunk(data=samples[start:start + step].tobytes(), duration=seconds,
+                         sample_rate=sample_rate, offset=start / sample_rate)
+
+def passed(vad: VoiceActivityDetector, samples: np.ndarray) -> int:
+    vad.reset()
+    return sum(vad.is_speech(c) for c in chunks(samples))
+
+def test_vad():
+    # The default demo: a steady 440 Hz tone must not become its own noise floor
+    if not os.path.exists("dummy_call.wav"):
+        from main import generate_dummy_wav
+        generate_dummy_wav("dummy_call.wav")
+    with wave.open("dummy_call.wav") as wf:
+        tone = np.frombuffer(wf.readframes(wf.getnframes()), dtype=np.int16)
+
+    rng = np.random.default_rng(0)
+    silence = (rng.normal(0, 20, 16000 * 10)).astype(np.int16) # ~ -64 dBFS line noise
+    vad = VoiceActivityDetector()
+
+    n = passed(vad, tone)
+    assert n == 10, f"dummy_call.wav: only {n}/10 chunks passed the VAD"
+    print("✅ dummy_call.wav passes the VAD")
+
+    n = passed(vad, silence)
+    assert n == 0, f"line noise: {n}/10 chunks passed the VAD"
+    print("✅ Line noise skipped")
+
+    # Speech after a quiet lead-in still passes once the floor has dropped
+    n = passed(vad, np.concatenate((silence[:16000 * 5], tone[:16000 * 5])))
+    assert n == 5, f"silence then tone: {n}/10 chunks passed the VAD"
+    print("✅ Silence then tone: only the tone passes")
+
+if __name__ == "__main__":
+    test_vad()